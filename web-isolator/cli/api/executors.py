@@ -0,0 +1,115 @@
+"""
+Thread pool executors and async facades for the Web Isolator 2.0 Control Plane
+Blocking SQLite and provider (docker CLI) calls run on dedicated bounded pools
+so they never stall the event loop.
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from providers.async_base import AsyncIsolationProvider, as_async_provider
+
+
+class InstrumentedExecutor:
+    """Bounded thread pool that tracks queue depth and wait time"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _wrap(self, func: Callable, submitted: float) -> Callable:
+        """Wrap a call so queue wait and activity are recorded"""
+        def run():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+        return run
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool and await its result"""
+        with self._lock:
+            self._queued += 1
+        call = functools.partial(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._wrap(call, time.perf_counter()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool sizing statistics"""
+        with self._lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "completed": self._completed,
+                "avg_wait_time": self._total_wait / started if started else 0.0,
+                "max_wait_time": self._max_wait,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying thread pool"""
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncFacade:
+    """
+    Async view of a synchronous object.
+    Method calls are dispatched to the executor and return awaitables;
+    plain attributes are returned as-is.
+    """
+
+    def __init__(self, target: Any, executor: InstrumentedExecutor):
+        self._target = target
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self._executor.run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
+class AsyncDatabaseManager(AsyncFacade):
+    """Async facade over DatabaseManager running on the database pool"""
+
+
+class AsyncWorkspaceManager(AsyncFacade):
+    """Async facade over WorkspaceManager running on the database pool"""
+
+
+class AsyncProviderFactory(AsyncFacade):
+    """Async facade over ProviderFactory running on the provider pool"""
+
+    async def get_provider(self, provider_name: str) -> AsyncIsolationProvider:
+        """Get the async interface of a provider instance"""
+        provider = await self._executor.run(self._target.get_provider, provider_name)
+        return as_async_provider(provider, self._executor)
+
+    async def get_default_provider(self) -> AsyncIsolationProvider:
+        """Get the async interface of the first available provider"""
+        provider = await self._executor.run(self._target.get_default_provider)
+        return as_async_provider(provider, self._executor)
@@ -0,0 +1,241 @@
+"""
+Log streaming hub for the Web Isolator 2.0 Control Plane
+Keeps one upstream log follower per container, however many WebSocket
+clients watch it, and fans lines out through bounded per-client queues.
+"""
+import asyncio
+import itertools
+import re
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from providers.async_base import AsyncIsolationProvider
+from providers.base import LogLine
+from providers.logs import parse_timestamp
+
+
+# Level keywords near the start of a line; otherwise stderr is "error" and stdout "info"
+LEVEL_RE = re.compile(r'\b(DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL|CRITICAL)\b', re.IGNORECASE)
+LEVELS = {'debug': 'debug', 'info': 'info', 'warn': 'warn', 'warning': 'warn',
+          'error': 'error', 'fatal': 'error', 'critical': 'error'}
+
+_entry_ids = itertools.count(1)
+
+
+def log_entry(line: LogLine, source: str) -> Dict[str, Any]:
+    """Dashboard LogEntry for a log line"""
+    match = LEVEL_RE.search(line.text[:64])
+    if match:
+        level = LEVELS[match.group(1).lower()]
+    else:
+        level = 'error' if line.stream == 'stderr' else 'info'
+    return {
+        "id": f"{line.service}-{next(_entry_ids)}",
+        "timestamp": line.timestamp,
+        "level": level,
+        "source": source,
+        "message": line.text,
+        "metadata": {"stream": line.stream, "container": line.service}
+    }
+
+
+class LogSubscription:
+    """
+    One client's view of a follower.
+
+    Entries wait in a bounded queue; when the client falls behind the oldest
+    ones are dropped and replaced by a single notice in the next frame.
+    """
+
+    def __init__(self, follower: "LogFollower", max_queue: int, max_batch: int, flush_interval: float):
+        self.follower = follower
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max_queue)
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+        self.frames_sent = 0
+
+    def push(self, entry: Dict[str, Any]):
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+            self.follower.hub.lines_dropped += 1
+        self._queue.append(entry)
+        self._ready.set()
+
+    def end(self):
+        """The follower stopped for good"""
+        self._closed = True
+        self._ready.set()
+
+    async def next_frame(self) -> Optional[Dict[str, Any]]:
+        """Wait for the next WebSocket message (None once the follower has stopped)"""
+        while not self._queue:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        # Give small lines a moment to accumulate into one frame
+        if len(self._queue) < self.max_batch and self.flush_interval:
+            await asyncio.sleep(self.flush_interval)
+
+        entries: List[Dict[str, Any]] = []
+        if self.dropped:
+            entries.append({
+                "id": f"dropped-{next(_entry_ids)}",
+                "timestamp": None,
+                "level": "warn",
+                "source": self.follower.source,
+                "message": f"[{self.dropped} log lines dropped: client too slow]",
+                "metadata": {"dropped": self.dropped}
+            })
+            self.dropped = 0
+        while self._queue and len(entries) < self.max_batch:
+            entries.append(self._queue.popleft())
+
+        self.frames_sent += 1
+        self.follower.hub.frames_sent += 1
+        if len(entries) == 1:
+            return {"type": "log_entry", "payload": entries[0]}
+        return {"type": "logs_batch", "payload": entries}
+
+    async def send_to(self, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Send frames until the follower stops or the send fails"""
+        while True:
+            frame = await self.next_frame()
+            if frame is None:
+                return
+            await send(frame)
+
+    def close(self):
+        self.end()
+        self.follower.unsubscribe(self)
+
+
+class LogFollower:
+    """
+    Follows one container's logs while it has subscribers.
+
+    Recent entries are kept so new subscribers start with some context. When
+    the stream ends (the container stopped or restarted) it is resumed after
+    retry_interval from the last timestamp seen.
+    """
+
+    def __init__(self, hub: "LogHub", key: Tuple[str, str], provider: AsyncIsolationProvider,
+                 container_name: str, source: str):
+        self.hub = hub
+        self.key = key
+        self.provider = provider
+        self.container_name = container_name
+        self.source = source
+        self.subscribers: List[LogSubscription] = []
+        self.backlog: Deque[Dict[str, Any]] = deque(maxlen=hub.backlog)
+        self._task: Optional[asyncio.Task] = None
+        self._last_ns: Optional[int] = None
+        self.lines_received = 0
+
+    def subscribe(self) -> LogSubscription:
+        subscription = LogSubscription(self, self.hub.max_queue, self.hub.max_batch, self.hub.flush_interval)
+        for entry in self.backlog:
+            subscription.push(entry)
+        self.subscribers.append(subscription)
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription):
+        if subscription in self.subscribers:
+            self.subscribers.remove(subscription)
+        if not self.subscribers:
+            self.stop()
+
+    def stop(self):
+        """Close the upstream stream and forget this follower"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for subscription in self.subscribers:
+            subscription.end()
+        self.hub._followers.pop(self.key, None)
+
+    async def _run(self):
+        error_reported = False
+        while self.subscribers:
+            since = self._last_ns / 1e9 if self._last_ns is not None else None
+            lines = self.provider.stream_service_logs(
+                self.container_name, lines=self.hub.backlog if since is None else None,
+                follow=True, since=since, timestamps=True
+            )
+            try:
+                async for line in lines:
+                    timestamp_ns = parse_timestamp(line.timestamp)
+                    if timestamp_ns is not None:
+                        # Resuming from the last timestamp repeats lines already sent
+                        if self._last_ns is not None and timestamp_ns <= self._last_ns:
+                            continue
+                        self._last_ns = timestamp_ns
+                    self._publish(log_entry(line, self.source))
+                    error_reported = False
+            except Exception as e:
+                # Report a failing stream once, not on every retry
+                if not error_reported:
+                    error_reported = True
+                    self._publish({
+                        "id": f"error-{next(_entry_ids)}",
+                        "timestamp": None,
+                        "level": "error",
+                        "source": self.source,
+                        "message": f"[log stream error: {e}]",
+                        "metadata": {}
+                    })
+            finally:
+                await lines.aclose()
+            await asyncio.sleep(self.hub.retry_interval)
+
+    def _publish(self, entry: Dict[str, Any]):
+        self.lines_received += 1
+        self.backlog.append(entry)
+        for subscription in self.subscribers:
+            subscription.push(entry)
+
+
+class LogHub:
+    """Registry of log followers, keyed by (provider, container)"""
+
+    def __init__(self, max_queue: int = 1000, max_batch: int = 200, flush_interval: float = 0.05,
+                 backlog: int = 100, retry_interval: float = 2.0):
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.backlog = backlog
+        self.retry_interval = retry_interval
+        self._followers: Dict[Tuple[str, str], LogFollower] = {}
+        self.frames_sent = 0
+        self.lines_dropped = 0
+
+    def subscribe(self, provider: AsyncIsolationProvider, container_name: str,
+                  source: Optional[str] = None) -> LogSubscription:
+        """Subscribe to a container's logs, starting its follower if needed"""
+        key = (provider.provider_name, container_name)
+        follower = self._followers.get(key)
+        if follower is None:
+            follower = LogFollower(self, key, provider, container_name, source or container_name)
+            self._followers[key] = follower
+        return follower.subscribe()
+
+    def close(self):
+        """Stop every follower"""
+        for follower in list(self._followers.values()):
+            follower.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hub statistics"""
+        return {
+            "followers": len(self._followers),
+            "subscribers": sum(len(f.subscribers) for f in self._followers.values()),
+            "lines_received": sum(f.lines_received for f in self._followers.values()),
+            "frames_sent": self.frames_sent,
+            "lines_dropped": self.lines_dropped,
+        }
@@ -0,0 +1,160 @@
+"""
+Project update broadcasting for the Web Isolator 2.0 Control Plane
+Forwards project events from the in-process bus to /ws/projects clients,
+coalescing bursts per project so each client only gets what changed.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.events import EventBus, PROJECT_CREATED, PROJECT_UPDATED, PROJECT_DELETED
+
+
+class ProjectUpdateSubscription:
+    """
+    One client's pending project changes.
+
+    At most one message per project is pending: further updates merge into
+    it, and a project created and deleted before the flush is never sent.
+    Fields the client already has with the same value are left out.
+    """
+
+    def __init__(self, broadcaster: "ProjectUpdateBroadcaster", flush_interval: float):
+        self.broadcaster = broadcaster
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.events_coalesced = 0
+
+    def push(self, topic: str, payload: Dict[str, Any]):
+        project_id = payload["id"]
+        previous = self._pending.get(project_id)
+        if previous is None:
+            self._pending[project_id] = (topic, dict(payload))
+        else:
+            self.events_coalesced += 1
+            previous_topic, previous_payload = previous
+            if topic == PROJECT_UPDATED:
+                # A late update of a deleted project must not hide the deletion
+                if previous_topic != PROJECT_DELETED:
+                    previous_payload.update(payload)
+            elif topic == PROJECT_DELETED and previous_topic == PROJECT_CREATED:
+                del self._pending[project_id]
+            else:
+                self._pending[project_id] = (topic, dict(payload))
+        self._ready.set()
+
+    def end(self):
+        """The broadcaster shut down"""
+        self._closed = True
+        self._ready.set()
+
+    def _message(self, project_id: str, topic: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """WebSocket message for a pending change (None if the client already has it)"""
+        if topic == PROJECT_DELETED:
+            self._sent.pop(project_id, None)
+            return {"type": PROJECT_DELETED, "payload": {"projectId": project_id}}
+
+        sent = self._sent.setdefault(project_id, {})
+        if topic == PROJECT_UPDATED:
+            payload = {key: value for key, value in payload.items()
+                       if key == "id" or key not in sent or sent[key] != value}
+            if len(payload) == 1:
+                return None
+        sent.update(payload)
+        return {"type": topic, "payload": payload}
+
+    async def next_messages(self) -> Optional[List[Dict[str, Any]]]:
+        """Wait for the next batch of messages (None once the broadcaster has shut down)"""
+        while True:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._ready.clear()
+                await self._ready.wait()
+
+            # Let a burst of changes (e.g. every service of a project starting) settle
+            if self.flush_interval:
+                await asyncio.sleep(self.flush_interval)
+
+            pending, self._pending = self._pending, {}
+            messages = [message for message in (self._message(project_id, topic, payload)
+                                                 for project_id, (topic, payload) in pending.items())
+                        if message is not None]
+            if messages:
+                self.broadcaster.messages_sent += len(messages)
+                return messages
+
+    async def send_to(self, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Send messages until the broadcaster shuts down or the send fails"""
+        while True:
+            messages = await self.next_messages()
+            if messages is None:
+                return
+            for message in messages:
+                await send(message)
+
+    def close(self):
+        self.end()
+        self.broadcaster.unsubscribe(self)
+
+
+class ProjectUpdateBroadcaster:
+    """Bridges bus events, published on any thread, to subscriptions on the event loop"""
+
+    TOPICS = (PROJECT_CREATED, PROJECT_UPDATED, PROJECT_DELETED)
+
+    def __init__(self, flush_interval: float = 0.1):
+        self.flush_interval = flush_interval
+        self.subscribers: List[ProjectUpdateSubscription] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unsubscribes: List[Callable[[], None]] = []
+        self.events_received = 0
+        self.messages_sent = 0
+
+    def attach(self, bus: EventBus, loop: asyncio.AbstractEventLoop):
+        """Start receiving project events from bus, delivered on loop"""
+        self._loop = loop
+        self._unsubscribes = [bus.subscribe(topic, self._on_event) for topic in self.TOPICS]
+
+    def _on_event(self, topic: str, payload: Dict[str, Any]):
+        if not self.subscribers or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, topic, payload)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _dispatch(self, topic: str, payload: Dict[str, Any]):
+        self.events_received += 1
+        for subscription in self.subscribers:
+            subscription.push(topic, payload)
+
+    def subscribe(self) -> ProjectUpdateSubscription:
+        subscription = ProjectUpdateSubscription(self, self.flush_interval)
+        self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ProjectUpdateSubscription):
+        if subscription in self.subscribers:
+            self.subscribers.remove(subscription)
+
+    def close(self):
+        """Stop receiving events and end every subscription"""
+        for unsubscribe in self._unsubscribes:
+            unsubscribe()
+        self._unsubscribes = []
+        for subscription in list(self.subscribers):
+            subscription.end()
+        self.subscribers = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Get broadcaster statistics"""
+        return {
+            "subscribers": len(self.subscribers),
+            "events_received": self.events_received,
+            "events_coalesced": sum(s.events_coalesced for s in self.subscribers),
+            "messages_sent": self.messages_sent,
+        }
@@ -1,21 +1,31 @@
 """
 FastAPI server for Web Isolator 2.0 Control Plane
 """
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 import asyncio
+import sqlite3
 import sys
 import os
+import shutil
 from pathlib import Path
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from api.executors import (
+    InstrumentedExecutor, AsyncDatabaseManager, AsyncWorkspaceManager, AsyncProviderFactory
+)
+from api.log_hub import LogHub
+from api.project_updates import ProjectUpdateBroadcaster
+from core.metrics_store import MetricsStore
+from providers.logs import prefixed
+
 app = FastAPI(
     title="Web Isolator 2.0 Control Plane",
     description="API server for managing containerized development environments",
@@ -61,6 +71,12 @@ class EnvironmentVariableSet(BaseModel):
     is_secret: bool = False
 
 
+class EnvironmentVariablesBulkSet(BaseModel):
+    variables: Dict[str, str]
+    secret_keys: List[str] = []
+    replace: bool = False
+
+
 class WorkspaceImport(BaseModel):
     workspace_data: Dict[str, Any]
     overwrite: bool = False
@@ -70,28 +86,87 @@ class WorkspaceImport(BaseModel):
 database_manager = None
 workspace_manager = None
 provider_factory = None
+docker_provider = None
+metrics_store = None
+
+# Blocking work is kept off the event loop on dedicated pools:
+# SQLite calls on one, provider (docker) calls on another
+db_executor = InstrumentedExecutor("isolator-db", max_workers=8)
+provider_executor = InstrumentedExecutor("isolator-provider", max_workers=4)
+
+# One upstream log follower per container, shared by all WebSocket clients
+log_hub = LogHub()
+
+# Project changes published by the database, pushed to /ws/projects clients
+project_updates = ProjectUpdateBroadcaster()
 
 
 async def get_database():
-    """Dependency to get database manager"""
-    return database_manager
+    """Dependency to get the async database manager facade"""
+    if database_manager is None:
+        return None
+    return AsyncDatabaseManager(database_manager, db_executor)
 
 
 async def get_workspace_manager():
-    """Dependency to get workspace manager"""
-    return workspace_manager
+    """Dependency to get the async workspace manager facade"""
+    if workspace_manager is None:
+        return None
+    return AsyncWorkspaceManager(workspace_manager, db_executor)
 
 
 async def get_provider_factory():
-    """Dependency to get provider factory"""
-    return provider_factory
+    """Dependency to get the async provider factory facade"""
+    if provider_factory is None:
+        return None
+    return AsyncProviderFactory(provider_factory, provider_executor)
+
+
+def sync_project_status(project_name: str, status: str, project_id: Optional[str] = None):
+    """
+    Write a project status transition seen by the container state mirror to the database.
+    The update is published on the event bus like any other status change.
+    """
+    if database_manager is None:
+        return
+    if project_id:
+        project = database_manager.get_project(project_id)
+    else:
+        # Container without the project ID label: names are only unique per workspace
+        matches = database_manager.get_projects_by_names([project_name])
+        project = matches[0] if len(matches) == 1 else None
+    if project and project['status'] != status:
+        database_manager.update_project_status(project['id'], status)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated fields= projection parameter"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def is_paginated(limit: Optional[int], cursor: Optional[str], fields: Optional[str]) -> bool:
+    """Whether a list request asked for keyset pagination or projection"""
+    return limit is not None or cursor is not None or fields is not None
+
+
+def reject_counted_pages(with_counts: bool, limit: Optional[int], cursor: Optional[str], fields: Optional[str]):
+    """Counted listings are not paginated; refuse instead of silently ignoring limit/cursor/fields"""
+    if with_counts and is_paginated(limit, cursor, fields):
+        raise HTTPException(status_code=400, detail="with_counts cannot be combined with limit, cursor or fields")
+
+
+def page_response(rows: List[Dict[str, Any]], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """Build a paginated list response"""
+    return {"items": rows, "next_cursor": next_cursor}
 
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global database_manager, workspace_manager, provider_factory
+    global database_manager, workspace_manager, provider_factory, docker_provider, metrics_store
     
     try:
         # Import modules (with fallback)
@@ -107,6 +182,7 @@ async def startup_event():
         database_manager = DatabaseManager()
         workspace_manager = WorkspaceManager(database_manager)
         provider_factory = ProviderFactory()
+        project_updates.attach(database_manager.events, asyncio.get_running_loop())
         
         print("✅ Web Isolator 2.0 Control Plane started successfully")
         print(f"✅ Database: {database_manager.db_path}")
@@ -116,12 +192,45 @@ async def startup_event():
         for name, available in providers.items():
             status = "✅" if available else "❌"
             print(f"{status} Provider {name}: {'available' if available else 'unavailable'}")
+        
+        # Serve container status from memory and keep projects.status in sync
+        if providers.get('docker'):
+            provider = provider_factory.get_provider('docker')
+            docker_provider = provider
+            if provider.start_state_mirror(sync_project_status):
+                print("✅ Container state mirror running")
+            
+            # Container CPU/memory/IO from cgroups, for /api/system/stats and project stats
+            sampler = provider.start_resource_sampler()
+            print(f"✅ Resource sampler running (cgroup v{sampler.stats()['cgroup_version']}, "
+                  f"every {sampler.interval:g}s)")
+            
+            # Keep sampler history on disk for /api/projects/{id}/metrics
+            metrics_store = MetricsStore()
+            sampler.add_listener(metrics_store.record)
+            print(f"✅ Metrics store: {metrics_store.path}")
             
     except Exception as e:
         print(f"❌ Failed to initialize Control Plane: {e}")
         # Continue running in minimal mode
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker threads and pooled connections"""
+    log_hub.close()
+    project_updates.close()
+    db_executor.shutdown(wait=False)
+    provider_executor.shutdown(wait=False)
+    if docker_provider:
+        docker_provider.stop_resource_sampler()
+        docker_provider.stop_state_mirror()
+    if metrics_store:
+        metrics_store.close()
+    if database_manager:
+        database_manager.close()
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -136,9 +245,28 @@ async def health_check():
         }
     }
     
+    if database_manager:
+        status["database_pool"] = database_manager.get_pool_stats()
+    
+    status["executors"] = {
+        "database": db_executor.stats(),
+        "provider": provider_executor.stats()
+    }
+    
+    if docker_provider:
+        status["state_mirror"] = docker_provider.state_mirror_stats()
+        if docker_provider.resource_sampler:
+            status["resource_sampler"] = docker_provider.resource_sampler.stats()
+    
+    if metrics_store:
+        status["metrics_store"] = metrics_store.stats()
+    
+    status["log_hub"] = log_hub.stats()
+    status["project_updates"] = project_updates.stats()
+    
     if provider_factory:
         try:
-            status["providers"] = provider_factory.list_available_providers()
+            status["providers"] = await provider_executor.run(provider_factory.list_available_providers)
         except:
             status["providers"] = {}
     
@@ -147,14 +275,31 @@ async def health_check():
 
 # Workspace endpoints
 @app.get("/api/workspaces")
-async def list_workspaces(db=Depends(get_database)):
-    """List all workspaces"""
+async def list_workspaces(
+    with_counts: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_database)
+):
+    """
+    List all workspaces, optionally with project/service/running counts.
+    Passing limit, cursor or fields returns a keyset-paginated page instead
+    (not available with counts).
+    """
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
+    reject_counted_pages(with_counts, limit, cursor, fields)
     
     try:
-        workspaces = db.list_workspaces()
+        if with_counts:
+            return await db.list_workspaces_with_counts()
+        if is_paginated(limit, cursor, fields):
+            return page_response(*await db.list_workspaces_page(limit, cursor, parse_fields(fields)))
+        workspaces = await db.list_workspaces()
         return workspaces
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -166,8 +311,10 @@ async def create_workspace(workspace: WorkspaceCreate, db=Depends(get_database))
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        workspace_id = db.create_workspace(workspace.name, workspace.description)
+        workspace_id = await db.create_workspace(workspace.name, workspace.description)
         return {"id": workspace_id, "name": workspace.name, "description": workspace.description}
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Workspace '{workspace.name}' already exists")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -179,7 +326,7 @@ async def get_workspace(workspace_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        workspace = db.get_workspace(workspace_id)
+        workspace = await db.get_workspace(workspace_id)
         if not workspace:
             raise HTTPException(status_code=404, detail="Workspace not found")
         return workspace
@@ -196,7 +343,7 @@ async def get_current_workspace(db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        workspace = db.get_current_workspace()
+        workspace = await db.get_current_workspace()
         if not workspace:
             raise HTTPException(status_code=404, detail="No workspace found")
         return workspace
@@ -213,7 +360,7 @@ async def delete_workspace(workspace_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        db.delete_workspace(workspace_id)
+        await db.delete_workspace(workspace_id)
         return {"message": "Workspace deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -221,14 +368,32 @@ async def delete_workspace(workspace_id: str, db=Depends(get_database)):
 
 # Project endpoints
 @app.get("/api/projects")
-async def list_projects(workspace_id: Optional[str] = None, db=Depends(get_database)):
-    """List projects, optionally filtered by workspace"""
+async def list_projects(
+    workspace_id: Optional[str] = None,
+    with_counts: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_database)
+):
+    """
+    List projects, optionally filtered by workspace and with service counts.
+    Passing limit, cursor or fields returns a keyset-paginated page instead
+    (not available with counts).
+    """
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
+    reject_counted_pages(with_counts, limit, cursor, fields)
     
     try:
-        projects = db.list_projects(workspace_id)
+        if with_counts:
+            return await db.list_projects_with_counts(workspace_id)
+        if is_paginated(limit, cursor, fields):
+            return page_response(*await db.list_projects_page(workspace_id, limit, cursor, parse_fields(fields)))
+        projects = await db.list_projects(workspace_id)
         return projects
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -240,7 +405,7 @@ async def create_project(project: ProjectCreate, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        project_id = db.create_project(
+        project_id = await db.create_project(
             workspace_id=project.workspace_id,
             name=project.name,
             path=project.path,
@@ -253,6 +418,8 @@ async def create_project(project: ProjectCreate, db=Depends(get_database)):
             "path": project.path,
             "provider": project.provider
         }
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail=f"Project '{project.name}' already exists in this workspace")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -264,7 +431,7 @@ async def get_project(project_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        project = db.get_project_full_data(project_id)
+        project = await db.get_project_full_data(project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         return project
@@ -281,7 +448,7 @@ async def get_project_by_name(project_name: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        project = db.get_project_by_name(project_name)
+        project = await db.get_project_by_name(project_name)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         return project
@@ -302,7 +469,7 @@ async def update_project_status(project_id: str, status_update: Dict[str, str],
         if not status:
             raise HTTPException(status_code=400, detail="Status field is required")
         
-        db.update_project_status(project_id, status)
+        await db.update_project_status(project_id, status)
         return {"message": "Project status updated successfully"}
     except HTTPException:
         raise
@@ -317,7 +484,7 @@ async def delete_project(project_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        db.delete_project(project_id)
+        await db.delete_project(project_id)
         return {"message": "Project deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -325,17 +492,275 @@ async def delete_project(project_id: str, db=Depends(get_database)):
 
 # Service endpoints
 @app.get("/api/projects/{project_id}/services")
-async def list_services(project_id: str, db=Depends(get_database)):
-    """List services for a project"""
+async def list_services(
+    project_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_database)
+):
+    """
+    List services for a project.
+    Passing limit, cursor or fields returns a keyset-paginated page instead.
+    """
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        services = db.list_services(project_id)
+        if is_paginated(limit, cursor, fields):
+            return page_response(*await db.list_services_page(project_id, limit, cursor, parse_fields(fields)))
+        services = await db.list_services(project_id)
         return services
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/projects/{project_id}/services/status")
+async def get_project_services_status(project_id: str, db=Depends(get_database),
+                                      pf=Depends(get_provider_factory)):
+    """Live container status of every service in a project (one provider call)"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if not pf:
+        raise HTTPException(status_code=503, detail="Provider factory not available")
+
+    try:
+        project = await db.get_project(project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        services = await db.list_services(project_id)
+        container_names = [f"{project['name']}-{service['name']}" for service in services]
+
+        provider = await pf.get_provider(project['provider'])
+        infos = await provider.inspect_services(container_names)
+
+        return {
+            "project_id": project_id,
+            "services": [
+                {
+                    "id": service['id'],
+                    "name": service['name'],
+                    "container": container_name,
+                    "container_id": infos[container_name].service_id if infos[container_name] else None,
+                    "status": infos[container_name].status.value if infos[container_name] else "missing",
+                    "port_mappings": infos[container_name].port_mappings if infos[container_name] else {}
+                }
+                for service, container_name in zip(services, container_names)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/projects/{project_id}/logs")
+async def stream_project_logs(project_id: str, tail: Optional[int] = Query(100, ge=0),
+                              follow: bool = False, since: Optional[float] = None,
+                              format: str = Query("text", pattern="^(text|ndjson)$"),
+                              reorder_window: float = Query(0.5, ge=0, le=10),
+                              db=Depends(get_database), pf=Depends(get_provider_factory)):
+    """
+    Logs of all services of a project merged into one stream ordered by timestamp.
+    format=text prefixes every line with its service name; ndjson gives line objects.
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if not pf:
+        raise HTTPException(status_code=503, detail="Provider factory not available")
+
+    try:
+        project = await db.get_project(project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        services = await db.list_services(project_id)
+        provider = await pf.get_provider(project['provider'])
+
+        # Only services that have a container; there is nothing to stream without any
+        infos = await provider.inspect_services([f"{project['name']}-{service['name']}" for service in services])
+        services = [service for service in services if infos.get(f"{project['name']}-{service['name']}")]
+        if not services:
+            raise HTTPException(status_code=404, detail="No service containers found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    lines = provider.get_project_logs(project['name'], services, tail, follow=follow, since=since,
+                                      reorder_window=reorder_window)
+    width = max((len(service['name']) for service in services), default=0)
+
+    async def body():
+        # A disconnecting client cancels this generator, which closes every upstream stream
+        try:
+            async for line in lines:
+                if format == "text":
+                    yield prefixed(line, width) + "\n"
+                else:
+                    yield json.dumps(line.to_dict()) + "\n"
+        except Exception as e:
+            yield f"error: {e}\n" if format == "text" else json.dumps({"error": str(e)}) + "\n"
+        finally:
+            await lines.aclose()
+
+    media_type = "text/plain; charset=utf-8" if format == "text" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+@app.get("/api/services/{service_id}/logs")
+async def stream_service_logs(service_id: str, tail: Optional[int] = Query(100, ge=0),
+                              follow: bool = False, since: Optional[float] = None,
+                              until: Optional[float] = None, stdout: bool = True,
+                              stderr: bool = True, timestamps: bool = False,
+                              db=Depends(get_database), pf=Depends(get_provider_factory)):
+    """Stream a service's container logs as NDJSON, one line object per line (follow to keep tailing)"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if not pf:
+        raise HTTPException(status_code=503, detail="Provider factory not available")
+
+    try:
+        service = await db.get_service(service_id)
+        if not service:
+            raise HTTPException(status_code=404, detail="Service not found")
+        project = await db.get_project(service['project_id'])
+        container_name = f"{project['name']}-{service['name']}"
+
+        provider = await pf.get_provider(project['provider'])
+        if not await provider.service_exists(container_name):
+            raise HTTPException(status_code=404, detail="Service container not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    lines = provider.stream_service_logs(container_name, tail, follow=follow, since=since, until=until,
+                                         stdout=stdout, stderr=stderr, timestamps=timestamps)
+
+    async def body():
+        # A disconnecting client cancels this generator, which closes the upstream log stream
+        try:
+            async for line in lines:
+                yield json.dumps(line.to_dict()) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            await lines.aclose()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.get("/api/projects/{project_id}/stats")
+async def get_project_stats(project_id: str, window: int = Query(300, ge=1, le=86400),
+                            db=Depends(get_database)):
+    """CPU, memory, IO and pids of a project's containers: min/avg/max/p95 over the last window seconds"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    sampler = docker_provider.resource_sampler if docker_provider else None
+    if sampler is None:
+        raise HTTPException(status_code=503, detail="Resource sampler not running")
+
+    try:
+        project = await db.get_project(project_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    stats = sampler.project_stats(project['name'], window) or {"samples": 0, "metrics": {}, "services": []}
+    return dict(stats, project_id=project_id, window=window)
+
+
+@app.get("/api/projects/{project_id}/metrics")
+async def get_project_metrics(project_id: str, start: Optional[float] = None, end: Optional[float] = None,
+                              step: float = Query(60, gt=0), service: Optional[str] = None,
+                              metrics: Optional[str] = None, db=Depends(get_database)):
+    """Stored CPU, memory and network history of a project's services between start and end (unix seconds)"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if metrics_store is None:
+        raise HTTPException(status_code=503, detail="Metrics store not running")
+
+    try:
+        project = await db.get_project(project_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    names = [name.strip() for name in metrics.split(",") if name.strip()] if metrics else None
+    try:
+        history = await db_executor.run(metrics_store.query, project['name'], service, start, end, step, names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return dict(history, project_id=project_id)
+
+
+async def serve_websocket(websocket: WebSocket, send_loop):
+    """Run send_loop until it ends or the client disconnects (client messages are ignored)"""
+    async def receive_until_disconnect():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    sender = asyncio.ensure_future(send_loop)
+    receiver = asyncio.ensure_future(receive_until_disconnect())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender in done and sender.exception() is None:
+            await websocket.close()
+    finally:
+        sender.cancel()
+        receiver.cancel()
+
+
+@app.websocket("/ws/projects")
+async def websocket_projects(websocket: WebSocket):
+    """Project changes as project_created / project_updated / project_deleted messages"""
+    await websocket.accept()
+    if database_manager is None:
+        await websocket.close(code=1011, reason="Control plane not ready")
+        return
+
+    subscription = project_updates.subscribe()
+    try:
+        await serve_websocket(websocket, subscription.send_to(websocket.send_json))
+    finally:
+        subscription.close()
+
+
+@app.websocket("/ws/logs/{project_id}/{service}")
+async def websocket_logs(websocket: WebSocket, project_id: str, service: str):
+    """Live logs of a project service, as log_entry / logs_batch messages"""
+    await websocket.accept()
+    db = await get_database()
+    pf = await get_provider_factory()
+    if not db or not pf:
+        await websocket.close(code=1011, reason="Control plane not ready")
+        return
+
+    project = await db.get_project(project_id)
+    if not project:
+        await websocket.close(code=1008, reason="Project not found")
+        return
+    if not any(s['name'] == service for s in await db.list_services(project_id)):
+        await websocket.close(code=1008, reason="Service not found")
+        return
+
+    provider = await pf.get_provider(project['provider'])
+    subscription = log_hub.subscribe(provider, f"{project['name']}-{service}", source=service)
+    try:
+        await serve_websocket(websocket, subscription.send_to(websocket.send_json))
+    finally:
+        subscription.close()
+
 
 @app.post("/api/projects/{project_id}/services")
 async def create_service(project_id: str, service: ServiceCreate, db=Depends(get_database)):
@@ -344,7 +769,7 @@ async def create_service(project_id: str, service: ServiceCreate, db=Depends(get
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        service_id = db.create_service(
+        service_id = await db.create_service(
             project_id=project_id,
             name=service.name,
             service_type=service.type,
@@ -355,8 +780,8 @@ async def create_service(project_id: str, service: ServiceCreate, db=Depends(get
         )
         
         # Set environment variables
-        for key, value in service.environment.items():
-            db.set_environment_variable(service_id, key, value)
+        if service.environment:
+            await db.set_environment_variables(service_id, service.environment)
         
         return {"id": service_id, **service.dict()}
     except Exception as e:
@@ -371,7 +796,7 @@ async def get_environment_variables(service_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        env_vars = db.get_environment_variables(service_id)
+        env_vars = await db.get_environment_variables(service_id)
         return env_vars
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -384,12 +809,31 @@ async def set_environment_variable(service_id: str, env_var: EnvironmentVariable
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        db.set_environment_variable(service_id, env_var.key, env_var.value, env_var.is_secret)
+        await db.set_environment_variable(service_id, env_var.key, env_var.value, env_var.is_secret)
         return {"message": "Environment variable set successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.put("/api/services/{service_id}/environment")
+async def set_environment_variables(service_id: str, env_vars: EnvironmentVariablesBulkSet,
+                                    db=Depends(get_database)):
+    """Set many environment variables at once (e.g. a whole env editor form)"""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    
+    try:
+        count = await db.set_environment_variables(
+            service_id,
+            env_vars.variables,
+            env_vars.secret_keys,
+            replace=env_vars.replace
+        )
+        return {"message": "Environment variables set successfully", "count": count}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.delete("/api/services/{service_id}/environment/{key}")
 async def delete_environment_variable(service_id: str, key: str, db=Depends(get_database)):
     """Delete an environment variable"""
@@ -397,7 +841,7 @@ async def delete_environment_variable(service_id: str, key: str, db=Depends(get_
         raise HTTPException(status_code=503, detail="Database not available")
     
     try:
-        db.delete_environment_variable(service_id, key)
+        await db.delete_environment_variable(service_id, key)
         return {"message": "Environment variable deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -415,7 +859,7 @@ async def export_workspace(
         raise HTTPException(status_code=503, detail="Workspace manager not available")
     
     try:
-        workspace_data = wm.export_workspace(workspace_id, include_secrets)
+        workspace_data = await wm.export_workspace(workspace_id, include_secrets)
         return workspace_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -428,13 +872,15 @@ async def import_workspace(import_data: WorkspaceImport, wm=Depends(get_workspac
         raise HTTPException(status_code=503, detail="Workspace manager not available")
     
     try:
-        workspace_id, project_count = wm.import_workspace(
+        workspace_id, project_count, report = await wm.import_workspace(
             import_data.workspace_data,
             import_data.overwrite
         )
         return {
             "workspace_id": workspace_id,
             "project_count": project_count,
+            "timings": report["timings"],
+            "warnings": report["warnings"],
             "message": "Workspace imported successfully"
         }
     except Exception as e:
@@ -460,6 +906,65 @@ async def validate_workspace(workspace_data: Dict[str, Any]):
         return {"valid": False, "errors": [str(e)]}
 
 
+# System endpoints
+@app.get("/api/system/stats")
+async def get_system_stats(window: int = Query(300, ge=1, le=86400), db=Depends(get_database)):
+    """
+    Project counts, host resources and port usage for the dashboard, plus the
+    usage of all managed containers (min/avg/max/p95 over the last window seconds).
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+
+    try:
+        projects = await db.list_projects()
+        ports = await db.list_service_ports()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    sampler = docker_provider.resource_sampler if docker_provider else None
+    containers = sampler.system_stats(window) if sampler else None
+    host = containers["host"]["metrics"] if containers else {}
+    cpu = host.get("cpu_percent")
+    memory_used = host.get("memory_used_bytes")
+    memory_total = containers["memory_total"] if containers else None
+    disk = shutil.disk_usage(str(Path.home()))
+
+    port_projects: Dict[int, List[str]] = {}
+    for row in ports:
+        names = port_projects.setdefault(row['port'], [])
+        if row['project_name'] not in names:
+            names.append(row['project_name'])
+
+    statuses = [project['status'] for project in projects]
+    return {
+        "totalProjects": len(projects),
+        "runningProjects": statuses.count("running"),
+        "stoppedProjects": statuses.count("stopped"),
+        "errorProjects": statuses.count("error"),
+        "buildingProjects": statuses.count("building"),
+        "systemResources": {
+            "cpu": {"usage": cpu["last"] if cpu else 0.0, "cores": os.cpu_count() or 1},
+            "memory": {
+                "used": memory_used["last"] if memory_used else 0,
+                "total": memory_total or 0,
+                "available": (memory_total - memory_used["last"]) if memory_total and memory_used else 0,
+            },
+            "disk": {"used": disk.used, "total": disk.total, "available": disk.free},
+        },
+        "networkPorts": {
+            "used": sorted(port_projects),
+            "available": [],
+            "conflicts": [
+                {"port": port, "projects": names}
+                for port, names in sorted(port_projects.items()) if len(names) > 1
+            ],
+        },
+        "containers": containers,
+        "window": window,
+    }
+
+
 # Provider management endpoints
 @app.get("/api/providers")
 async def list_providers(pf=Depends(get_provider_factory)):
@@ -468,7 +973,7 @@ async def list_providers(pf=Depends(get_provider_factory)):
         raise HTTPException(status_code=503, detail="Provider factory not available")
     
     try:
-        providers = pf.list_available_providers()
+        providers = await pf.list_available_providers()
         return providers
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -481,8 +986,8 @@ async def provider_health_check(provider_name: str, pf=Depends(get_provider_fact
         raise HTTPException(status_code=503, detail="Provider factory not available")
     
     try:
-        provider = pf.get_provider(provider_name)
-        health = provider.health_check()
+        provider = await pf.get_provider(provider_name)
+        health = await provider.health_check()
         return health
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -84,8 +84,10 @@ def create(
             )
             
             # Frontend 환경변수 설정
-            db.set_environment_variable(frontend_service_id, "NODE_ENV", "development")
-            db.set_environment_variable(frontend_service_id, "REACT_APP_API_URL", f"http://api.{project_name}.local")
+            db.set_environment_variables(frontend_service_id, {
+                "NODE_ENV": "development",
+                "REACT_APP_API_URL": f"http://api.{project_name}.local",
+            })
         
         if template in ["fastapi", "fullstack"]:
             # Backend 서비스 생성
@@ -98,8 +100,10 @@ def create(
             )
             
             # Backend 환경변수 설정 
-            db.set_environment_variable(backend_service_id, "ENVIRONMENT", "development")
-            db.set_environment_variable(backend_service_id, "SECRET_KEY", "dev-secret-key", is_secret=True)
+            db.set_environment_variables(backend_service_id, {
+                "ENVIRONMENT": "development",
+                "SECRET_KEY": "dev-secret-key",
+            }, secret_keys=["SECRET_KEY"])
         
         # 네트워크 생성
         db.create_network(project_id, f"{project_name}-network")
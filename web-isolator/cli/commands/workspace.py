@@ -91,7 +91,7 @@ def import_workspace(
             raise typer.Exit(1)
         
         # 워크스페이스 가져오기
-        workspace_id, project_count = workspace_manager.import_from_file(
+        workspace_id, project_count, report = workspace_manager.import_from_file(
             file_path=input_file,
             overwrite=overwrite
         )
@@ -100,6 +100,9 @@ def import_workspace(
         console.print(f"[dim]🆔 Workspace ID: {workspace_id}[/dim]")
         console.print(f"[dim]📊 가져온 프로젝트: {project_count}개[/dim]")
         
+        timings = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in report['timings'].items())
+        console.print(f"[dim]⏱️  소요 시간: {timings}[/dim]")
+        
         console.print("\\n[bold]다음 단계:[/bold]")
         console.print("1. isolator init list - 가져온 프로젝트 확인")
         console.print("2. isolator up - 프로젝트 실행")
@@ -179,7 +182,7 @@ def list():
         config_manager = ConfigManager()
         db = config_manager.db
         
-        workspaces = db.list_workspaces()
+        workspaces = db.list_workspaces_with_counts()
         
         if not workspaces:
             console.print("[yellow]등록된 워크스페이스가 없습니다.[/yellow]")
@@ -194,13 +197,10 @@ def list():
         table.add_column("생성일", style="dim")
         
         for workspace in workspaces:
-            projects = db.list_projects(workspace['id'])
-            project_count = len(projects)
-            
             table.add_row(
                 workspace['name'],
                 workspace.get('description', ''),
-                str(project_count),
+                str(workspace['project_count']),
                 workspace.get('created_at', 'Unknown')[:10]  # Date only
             )
         
@@ -221,8 +221,7 @@ def info(
         
         if workspace_name:
             # 이름으로 워크스페이스 찾기
-            workspaces = db.list_workspaces()
-            workspace = next((w for w in workspaces if w['name'] == workspace_name), None)
+            workspace = db.get_workspace_by_name(workspace_name)
             if not workspace:
                 console.print(f"[red]워크스페이스 '{workspace_name}'을 찾을 수 없습니다.[/red]")
                 raise typer.Exit(1)
@@ -241,7 +240,7 @@ def info(
         console.print(f"수정일: {workspace.get('updated_at', 'Unknown')}")
         
         # 프로젝트 목록
-        projects = db.list_projects(workspace['id'])
+        projects = db.list_projects_with_counts(workspace['id'])
         console.print(f"\\n[bold]프로젝트 ({len(projects)}개):[/bold]")
         
         if not projects:
@@ -253,8 +252,7 @@ def info(
                 console.print(f"    경로: {project['path']}")
                 
                 # 서비스 수 표시
-                services = db.list_services(project['id'])
-                console.print(f"    서비스: {len(services)}개")
+                console.print(f"    서비스: {project['service_count']}개")
         
     except Exception as e:
         console.print(f"[bold red]❌ 워크스페이스 정보 조회 실패: {e}[/bold red]")
@@ -0,0 +1,155 @@
+"""
+SQLite connection pool for Web Isolator 2.0
+Keeps a bounded set of configured connections open so database calls do not
+pay connect/PRAGMA setup on every operation.
+"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+# Default PRAGMAs applied to every pooled connection.
+# WAL lets readers proceed while a writer holds the database, and
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "cache_size": -16384,      # negative value = KiB (16 MiB page cache)
+    "mmap_size": 268435456,    # 256 MiB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,      # milliseconds
+}
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections"""
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 30.0,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = str(db_path)
+        # An in-memory database is private to its connection, so it can only be shared
+        self.max_size = 1 if self.db_path == ":memory:" else max(1, max_size)
+        self.timeout = timeout
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        # Pool statistics
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening one if below capacity"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+                self._misses += 1
+
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # Pool exhausted: wait for a connection to be released
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"Timed out after {self.timeout}s waiting for a database connection"
+            )
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._waits += 1
+            self._wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows a connection for the duration of the block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close all idle connections and refuse new acquisitions"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics"""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "open_connections": self._created,
+                "idle_connections": self._idle.qsize(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "total_wait_time": self._wait_time,
+                "avg_wait_time": self._wait_time / self._waits if self._waits else 0.0,
+                "max_wait_time": self._max_wait_time,
+            }
@@ -3,125 +3,136 @@ Database manager for Web Isolator 2.0
 Provides SQLite-based storage for workspaces, projects, services, and environment variables.
 """
 import sqlite3
+import base64
 import json
 import os
+import threading
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from contextlib import contextmanager
 
 from .encryption import SecretManager
+from .connection_pool import ConnectionPool
+from .migrations import migrate
+from .events import EventBus, PROJECT_CREATED, PROJECT_UPDATED, PROJECT_DELETED
+
+
+class _NestedConnection:
+    """
+    A pooled connection as seen by a nested _get_connection() user.
+    Its work runs in a savepoint, so commit() and rollback() only end the
+    savepoint; the outermost user still commits or rolls back the transaction.
+    """
+    
+    def __init__(self, conn: sqlite3.Connection, savepoint: str):
+        self._conn = conn
+        self._savepoint = savepoint
+        self._open = True
+        conn.execute(f"SAVEPOINT {savepoint}")
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+    
+    def commit(self):
+        # Nothing to end if an error already rolled back the whole transaction
+        if self._open and self._conn.in_transaction:
+            self._open = False
+            self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
+    
+    def rollback(self):
+        if self._open and self._conn.in_transaction:
+            self._open = False
+            self._conn.execute(f"ROLLBACK TO SAVEPOINT {self._savepoint}")
+            self._conn.execute(f"RELEASE SAVEPOINT {self._savepoint}")
 
 
 class DatabaseManager:
     """Central database manager for all Web Isolator configuration data"""
     
-    def __init__(self, db_path: Optional[str] = None):
+    # Keep IN (...) lists below SQLite's default host parameter limit
+    MAX_BATCH_PARAMS = 900
+    
+    # Columns that may be requested through field projection
+    TABLE_COLUMNS = {
+        'workspaces': ('id', 'name', 'description', 'created_at', 'updated_at'),
+        'projects': ('id', 'workspace_id', 'name', 'path', 'provider', 'status',
+                     'metadata', 'created_at', 'updated_at'),
+        'services': ('id', 'project_id', 'name', 'type', 'port', 'image', 'dockerfile_path',
+                     'command', 'metadata', 'created_at', 'updated_at'),
+    }
+    
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 8,
+                 events: Optional[EventBus] = None):
         if db_path is None:
             isolator_dir = Path.home() / ".isolator"
             isolator_dir.mkdir(exist_ok=True)
             db_path = str(isolator_dir / "isolator.db")
         
         self.db_path = str(db_path)
-        self.secret_manager = SecretManager()
+        self._secret_manager: Optional[SecretManager] = None
+        self._secret_manager_lock = threading.Lock()
+        self._pool = ConnectionPool(self.db_path, max_size=pool_size)
+        self._local = threading.local()
+        self.events = events or EventBus()
         self._init_database()
     
     def _init_database(self):
-        """Initialize database with required tables"""
+        """Apply pending schema migrations (a single version check when up to date)"""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Workspaces table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS workspaces (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Projects table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS projects (
-                    id TEXT PRIMARY KEY,
-                    workspace_id TEXT,
-                    name TEXT NOT NULL,
-                    path TEXT NOT NULL,
-                    provider TEXT DEFAULT 'docker',
-                    status TEXT DEFAULT 'stopped',
-                    metadata TEXT DEFAULT '{}',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (workspace_id) REFERENCES workspaces(id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Services table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS services (
-                    id TEXT PRIMARY KEY,
-                    project_id TEXT,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    port INTEGER,
-                    image TEXT,
-                    dockerfile_path TEXT,
-                    command TEXT,
-                    metadata TEXT DEFAULT '{}',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Environment variables table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS environment_variables (
-                    id TEXT PRIMARY KEY,
-                    service_id TEXT,
-                    key TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    is_secret BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Networks table (for Docker network management)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS networks (
-                    id TEXT PRIMARY KEY,
-                    project_id TEXT,
-                    name TEXT NOT NULL,
-                    driver TEXT DEFAULT 'bridge',
-                    subnet TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
-                )
-            """)
-            
-            # Create indexes for better performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_workspace ON projects(workspace_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_services_project ON services(project_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_envvars_service ON environment_variables(service_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_networks_project ON networks(project_id)")
-            
-            conn.commit()
+            migrate(conn)
+    
+    @property
+    def secret_manager(self) -> SecretManager:
+        """Secret manager, created on first use so plain reads skip key loading"""
+        if self._secret_manager is None:
+            with self._secret_manager_lock:
+                if self._secret_manager is None:
+                    self._secret_manager = SecretManager()
+        return self._secret_manager
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+        """
+        Context manager for pooled database connections.
+        Nested calls on the same thread reuse the connection already borrowed,
+        inside a savepoint: their commit() keeps the outer transaction open and
+        their rollback() or an exception only undoes their own statements.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            nested = _NestedConnection(conn, f"nested_{self._local.depth}")
+            try:
+                yield nested
+            except BaseException:
+                nested.rollback()
+                raise
+            else:
+                # Reads only, or writes left for the outer user to commit
+                nested.commit()
+            finally:
+                self._local.depth -= 1
+            return
+        
+        conn = self._pool.acquire()
+        self._local.conn = conn
+        self._local.depth = 1
         try:
             yield conn
         finally:
-            conn.close()
+            self._local.conn = None
+            self._local.depth = 0
+            self._pool.release(conn)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics (hits, misses, wait time)"""
+        return self._pool.stats()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self._pool.close()
     
     def _generate_id(self) -> str:
         """Generate a unique ID"""
@@ -148,6 +159,14 @@ class DatabaseManager:
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def get_workspace_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get workspace by name"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM workspaces WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
     def get_current_workspace(self) -> Optional[Dict[str, Any]]:
         """Get the current/default workspace"""
         with self._get_connection() as conn:
@@ -163,6 +182,44 @@ class DatabaseManager:
             cursor.execute("SELECT * FROM workspaces ORDER BY name")
             return [dict(row) for row in cursor.fetchall()]
     
+    def list_workspaces_with_counts(self) -> List[Dict[str, Any]]:
+        """List all workspaces with project, service and running project counts"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT w.*,
+                       COUNT(p.id) AS project_count,
+                       COALESCE(SUM(p.service_count), 0) AS service_count,
+                       COALESCE(SUM(p.status = 'running'), 0) AS running_count
+                FROM workspaces w
+                LEFT JOIN (
+                    SELECT pr.id, pr.workspace_id, pr.status, COUNT(s.id) AS service_count
+                    FROM projects pr
+                    LEFT JOIN services s ON s.project_id = pr.id
+                    GROUP BY pr.id
+                ) p ON p.workspace_id = w.id
+                GROUP BY w.id
+                ORDER BY w.name
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def list_projects_with_counts(self, workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List projects with their service counts, optionally filtered by workspace"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            query = """
+                SELECT p.*, COUNT(s.id) AS service_count
+                FROM projects p
+                LEFT JOIN services s ON s.project_id = p.id
+            """
+            params: tuple = ()
+            if workspace_id:
+                query += " WHERE p.workspace_id = ?"
+                params = (workspace_id,)
+            query += " GROUP BY p.id ORDER BY p.name"
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
     # Project operations
     def create_project(self, workspace_id: str, name: str, path: str, 
                       provider: str = "docker") -> str:
@@ -175,6 +232,10 @@ class DatabaseManager:
                 VALUES (?, ?, ?, ?, ?)
             """, (project_id, workspace_id, name, path, provider))
             conn.commit()
+        self.events.publish(PROJECT_CREATED, {
+            "id": project_id, "workspace_id": workspace_id, "name": name,
+            "path": path, "provider": provider, "status": "stopped"
+        })
         return project_id
     
     def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
@@ -185,14 +246,36 @@ class DatabaseManager:
             row = cursor.fetchone()
             return dict(row) if row else None
     
-    def get_project_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """Get project by name"""
+    def get_project_by_name(self, name: str, workspace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get project by name, optionally scoped to a workspace"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM projects WHERE name = ?", (name,))
+            if workspace_id:
+                cursor.execute("SELECT * FROM projects WHERE name = ? AND workspace_id = ?",
+                               (name, workspace_id))
+            else:
+                cursor.execute("SELECT * FROM projects WHERE name = ?", (name,))
             row = cursor.fetchone()
             return dict(row) if row else None
     
+    def get_projects_by_names(self, names: List[str],
+                              workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all projects whose name is in names, optionally scoped to a workspace"""
+        projects = []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(names), self.MAX_BATCH_PARAMS):
+                chunk = names[start:start + self.MAX_BATCH_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                query = f"SELECT * FROM projects WHERE name IN ({placeholders})"
+                params = list(chunk)
+                if workspace_id:
+                    query += " AND workspace_id = ?"
+                    params.append(workspace_id)
+                cursor.execute(query, params)
+                projects.extend(dict(row) for row in cursor.fetchall())
+        return projects
+    
     def list_projects(self, workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List projects, optionally filtered by workspace"""
         with self._get_connection() as conn:
@@ -213,6 +296,9 @@ class DatabaseManager:
                 WHERE id = ?
             """, (status, project_id))
             conn.commit()
+            updated = cursor.rowcount
+        if updated:
+            self.events.publish(PROJECT_UPDATED, {"id": project_id, "status": status})
     
     # Service operations
     def create_service(self, project_id: str, name: str, service_type: str,
@@ -245,36 +331,64 @@ class DatabaseManager:
             cursor.execute("SELECT * FROM services WHERE project_id = ? ORDER BY name", (project_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def list_service_ports(self) -> List[Dict[str, Any]]:
+        """Port of every service that has one, with its project's name"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.port, s.name AS service_name, p.id AS project_id, p.name AS project_name
+                FROM services s JOIN projects p ON p.id = s.project_id
+                WHERE s.port IS NOT NULL
+                ORDER BY s.port
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
     # Environment variable operations
     def set_environment_variable(self, service_id: str, key: str, value: str, is_secret: bool = False):
         """Set an environment variable for a service"""
-        # Encrypt value if it's a secret
-        stored_value = self.secret_manager.encrypt(value) if is_secret else value
+        self.set_environment_variables(service_id, {key: value}, [key] if is_secret else None)
+    
+    def set_environment_variables(self, service_id: str, mapping: Dict[str, str],
+                                  secret_keys: Optional[List[str]] = None,
+                                  replace: bool = False) -> int:
+        """
+        Set many environment variables for a service in one transaction.
+        Keys listed in secret_keys are encrypted. With replace=True, variables
+        not present in mapping are deleted.
+        """
+        secret_keys = set(secret_keys or [])
+        rows = []
+        for key, value in mapping.items():
+            is_secret = key in secret_keys
+            # Encrypt value if it's a secret
+            stored_value = self.secret_manager.encrypt(value) if is_secret else value
+            rows.append((self._generate_id(), service_id, key, stored_value, is_secret))
         
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            # Check if variable already exists
-            cursor.execute("""
-                SELECT id FROM environment_variables 
-                WHERE service_id = ? AND key = ?
-            """, (service_id, key))
-            
-            if cursor.fetchone():
-                # Update existing
-                cursor.execute("""
-                    UPDATE environment_variables 
-                    SET value = ?, is_secret = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE service_id = ? AND key = ?
-                """, (stored_value, is_secret, service_id, key))
-            else:
-                # Create new
-                var_id = self._generate_id()
-                cursor.execute("""
-                    INSERT INTO environment_variables (id, service_id, key, value, is_secret)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (var_id, service_id, key, stored_value, is_secret))
+            if replace:
+                # Diff against the stored keys, so no statement has more parameters than a batch
+                cursor.execute("SELECT key FROM environment_variables WHERE service_id = ?", (service_id,))
+                stale = [row['key'] for row in cursor.fetchall() if row['key'] not in mapping]
+                for start in range(0, len(stale), self.MAX_BATCH_PARAMS):
+                    chunk = stale[start:start + self.MAX_BATCH_PARAMS]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cursor.execute(f"""
+                        DELETE FROM environment_variables
+                        WHERE service_id = ? AND key IN ({placeholders})
+                    """, (service_id, *chunk))
             
+            cursor.executemany("""
+                INSERT INTO environment_variables (id, service_id, key, value, is_secret)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(service_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    is_secret = excluded.is_secret,
+                    updated_at = CURRENT_TIMESTAMP
+            """, rows)
             conn.commit()
+        
+        return len(rows)
     
     def get_environment_variables(self, service_id: str) -> Dict[str, str]:
         """Get all environment variables for a service (decrypted)"""
@@ -287,17 +401,20 @@ class DatabaseManager:
             
             env_vars = {}
             for row in cursor.fetchall():
-                key, value, is_secret = row['key'], row['value'], row['is_secret']
-                if is_secret:
-                    try:
-                        value = self.secret_manager.decrypt(value)
-                    except Exception:
-                        # If decryption fails, use placeholder
-                        value = "***ENCRYPTED***"
-                env_vars[key] = value
+                env_vars[row['key']] = self._decode_env_value(row['value'], row['is_secret'])
             
             return env_vars
     
+    def _decode_env_value(self, value: str, is_secret: bool) -> str:
+        """Decrypt a stored environment variable value if it is a secret"""
+        if not is_secret:
+            return value
+        try:
+            return self.secret_manager.decrypt(value)
+        except Exception:
+            # If decryption fails, use placeholder
+            return "***ENCRYPTED***"
+    
     def delete_environment_variable(self, service_id: str, key: str):
         """Delete an environment variable"""
         with self._get_connection() as conn:
@@ -329,23 +446,182 @@ class DatabaseManager:
             cursor.execute("SELECT * FROM networks WHERE project_id = ?", (project_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    # Keyset pagination
+    def list_workspaces_page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                             fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of workspaces ordered by (name, id)"""
+        return self._list_page('workspaces', None, (), limit, cursor, fields)
+    
+    def list_projects_page(self, workspace_id: Optional[str] = None, limit: Optional[int] = None,
+                           cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of projects ordered by (name, id), optionally filtered by workspace"""
+        if workspace_id:
+            return self._list_page('projects', "workspace_id = ?", (workspace_id,), limit, cursor, fields)
+        return self._list_page('projects', None, (), limit, cursor, fields)
+    
+    def list_services_page(self, project_id: str, limit: Optional[int] = None,
+                           cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of a project's services ordered by (name, id)"""
+        return self._list_page('services', "project_id = ?", (project_id,), limit, cursor, fields)
+    
+    def iter_projects(self, workspace_id: Optional[str] = None, fields: Optional[List[str]] = None,
+                      batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over projects in (name, id) order, fetching batch_size rows at a time.
+        No connection is held between batches.
+        """
+        cursor = None
+        while True:
+            rows, cursor = self.list_projects_page(workspace_id, batch_size, cursor, fields)
+            yield from rows
+            if cursor is None:
+                return
+    
+    def _list_page(self, table: str, where: Optional[str], params: tuple, limit: Optional[int],
+                   cursor: Optional[str], fields: Optional[List[str]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch rows after the cursor position; returns (rows, next_cursor)"""
+        columns = self._projection(table, fields)
+        conditions = [where] if where else []
+        query_params = list(params)
+        
+        if cursor:
+            after_name, after_id = self._decode_cursor(cursor)
+            conditions.append("(name, id) > (?, ?)")
+            query_params.extend([after_name, after_id])
+        
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY name, id"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            query += " LIMIT ?"
+            query_params.append(limit + 1)
+        
+        with self._get_connection() as conn:
+            rows = [dict(row) for row in conn.execute(query, query_params).fetchall()]
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]['name'], rows[-1]['id'])
+        
+        # Drop key columns that were only selected for the cursor
+        if fields:
+            extra = {'id', 'name'} - set(fields)
+            for row in rows:
+                for column in extra:
+                    del row[column]
+        
+        return rows, next_cursor
+    
+    def _projection(self, table: str, fields: Optional[List[str]]) -> List[str]:
+        """Validate requested fields and return the columns to select"""
+        allowed = self.TABLE_COLUMNS[table]
+        if not fields:
+            return list(allowed)
+        
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields for {table}: {', '.join(unknown)}")
+        
+        # name and id are always needed to build the next cursor
+        columns = ['id', 'name']
+        columns.extend(field for field in fields if field not in columns)
+        return columns
+    
+    @staticmethod
+    def _encode_cursor(name: str, row_id: str) -> str:
+        """Encode a (name, id) keyset position as an opaque cursor"""
+        raw = json.dumps([name, row_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a cursor produced by _encode_cursor"""
+        try:
+            name, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return name, row_id
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+    
     # Utility methods
     def get_project_full_data(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get project with all related services and environment variables"""
-        project = self.get_project(project_id)
-        if not project:
-            return None
-        
-        project['services'] = []
-        services = self.list_services(project_id)
-        
-        for service in services:
-            service['environment'] = self.get_environment_variables(service['id'])
-            project['services'].append(service)
+        projects = self._load_full_projects("id = ?", (project_id,))
+        return projects[0] if projects else None
+    
+    def get_projects_full_data(self, project_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get several projects with related data using a fixed number of queries per batch"""
+        projects = []
+        for start in range(0, len(project_ids), self.MAX_BATCH_PARAMS):
+            chunk = project_ids[start:start + self.MAX_BATCH_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            projects.extend(self._load_full_projects(f"id IN ({placeholders})", tuple(chunk)))
+        projects.sort(key=lambda p: p['name'])
+        return projects
+    
+    def get_workspace_full_data(self, workspace_id: str) -> List[Dict[str, Any]]:
+        """Get every project in a workspace with related data in four queries"""
+        return self._load_full_projects("workspace_id = ?", (workspace_id,))
+    
+    def _load_full_projects(self, where: str, params: tuple) -> List[Dict[str, Any]]:
+        """
+        Hydrate projects matching a WHERE clause on the projects table.
+        Loads projects, services, environment variables and networks with one
+        query each and groups the rows in Python.
+        """
+        project_ids_sql = f"SELECT id FROM projects WHERE {where}"
         
-        project['networks'] = self.list_networks(project_id)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f"SELECT * FROM projects WHERE {where} ORDER BY name", params)
+            projects = [dict(row) for row in cursor.fetchall()]
+            if not projects:
+                return []
+            
+            by_project: Dict[str, Dict[str, Any]] = {}
+            for project in projects:
+                project['services'] = []
+                project['networks'] = []
+                by_project[project['id']] = project
+            
+            cursor.execute(f"""
+                SELECT * FROM services
+                WHERE project_id IN ({project_ids_sql})
+                ORDER BY name
+            """, params)
+            by_service: Dict[str, Dict[str, Any]] = {}
+            for row in cursor.fetchall():
+                service = dict(row)
+                service['environment'] = {}
+                by_service[service['id']] = service
+                by_project[service['project_id']]['services'].append(service)
+            
+            if by_service:
+                cursor.execute(f"""
+                    SELECT e.service_id, e.key, e.value, e.is_secret
+                    FROM environment_variables e
+                    JOIN services s ON s.id = e.service_id
+                    WHERE s.project_id IN ({project_ids_sql})
+                    ORDER BY e.rowid
+                """, params)
+                for row in cursor.fetchall():
+                    by_service[row['service_id']]['environment'][row['key']] = \
+                        self._decode_env_value(row['value'], row['is_secret'])
+            
+            cursor.execute(f"""
+                SELECT * FROM networks
+                WHERE project_id IN ({project_ids_sql})
+            """, params)
+            for row in cursor.fetchall():
+                network = dict(row)
+                by_project[network['project_id']]['networks'].append(network)
         
-        return project
+        return projects
     
     def delete_project(self, project_id: str):
         """Delete a project and all related data"""
@@ -353,10 +629,20 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
             conn.commit()
+            deleted = cursor.rowcount
+        if deleted:
+            self.events.publish(PROJECT_DELETED, {"id": project_id})
     
     def delete_workspace(self, workspace_id: str):
         """Delete a workspace and all related data"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            # Projects go with the workspace (ON DELETE CASCADE); note which, if anyone listens
+            project_ids = []
+            if self.events.has_subscribers(PROJECT_DELETED):
+                cursor.execute("SELECT id FROM projects WHERE workspace_id = ?", (workspace_id,))
+                project_ids = [row['id'] for row in cursor.fetchall()]
             cursor.execute("DELETE FROM workspaces WHERE id = ?", (workspace_id,))
-            conn.commit()
\ No newline at end of file
+            conn.commit()
+        for project_id in project_ids:
+            self.events.publish(PROJECT_DELETED, {"id": project_id})
\ No newline at end of file
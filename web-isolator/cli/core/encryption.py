@@ -5,7 +5,7 @@ Handles encryption/decryption of sensitive environment variables.
 import os
 import base64
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -49,6 +49,14 @@ class SecretManager:
         # Return base64 encoded string for database storage
         return base64.b64encode(encrypted_bytes).decode('utf-8')
     
+    def encrypt_many(self, values: List[str]) -> List[str]:
+        """Encrypt a batch of string values"""
+        encrypt = self.cipher.encrypt
+        return [
+            base64.b64encode(encrypt(value.encode('utf-8'))).decode('utf-8') if value else value
+            for value in values
+        ]
+    
     def decrypt(self, encrypted_value: str) -> str:
         """Decrypt an encrypted string value"""
         if not encrypted_value:
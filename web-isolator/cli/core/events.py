@@ -0,0 +1,60 @@
+"""
+In-process publish/subscribe bus for Web Isolator 2.0
+Lets the database and providers announce changes so the Control Plane can
+push them to clients instead of being polled.
+"""
+import threading
+from typing import Any, Callable, Dict, List
+
+
+# Topics published by DatabaseManager
+PROJECT_CREATED = "project_created"
+PROJECT_UPDATED = "project_updated"
+PROJECT_DELETED = "project_deleted"
+
+Subscriber = Callable[[str, Dict[str, Any]], None]
+
+
+class EventBus:
+    """
+    Thread-safe synchronous event bus.
+
+    publish() calls subscribers on the publishing thread, so subscribers must
+    be quick and must not block; hand work to another thread or event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self.published = 0
+
+    def subscribe(self, topic: str, callback: Subscriber) -> Callable[[], None]:
+        """Call callback(topic, payload) for every event on topic; returns an unsubscribe function"""
+        with self._lock:
+            # Copy on write so publish can iterate without holding the lock
+            self._subscribers[topic] = self._subscribers.get(topic, []) + [callback]
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = [c for c in self._subscribers.get(topic, []) if c is not callback]
+                if callbacks:
+                    self._subscribers[topic] = callbacks
+                else:
+                    self._subscribers.pop(topic, None)
+        return unsubscribe
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether anything listens on topic (lets publishers skip building payloads)"""
+        return topic in self._subscribers
+
+    def publish(self, topic: str, payload: Dict[str, Any]):
+        """Deliver an event; a failing subscriber does not affect the others"""
+        callbacks = self._subscribers.get(topic)
+        if not callbacks:
+            return
+        self.published += 1
+        for callback in callbacks:
+            try:
+                callback(topic, payload)
+            except Exception as e:
+                print(f"Warning: event subscriber for {topic} failed: {e}")
@@ -0,0 +1,493 @@
+"""
+Embedded metrics store for Web Isolator 2.0
+Keeps per-service resource history in ~/.isolator/metrics as columnar
+segment files: raw samples for an hour, one-minute rollups for a week.
+"""
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Per-service metrics kept in history
+STORE_METRICS = ('cpu_percent', 'memory_bytes', 'net_rx_bps', 'net_tx_bps')
+
+RAW_RETENTION = 3600            # seconds of raw samples
+ROLLUP_STEP = 60                # seconds per rollup row
+ROLLUP_RETENTION = 7 * 86400    # seconds of rollups
+RAW_SEGMENT_SPAN = 600          # seconds of raw samples per segment file
+DAY = 86400
+
+MAGIC = b"ISOM"
+# Version 2 keeps one count per metric in rollups (version 1 had one per row)
+FORMAT_VERSION = 2
+HEADER_LENGTH = struct.Struct("<I")
+
+SeriesKey = Tuple[Optional[str], str]  # (project, service)
+
+
+def _rollup_columns(metrics: Sequence[str]) -> List[str]:
+    return [f"{metric}.{part}" for metric in metrics for part in ("avg", "min", "max", "count")]
+
+
+class ColumnBuffer:
+    """
+    Rows of one segment held as columns: time, key (index into keys), then
+    one array per data column.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.keys: List[SeriesKey] = []
+        self._key_index: Dict[SeriesKey, int] = {}
+        self.time = array('d')
+        self.key = array('I')
+        self.columns: Dict[str, array] = {name: array('d') for name in columns}
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def key_id(self, key: SeriesKey) -> int:
+        index = self._key_index.get(key)
+        if index is None:
+            index = self._key_index[key] = len(self.keys)
+            self.keys.append(key)
+        return index
+
+    def append(self, timestamp: float, key: SeriesKey, values: Sequence[float]):
+        self.time.append(timestamp)
+        self.key.append(self.key_id(key))
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+
+    def as_segment(self) -> Tuple[List[SeriesKey], Dict[str, array]]:
+        columns = {"time": self.time, "key": self.key}
+        columns.update(self.columns)
+        return self.keys, columns
+
+
+def write_segment(path: str, tier: str, keys: List[SeriesKey], columns: Dict[str, array]):
+    """Write a segment file atomically: magic, JSON header, then each column's raw array"""
+    times = columns["time"]
+    header = {
+        "version": FORMAT_VERSION,
+        "tier": tier,
+        "rows": len(times),
+        "start": min(times) if times else None,
+        "end": max(times) if times else None,
+        "byteorder": sys.byteorder,
+        "keys": [list(key) for key in keys],
+        "columns": [[name, column.typecode, column.itemsize] for name, column in columns.items()],
+    }
+    encoded = json.dumps(header).encode('utf-8')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + HEADER_LENGTH.pack(len(encoded)) + encoded)
+        for column in columns.values():
+            column.tofile(f)
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """Read access to a segment file; only the columns asked for are read"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(len(MAGIC) + HEADER_LENGTH.size)
+            if prefix[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Not a metrics segment: {path}")
+            (length,) = HEADER_LENGTH.unpack(prefix[len(MAGIC):])
+            self.header = json.loads(f.read(length).decode('utf-8'))
+        self.keys: List[SeriesKey] = [tuple(key) for key in self.header["keys"]]
+        self.rows: int = self.header["rows"]
+        self.start: Optional[float] = self.header["start"]
+        self.end: Optional[float] = self.header["end"]
+
+        offset = len(MAGIC) + HEADER_LENGTH.size + length
+        self._layout: Dict[str, Tuple[str, int]] = {}
+        for name, typecode, itemsize in self.header["columns"]:
+            self._layout[name] = (typecode, offset)
+            offset += itemsize * self.rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._layout)
+
+    def read(self, names: Iterable[str]) -> Dict[str, array]:
+        """Columns by name (missing ones are left out)"""
+        columns = {}
+        with open(self.path, 'rb') as f:
+            for name in names:
+                if name not in self._layout:
+                    continue
+                typecode, offset = self._layout[name]
+                column = array(typecode)
+                f.seek(offset)
+                column.fromfile(f, self.rows)
+                if self.header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                columns[name] = column
+        return columns
+
+
+class _Aggregate:
+    """Running count/sum/min/max of one metric in one bucket"""
+
+    __slots__ = ('count', 'total', 'low', 'high')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def add(self, average: float, low: float, high: float, count: int):
+        if math.isnan(average) or count <= 0:
+            return
+        self.count += count
+        self.total += average * count
+        self.low = min(self.low, low)
+        self.high = max(self.high, high)
+
+    def result(self) -> Tuple[float, float, float]:
+        if not self.count:
+            return math.nan, math.nan, math.nan
+        return self.total / self.count, self.low, self.high
+
+
+def aggregate_rows(buckets: Dict[Tuple[int, float], List[_Aggregate]], columns: Dict[str, array],
+                   metrics: Sequence[str], step: float, origin: float = 0.0,
+                   key_filter: Optional[Dict[int, int]] = None, start: float = -math.inf, end: float = math.inf):
+    """
+    Fold segment rows into buckets[(key, bucket start)] -> one aggregate per metric.
+    Raw rows count once; rollup rows carry each metric's own count, average, min and max
+    (metrics with NaN samples have smaller counts than the others).
+    key_filter maps segment key indexes to output key ids (None keeps every key, by index).
+    """
+    times, keys = columns["time"], columns["key"]
+    rollup = f"{metrics[0]}.avg" in columns if metrics else False
+    if rollup:
+        # Version 1 segments only have one count per row
+        row_counts = columns.get("count")
+        parts = [(columns[f"{m}.avg"], columns[f"{m}.min"], columns[f"{m}.max"],
+                  columns.get(f"{m}.count", row_counts)) for m in metrics]
+    else:
+        parts = [(columns[m], columns[m], columns[m], None) for m in metrics]
+
+    for row in range(len(times)):
+        timestamp = times[row]
+        if timestamp < start or timestamp >= end:
+            continue
+        key = keys[row]
+        if key_filter is not None:
+            key = key_filter.get(key)
+            if key is None:
+                continue
+        bucket = origin + math.floor((timestamp - origin) / step) * step
+        aggregates = buckets.get((key, bucket))
+        if aggregates is None:
+            aggregates = buckets[(key, bucket)] = [_Aggregate() for _ in metrics]
+        for aggregate, (averages, lows, highs, counts) in zip(aggregates, parts):
+            aggregate.add(averages[row], lows[row], highs[row], int(counts[row]) if counts is not None else 1)
+
+
+def rollup_buffer(segments: Iterable[Tuple[List[SeriesKey], Dict[str, array]]],
+                  metrics: Sequence[str] = STORE_METRICS, step: float = ROLLUP_STEP) -> ColumnBuffer:
+    """Roll raw or rollup segments up into step-second rows (merging rows of the same bucket)"""
+    output = ColumnBuffer(_rollup_columns(metrics))
+    buckets: Dict[Tuple[int, float], List[_Aggregate]] = {}
+    for keys, columns in segments:
+        key_filter = {index: output.key_id(key) for index, key in enumerate(keys)}
+        aggregate_rows(buckets, columns, metrics, step, key_filter=key_filter)
+
+    for (key, bucket), aggregates in sorted(buckets.items(), key=lambda item: (item[0][1], item[0][0])):
+        values: List[float] = []
+        for aggregate in aggregates:
+            values.extend(aggregate.result())
+            values.append(float(aggregate.count))
+        output.time.append(bucket)
+        output.key.append(key)
+        for column, value in zip(output.columns.values(), values):
+            column.append(value)
+    return output
+
+
+class MetricsStore:
+    """
+    Tiered time-series store for per-service resource samples.
+
+    Raw samples are appended to an in-memory segment covering
+    RAW_SEGMENT_SPAN seconds, written to raw/ every flush_interval seconds
+    and when the span ends. A finished raw segment is rolled up into
+    one-minute rows in 1m/. Compaction deletes raw segments older than
+    raw_retention, merges the rollups of past days into one file per day and
+    deletes rollups older than rollup_retention.
+    """
+
+    def __init__(self, path: Optional[str] = None, raw_retention: float = RAW_RETENTION,
+                 rollup_retention: float = ROLLUP_RETENTION, segment_span: float = RAW_SEGMENT_SPAN,
+                 flush_interval: float = 60.0, metrics: Sequence[str] = STORE_METRICS):
+        if path is None:
+            isolator_dir = Path.home() / ".isolator"
+            isolator_dir.mkdir(exist_ok=True)
+            path = str(isolator_dir / "metrics")
+        self.path = path
+        self.raw_dir = os.path.join(path, "raw")
+        self.rollup_dir = os.path.join(path, "1m")
+        os.makedirs(self.raw_dir, exist_ok=True)
+        os.makedirs(self.rollup_dir, exist_ok=True)
+
+        self.raw_retention = raw_retention
+        self.rollup_retention = rollup_retention
+        self.segment_span = segment_span
+        self.flush_interval = flush_interval
+        self.metrics = tuple(metrics)
+
+        self._lock = threading.Lock()
+        self._buffer: Optional[ColumnBuffer] = None
+        self._buffer_path: Optional[str] = None
+        self._buffer_end = 0.0
+        self._last_flush = 0.0
+
+        # Store statistics
+        self.samples_recorded = 0
+        self.segments_rolled_up = 0
+        self.files_deleted = 0
+        self.compactions = 0
+
+        # Raw segments left behind by an earlier run are rolled up now
+        self._roll_up_pending()
+        self.compact()
+
+    # Writes
+    def record(self, timestamp: float, samples: Dict[str, Dict[str, Any]]):
+        """
+        Append one sample per service (a ResourceSampler listener).
+        samples maps container names to dicts with project, service and the metric values.
+        """
+        closed = False
+        with self._lock:
+            if self._buffer is not None and timestamp >= self._buffer_end:
+                self._close_segment()
+                closed = True
+            if self._buffer is None:
+                self._open_segment(timestamp)
+
+            for name, sample in samples.items():
+                key = (sample.get('project'), sample.get('service') or name)
+                self._buffer.append(timestamp, key, [float(sample.get(metric, math.nan)) for metric in self.metrics])
+                self.samples_recorded += 1
+
+            if timestamp - self._last_flush >= self.flush_interval:
+                self._flush()
+
+        if closed:
+            # Outside the lock, so queries are not held up by the file work
+            self.compact(timestamp)
+
+    def _open_segment(self, timestamp: float):
+        """Start the in-memory raw segment for timestamp's span (lock must be held)"""
+        self._buffer = ColumnBuffer(self.metrics)
+        self._buffer_path = os.path.join(self.raw_dir, f"{int(timestamp * 1000)}.seg")
+        self._buffer_end = (math.floor(timestamp / self.segment_span) + 1) * self.segment_span
+        self._last_flush = timestamp
+
+    def _flush(self):
+        """Write the open raw segment (lock must be held)"""
+        if self._buffer is not None and len(self._buffer):
+            write_segment(self._buffer_path, "raw", *self._buffer.as_segment())
+            self._last_flush = self._buffer.time[-1]
+
+    def _close_segment(self):
+        """Write the open raw segment for good and roll it up (lock must be held)"""
+        self._flush()
+        if self._buffer is not None and len(self._buffer):
+            self._roll_up(self._buffer_path, self._buffer.as_segment())
+        self._buffer = None
+        self._buffer_path = None
+
+    def _roll_up(self, raw_path: str, segment: Tuple[List[SeriesKey], Dict[str, array]]):
+        """Write the rollup of a raw segment, then mark the raw file as rolled up"""
+        rollup = rollup_buffer([segment], self.metrics)
+        name = os.path.basename(raw_path)
+        write_segment(os.path.join(self.rollup_dir, name), "1m", *rollup.as_segment())
+        os.replace(raw_path, raw_path[:-len(".seg")] + ".r.seg")
+        self.segments_rolled_up += 1
+
+    def _roll_up_pending(self):
+        for name in sorted(os.listdir(self.raw_dir)):
+            if name.endswith(".seg") and not name.endswith(".r.seg"):
+                path = os.path.join(self.raw_dir, name)
+                try:
+                    segment = Segment(path)
+                except (OSError, ValueError):
+                    continue
+                self._roll_up(path, (segment.keys, segment.read(segment.column_names)))
+
+    def flush(self):
+        """Write buffered samples to disk"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Write buffered samples; the open segment is rolled up on the next start"""
+        self.flush()
+
+    # Compaction
+    def compact(self, now: Optional[float] = None):
+        """Apply retention to both tiers and merge past days' rollups into daily files"""
+        now = now if now is not None else time.time()
+        today = math.floor(now / DAY) * DAY
+        by_day: Dict[float, List[Segment]] = {}
+
+        for directory, retention in ((self.raw_dir, self.raw_retention), (self.rollup_dir, self.rollup_retention)):
+            for segment in self._segments(directory):
+                if segment.end is None or segment.end < now - retention:
+                    if directory == self.raw_dir and not segment.path.endswith(".r.seg"):
+                        continue  # not rolled up yet
+                    self._delete(segment.path)
+                elif directory == self.rollup_dir and segment.end < today:
+                    by_day.setdefault(math.floor(segment.start / DAY) * DAY, []).append(segment)
+
+        for day, segments in by_day.items():
+            if len(segments) < 2:
+                continue
+            merged = rollup_buffer(((s.keys, s.read(s.column_names)) for s in segments), self.metrics)
+            target = os.path.join(self.rollup_dir, f"day-{int(day)}.seg")
+            write_segment(target, "1m", *merged.as_segment())
+            for segment in segments:
+                if segment.path != target:
+                    self._delete(segment.path)
+        self.compactions += 1
+
+    def _segments(self, directory: str) -> List[Segment]:
+        segments = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".seg"):
+                continue
+            try:
+                segments.append(Segment(os.path.join(directory, name)))
+            except (OSError, ValueError):
+                # Being replaced or damaged; skip it
+                continue
+        return segments
+
+    def _delete(self, path: str):
+        try:
+            os.remove(path)
+            self.files_deleted += 1
+        except FileNotFoundError:
+            pass
+
+    # Reads
+    def query(self, project: str, service: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None, step: float = 60.0,
+              metrics: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        History of a project's services (or one service) between start and end, in step-second
+        buckets with avg/min/max per metric. Raw samples answer when the range is within
+        raw retention and step is under a minute; one-minute rollups answer otherwise.
+        """
+        end = end if end is not None else time.time()
+        start = start if start is not None else end - 3600
+        metrics = [m for m in (metrics or self.metrics) if m in self.metrics]
+        if not metrics:
+            raise ValueError(f"Unknown metrics; available: {', '.join(self.metrics)}")
+        if step <= 0 or end <= start:
+            raise ValueError("step must be positive and end after start")
+
+        use_raw = step < ROLLUP_STEP and start >= time.time() - self.raw_retention
+        tier_dir = self.raw_dir if use_raw else self.rollup_dir
+        # "count" is only present in version 1 rollups
+        names = ["time", "key", "count"] + (metrics if use_raw else _rollup_columns(metrics))
+
+        output_keys: List[SeriesKey] = []
+        output_index: Dict[SeriesKey, int] = {}
+        buckets: Dict[Tuple[int, float], List[_Aggregate]] = {}
+
+        def matches(key: SeriesKey) -> bool:
+            return key[0] == project and (service is None or key[1] == service)
+
+        def add(keys: List[SeriesKey], columns: Dict[str, array]):
+            key_filter = {}
+            for index, key in enumerate(keys):
+                if matches(key):
+                    if key not in output_index:
+                        output_index[key] = len(output_keys)
+                        output_keys.append(key)
+                    key_filter[index] = output_index[key]
+            aggregate_rows(buckets, columns, metrics, step, 0.0, key_filter, start, end)
+
+        # The open segment is read from memory (and its raw file skipped below); it has no rollup yet
+        buffered = None
+        open_paths: Tuple[str, ...] = ()
+        with self._lock:
+            if self._buffer is not None:
+                open_paths = (self._buffer_path,)
+                if len(self._buffer):
+                    keys, columns = self._buffer.as_segment()
+                    buffered = (list(keys), {name: array(c.typecode, c) for name, c in columns.items()})
+        if buffered is not None and not use_raw:
+            buffered = rollup_buffer([buffered], self.metrics).as_segment()
+
+        for segment in self._segments(tier_dir):
+            if segment.path in open_paths or segment.end is None:
+                continue
+            if segment.end >= start and segment.start < end and any(matches(key) for key in segment.keys):
+                try:
+                    columns = segment.read(names)
+                except OSError:
+                    # Deleted by compaction meanwhile
+                    continue
+                add(segment.keys, columns)
+        if buffered is not None:
+            add(*buffered)
+
+        points: List[List[Dict[str, Any]]] = [[] for _ in output_keys]
+        for (key_id, bucket), aggregates in sorted(buckets.items(), key=lambda item: item[0][1]):
+            point: Dict[str, Any] = {"t": bucket}
+            for metric, aggregate in zip(metrics, aggregates):
+                average, low, high = aggregate.result()
+                point[metric] = None if math.isnan(average) else {"avg": average, "min": low, "max": high}
+            points[key_id].append(point)
+        series = [
+            {"project": key_project, "service": key_service, "points": key_points}
+            for (key_project, key_service), key_points in zip(output_keys, points)
+        ]
+
+        return {
+            "start": start,
+            "end": end,
+            "step": step,
+            "tier": "raw" if use_raw else "1m",
+            "metrics": metrics,
+            "series": series,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        def usage(directory: str) -> Dict[str, int]:
+            names = [name for name in os.listdir(directory) if name.endswith(".seg")]
+            return {
+                "files": len(names),
+                "bytes": sum(os.path.getsize(os.path.join(directory, name)) for name in names),
+            }
+
+        with self._lock:
+            buffered = len(self._buffer) if self._buffer is not None else 0
+        return {
+            "path": self.path,
+            "raw": usage(self.raw_dir),
+            "rollup_1m": usage(self.rollup_dir),
+            "buffered_samples": buffered,
+            "samples_recorded": self.samples_recorded,
+            "segments_rolled_up": self.segments_rolled_up,
+            "files_deleted": self.files_deleted,
+            "compactions": self.compactions,
+        }
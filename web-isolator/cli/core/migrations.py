@@ -0,0 +1,154 @@
+"""
+Schema migrations for Web Isolator 2.0
+The schema version is stored in SQLite's PRAGMA user_version, so an up-to-date
+database costs a single PRAGMA read on startup.
+"""
+import sqlite3
+from typing import List, Tuple
+
+
+# Ordered list of (version, statements). Append new migrations at the end;
+# never edit a migration that has already shipped.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
+        # Base schema. IF NOT EXISTS lets databases created before versioning
+        # (user_version = 0) adopt the migration without changes.
+        """
+        CREATE TABLE IF NOT EXISTS workspaces (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            workspace_id TEXT,
+            name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            provider TEXT DEFAULT 'docker',
+            status TEXT DEFAULT 'stopped',
+            metadata TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (workspace_id) REFERENCES workspaces(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS services (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            port INTEGER,
+            image TEXT,
+            dockerfile_path TEXT,
+            command TEXT,
+            metadata TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS environment_variables (
+            id TEXT PRIMARY KEY,
+            service_id TEXT,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            is_secret BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS networks (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            name TEXT NOT NULL,
+            driver TEXT DEFAULT 'bridge',
+            subnet TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_projects_workspace ON projects(workspace_id)",
+        "CREATE INDEX IF NOT EXISTS idx_services_project ON services(project_id)",
+        "CREATE INDEX IF NOT EXISTS idx_envvars_service ON environment_variables(service_id)",
+        "CREATE INDEX IF NOT EXISTS idx_networks_project ON networks(project_id)",
+    ]),
+    (2, [
+        # Drop duplicate keys left by older versions before enforcing uniqueness
+        """
+        DELETE FROM environment_variables
+        WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM environment_variables GROUP BY service_id, key
+        )
+        """,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_envvars_service_key
+        ON environment_variables(service_id, key)
+        """,
+    ]),
+    (3, [
+        # Rename duplicates (rather than deleting them and their projects)
+        # so the unique name indexes can be built
+        """
+        UPDATE workspaces SET name = name || ' (' || substr(id, 1, 8) || ')'
+        WHERE rowid NOT IN (SELECT MIN(rowid) FROM workspaces GROUP BY name)
+        """,
+        """
+        UPDATE projects SET name = name || '-' || substr(id, 1, 8)
+        WHERE rowid NOT IN (SELECT MIN(rowid) FROM projects GROUP BY workspace_id, name)
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_workspaces_name ON workspaces(name)",
+        # Leading on name so global lookups by name can use it as well
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_name_workspace ON projects(name, workspace_id)",
+    ]),
+    (4, [
+        # Cover (name, id) keyset pagination within a workspace / project
+        "CREATE INDEX IF NOT EXISTS idx_projects_workspace_name ON projects(workspace_id, name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_services_project_name ON services(project_id, name, id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Bring the database schema up to LATEST_VERSION.
+    Returns the list of migration versions that were applied.
+    """
+    # Fast path: already up to date
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for version, statements in MIGRATIONS:
+        # Take the write lock first so concurrent processes do not apply the same step
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+
+            for statement in statements:
+                conn.execute(statement)
+            # PRAGMA values cannot be bound as parameters
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+            applied.append(version)
+        except Exception:
+            conn.rollback()
+            raise
+
+    return applied
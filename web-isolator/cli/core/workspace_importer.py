@@ -0,0 +1,193 @@
+"""
+Transactional bulk importer for Web Isolator 2.0
+Loads a whole workspace.json into the database in a single transaction.
+"""
+import json
+import time
+import uuid
+from typing import Dict, List, Any, Callable
+
+from .database import DatabaseManager
+from .events import PROJECT_CREATED, PROJECT_DELETED
+from .workspace_schema import SERVICE_METADATA_KEYS
+
+
+PLACEHOLDER_VALUE = "$$PLACEHOLDER$$"
+
+
+class WorkspaceImporter:
+    """
+    Imports converted workspace data with batched inserts.
+
+    All rows are built up front (IDs generated, secrets encrypted) so the
+    write transaction only runs executemany statements. Either the whole
+    workspace is imported or nothing is.
+    """
+
+    def __init__(self, db: DatabaseManager, is_secret_key: Callable[[str], bool]):
+        self.db = db
+        self.is_secret_key = is_secret_key
+
+    def run(self, db_workspace: Dict[str, Any], db_projects: List[Dict[str, Any]],
+            overwrite: bool = False) -> Dict[str, Any]:
+        """Import a workspace and return a report with per-phase timings"""
+        timings: Dict[str, float] = {}
+        warnings: List[str] = []
+        started = time.perf_counter()
+
+        # Phase 1: build every row outside the transaction
+        phase_started = time.perf_counter()
+        workspace_id = str(uuid.uuid4())
+        prepared = self._prepare_projects(workspace_id, db_projects, overwrite, warnings)
+        timings['prepare'] = time.perf_counter() - phase_started
+
+        deleted_project_ids: List[str] = []
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # Phase 2: resolve conflicts with existing data
+                phase_started = time.perf_counter()
+                workspace_name = db_workspace['name']
+                existing_workspace = self.db.get_workspace_by_name(workspace_name)
+
+                if existing_workspace and not overwrite:
+                    raise ValueError(
+                        f"Workspace '{workspace_name}' already exists. Use overwrite=True to replace it."
+                    )
+
+                # Delete existing workspace if overwriting
+                if existing_workspace:
+                    cursor.execute("SELECT id FROM projects WHERE workspace_id = ?", (existing_workspace['id'],))
+                    deleted_project_ids.extend(row['id'] for row in cursor.fetchall())
+                    cursor.execute("DELETE FROM workspaces WHERE id = ?", (existing_workspace['id'],))
+
+                # Project names are only unique within a workspace, and these projects go into
+                # the new workspace inserted below, so projects of other workspaces never conflict
+                timings['resolve'] = time.perf_counter() - phase_started
+
+                # Phase 3: batched inserts
+                phase_started = time.perf_counter()
+                cursor.execute("""
+                    INSERT INTO workspaces (id, name, description)
+                    VALUES (?, ?, ?)
+                """, (workspace_id, workspace_name, db_workspace.get('description', '')))
+
+                projects = list(prepared.values())
+                cursor.executemany("""
+                    INSERT INTO projects (id, workspace_id, name, path, provider, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [p['project'] for p in projects])
+                cursor.executemany("""
+                    INSERT INTO services (id, project_id, name, type, port, image, dockerfile_path,
+                                          command, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [row for p in projects for row in p['services']])
+                cursor.executemany("""
+                    INSERT INTO environment_variables (id, service_id, key, value, is_secret)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [row for p in projects for row in p['environment']])
+                cursor.executemany("""
+                    INSERT INTO networks (id, project_id, name, driver, subnet)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [row for p in projects for row in p['networks']])
+
+                conn.commit()
+                timings['write'] = time.perf_counter() - phase_started
+            except Exception:
+                conn.rollback()
+                raise
+
+        # Announce only what was committed
+        for project_id in deleted_project_ids:
+            self.db.events.publish(PROJECT_DELETED, {"id": project_id})
+        for project_id, ws_id, name, path, provider, _ in (p['project'] for p in projects):
+            self.db.events.publish(PROJECT_CREATED, {
+                "id": project_id, "workspace_id": ws_id, "name": name,
+                "path": path, "provider": provider, "status": "stopped"
+            })
+
+        timings['total'] = time.perf_counter() - started
+
+        return {
+            'workspace_id': workspace_id,
+            'project_count': len(prepared),
+            'service_count': sum(len(p['services']) for p in prepared.values()),
+            'environment_count': sum(len(p['environment']) for p in prepared.values()),
+            'network_count': sum(len(p['networks']) for p in prepared.values()),
+            'warnings': warnings,
+            'timings': timings,
+        }
+
+    def _prepare_projects(self, workspace_id: str, db_projects: List[Dict[str, Any]],
+                          overwrite: bool, warnings: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Generate IDs and row tuples for every project, keyed by project name"""
+        prepared: Dict[str, Dict[str, Any]] = {}
+        secret_values: List[str] = []
+        secret_slots: List[tuple] = []
+
+        for project_data in db_projects:
+            name = project_data['name']
+            if name in prepared:
+                if not overwrite:
+                    warnings.append(f"Project '{name}' is defined more than once, skipping...")
+                    continue
+                # Later definitions replace earlier ones, as with existing projects
+                del prepared[name]
+
+            project_id = str(uuid.uuid4())
+            entry = {
+                'project': (
+                    project_id, workspace_id, name, project_data['path'],
+                    project_data.get('provider', 'docker'), project_data.get('metadata', '{}')
+                ),
+                'services': [],
+                'environment': [],
+                'networks': [],
+            }
+
+            for service_data in project_data.get('services', []):
+                service_id = str(uuid.uuid4())
+                entry['services'].append((
+                    service_id, project_id, service_data['name'], service_data['type'],
+                    service_data.get('port'), service_data.get('image'),
+                    service_data.get('dockerfile_path'), service_data.get('command'),
+                    self._service_metadata(service_data)
+                ))
+
+                for key, value in service_data.get('environment', {}).items():
+                    # Skip placeholder values
+                    if value == PLACEHOLDER_VALUE:
+                        warnings.append(f"Environment variable {key} has placeholder value, skipping...")
+                        continue
+
+                    is_secret = self.is_secret_key(key)
+                    row = [str(uuid.uuid4()), service_id, key, value, is_secret]
+                    if is_secret:
+                        secret_values.append(value)
+                        secret_slots.append((entry['environment'], len(entry['environment'])))
+                    entry['environment'].append(row)
+
+            for network_data in project_data.get('networks', []):
+                entry['networks'].append((
+                    str(uuid.uuid4()), project_id, network_data['name'],
+                    network_data.get('driver', 'bridge'), network_data.get('subnet')
+                ))
+
+            prepared[name] = entry
+
+        # Encrypt all secrets in one pass
+        encrypted = self.db.secret_manager.encrypt_many(secret_values)
+        for (rows, index), value in zip(secret_slots, encrypted):
+            rows[index][3] = value
+
+        return prepared
+
+    def _service_metadata(self, service_data: Dict[str, Any]) -> str:
+        """Service metadata JSON, carrying depends_on/readiness from workspace.json"""
+        metadata = service_data.get('metadata') or {}
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+        for key in SERVICE_METADATA_KEYS:
+            if service_data.get(key):
+                metadata[key] = service_data[key]
+        return json.dumps(metadata)
@@ -6,12 +6,17 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 
+# Per-service options kept in services.metadata in the database
+SERVICE_METADATA_KEYS = ('depends_on', 'readiness')
+
+
 class WorkspaceSchemaValidator:
     """Workspace schema validator without external dependencies"""
     
     SUPPORTED_VERSIONS = ['2.0']
     SUPPORTED_PROVIDERS = ['docker', 'vm']
     SUPPORTED_SERVICE_TYPES = ['react', 'fastapi', 'postgresql', 'redis', 'nginx']
+    READINESS_KEYS = {'state', 'healthcheck', 'tcp', 'http', 'port', 'timeout', 'interval'}
     
     @classmethod
     def validate_workspace(cls, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -104,6 +109,23 @@ class WorkspaceSchemaValidator:
         if port is not None and (not isinstance(port, int) or port < 1 or port > 65535):
             errors.append(f"{path}.port must be an integer between 1 and 65535")
         
+        # Validate dependencies
+        depends_on = service.get('depends_on', [])
+        if not isinstance(depends_on, list) or not all(isinstance(d, str) for d in depends_on):
+            errors.append(f"{path}.depends_on must be a list of service names")
+        
+        # Validate readiness checks
+        readiness = service.get('readiness', {})
+        if not isinstance(readiness, dict):
+            errors.append(f"{path}.readiness must be an object")
+        else:
+            unknown = set(readiness) - cls.READINESS_KEYS
+            if unknown:
+                errors.append(f"{path}.readiness has unknown keys: {sorted(unknown)}")
+            timeout = readiness.get('timeout')
+            if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+                errors.append(f"{path}.readiness.timeout must be a positive number")
+        
         # Validate environment
         environment = service.get('environment', {})
         if not isinstance(environment, dict):
@@ -145,6 +167,8 @@ class WorkspaceSchemaValidator:
                                 "type": "fastapi",
                                 "port": 8000,
                                 "image": "python:3.11-slim",
+                                "depends_on": ["database"],
+                                "readiness": {"http": "/health", "timeout": 60},
                                 "environment": {
                                     "ENVIRONMENT": "development",
                                     "DATABASE_URL": "postgresql://user:pass@db:5432/ecommerce"
@@ -207,6 +231,15 @@ class WorkspaceConverter:
         }
         
         for project in projects_data:
+            for service in project.get('services', []):
+                # depends_on / readiness are stored in the service metadata
+                metadata = service.get('metadata') or '{}'
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata)
+                for key in SERVICE_METADATA_KEYS:
+                    if metadata.get(key):
+                        service[key] = metadata[key]
+            
             project_config = {
                 "id": project.get('id'),
                 "name": project.get('name'),
@@ -0,0 +1,355 @@
+"""
+Async provider interface for Web Isolator 2.0
+Lets the control plane and CLI drive many container operations concurrently
+on one event loop, with per-call timeouts and cancellation.
+"""
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .base import (
+    IsolationProvider, ServiceInfo, NetworkInfo, LogLine, ProviderStatus,
+    ProviderError, ProviderTimeoutError
+)
+from .logs import merge_log_streams
+
+
+class AsyncIsolationProvider(ABC):
+    """
+    Asynchronous counterpart of IsolationProvider.
+
+    Every operation takes an optional ``timeout`` in seconds. When it is
+    omitted, short operations use ``default_timeout`` and long ones (starting
+    services, builds, pulls) are not limited. A timed out call raises
+    ProviderTimeoutError, also from methods that report other failures as
+    False; cancelling the awaiting task cancels the call.
+    """
+
+    # Used when a call does not pass timeout; None means no limit
+    default_timeout: Optional[float] = 30.0
+
+    def __init__(self, provider_name: str):
+        self.provider_name = provider_name
+
+    async def _with_timeout(self, name: str, awaitable: Awaitable, timeout: Optional[float],
+                            long_running: bool = False) -> Any:
+        """Await an operation under its per-call timeout"""
+        if timeout is None and not long_running:
+            timeout = self.default_timeout
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            raise ProviderTimeoutError(f"{self.provider_name} {name} timed out after {timeout:g}s")
+
+    @abstractmethod
+    async def is_available(self, timeout: Optional[float] = None) -> bool:
+        """Check if the provider is available on the system"""
+        pass
+
+    @abstractmethod
+    async def get_version(self, timeout: Optional[float] = None) -> str:
+        """Get provider version information"""
+        pass
+
+    # Network management
+    @abstractmethod
+    async def create_network(self, name: str, driver: str = "bridge", subnet: Optional[str] = None,
+                             timeout: Optional[float] = None, **kwargs) -> NetworkInfo:
+        """Create a new network"""
+        pass
+
+    @abstractmethod
+    async def delete_network(self, network_name: str, timeout: Optional[float] = None) -> bool:
+        """Delete a network"""
+        pass
+
+    @abstractmethod
+    async def list_networks(self, timeout: Optional[float] = None) -> List[NetworkInfo]:
+        """List all networks managed by this provider"""
+        pass
+
+    @abstractmethod
+    async def network_exists(self, network_name: str, timeout: Optional[float] = None) -> bool:
+        """Check if a network exists"""
+        pass
+
+    # Service management
+    @abstractmethod
+    async def start_service(self, service_name: str, timeout: Optional[float] = None,
+                            **kwargs) -> ServiceInfo:
+        """Start a service (keyword arguments as for IsolationProvider.start_service)"""
+        pass
+
+    @abstractmethod
+    async def stop_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        """Stop a running service"""
+        pass
+
+    @abstractmethod
+    async def restart_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        """Restart a service"""
+        pass
+
+    @abstractmethod
+    async def remove_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        """Remove a service (stop and delete)"""
+        pass
+
+    @abstractmethod
+    async def get_service_status(self, service_name: str, timeout: Optional[float] = None) -> ProviderStatus:
+        """Get the status of a specific service"""
+        pass
+
+    async def get_services_status(self, service_names: List[str],
+                                  timeout: Optional[float] = None) -> Dict[str, ProviderStatus]:
+        """Get the status of several services at once"""
+        results = await self.fan_out('get_service_status', service_names, timeout=timeout)
+        return {
+            name: result if isinstance(result, ProviderStatus) else ProviderStatus.ERROR
+            for name, result in results.items()
+        }
+
+    async def inspect_services(self, service_names: List[str],
+                               timeout: Optional[float] = None) -> Dict[str, Optional[ServiceInfo]]:
+        """Get ServiceInfo for several services at once (None for services that do not exist)"""
+        services = {service.name: service for service in await self.list_services(timeout=timeout)}
+        return {name: services.get(name) for name in service_names}
+
+    @abstractmethod
+    async def list_services(self, project_name: Optional[str] = None,
+                            timeout: Optional[float] = None) -> List[ServiceInfo]:
+        """List services managed by this provider, optionally only those of one project"""
+        pass
+
+    @abstractmethod
+    async def service_exists(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        """Check if a service exists"""
+        pass
+
+    # Logs and monitoring
+    @abstractmethod
+    async def get_service_logs(self, service_name: str, lines: int = 100,
+                               timeout: Optional[float] = None) -> List[str]:
+        """Get logs from a service"""
+        pass
+
+    async def stream_service_logs(self, service_name: str, lines: Optional[int] = 100,
+                                  follow: bool = False, since: Optional[float] = None,
+                                  until: Optional[float] = None, stdout: bool = True,
+                                  stderr: bool = True, timestamps: bool = False) -> AsyncIterator[LogLine]:
+        """
+        Yield a service's log lines incrementally (see IsolationProvider.stream_service_logs).
+        The default implementation only supports a plain tail through get_service_logs().
+        """
+        if follow or since is not None or until is not None or not (stdout and stderr) or timestamps:
+            raise ProviderError(f"{self.provider_name} provider does not support streaming logs")
+        for text in await self.get_service_logs(service_name, 100 if lines is None else lines):
+            yield LogLine(service_name, "stdout", text)
+
+    def get_project_logs(self, project_name: str, services: List[Dict[str, Any]],
+                         lines: Optional[int] = 100, follow: bool = False,
+                         since: Optional[float] = None, reorder_window: float = 0.5,
+                         max_pending: int = 1000) -> AsyncIterator[LogLine]:
+        """Merged, timestamp-ordered logs of all services of a project (see IsolationProvider.get_project_logs)"""
+        streams = {
+            service['name']: self.stream_service_logs(
+                f"{project_name}-{service['name']}", lines=lines, follow=follow,
+                since=since, timestamps=True
+            )
+            for service in services
+        }
+        return merge_log_streams(streams, reorder_window, max_pending)
+
+    @abstractmethod
+    async def get_service_stats(self, service_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Get resource usage stats for a service"""
+        pass
+
+    # Build operations
+    @abstractmethod
+    async def build_image(self, dockerfile_path: str, image_tag: str, build_context: str = ".",
+                          timeout: Optional[float] = None, **kwargs) -> bool:
+        """Build an image from Dockerfile"""
+        pass
+
+    @abstractmethod
+    async def image_exists(self, image_name: str, timeout: Optional[float] = None) -> bool:
+        """Check if an image exists locally"""
+        pass
+
+    @abstractmethod
+    async def pull_image(self, image_name: str, timeout: Optional[float] = None) -> bool:
+        """Pull an image from registry"""
+        pass
+
+    # Fan-out helpers
+    async def fan_out(self, method: str, service_names: Iterable[str], concurrency: int = 32,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Call method(name) for every service name, at most concurrency at a time.
+        Returns {name: result}, with the exception as the result for calls that failed.
+        """
+        operation = getattr(self, method)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(name: str) -> Any:
+            async with semaphore:
+                return await operation(name, timeout=timeout)
+
+        names = list(dict.fromkeys(service_names))
+        results = await asyncio.gather(*(run(name) for name in names), return_exceptions=True)
+        for result in results:
+            # Cancellation of the caller must not be swallowed into the result map
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+        return dict(zip(names, results))
+
+    async def stop_project(self, project_name: str, services: List[Dict[str, Any]],
+                           concurrency: int = 32, timeout: Optional[float] = None) -> bool:
+        """Stop all services for a project concurrently"""
+        service_names = [f"{project_name}-{service['name']}" for service in services]
+        statuses = await self.get_services_status(service_names, timeout=timeout)
+        running = [name for name in service_names if statuses.get(name) != ProviderStatus.STOPPED]
+        results = await self.fan_out('stop_service', running, concurrency, timeout)
+        return all(result is True for result in results.values())
+
+    async def remove_project(self, project_name: str, services: List[Dict[str, Any]],
+                             networks: Optional[List[Dict[str, Any]]] = None,
+                             concurrency: int = 32, timeout: Optional[float] = None) -> bool:
+        """Remove all services (concurrently) and then the networks of a project"""
+        service_names = [f"{project_name}-{service['name']}" for service in services]
+        try:
+            existing = await self.inspect_services(service_names, timeout=timeout)
+        except ProviderError:
+            # Unknown: try to remove every service
+            existing = dict.fromkeys(service_names, True)
+
+        to_remove = [name for name in service_names if existing.get(name) is not None]
+        results = await self.fan_out('remove_service', to_remove, concurrency, timeout)
+        success = all(result is True for result in results.values())
+
+        for network in networks or []:
+            if not await self.delete_network(f"{project_name}-{network['name']}", timeout=timeout):
+                success = False
+
+        return success
+
+    async def health_check(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Perform a health check of the provider"""
+        available = await self.is_available(timeout=timeout)
+        if not available:
+            return {"provider": self.provider_name, "available": False, "version": None,
+                    "services_count": 0, "networks_count": 0}
+
+        version, services, networks = await asyncio.gather(
+            self.get_version(timeout=timeout),
+            self.list_services(timeout=timeout),
+            self.list_networks(timeout=timeout)
+        )
+        return {
+            "provider": self.provider_name,
+            "available": True,
+            "version": version,
+            "services_count": len(services),
+            "networks_count": len(networks)
+        }
+
+
+def _delegate(name: str, long_running: bool = False) -> Callable:
+    """Adapter method that runs the sync provider's method of the same name on a worker thread"""
+    async def method(self, *args, timeout: Optional[float] = None, **kwargs):
+        return await self._run(name, getattr(self.provider, name), *args,
+                               timeout=timeout, long_running=long_running, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = f"IsolationProvider.{name} on a worker thread"
+    return method
+
+
+class SyncProviderAdapter(AsyncIsolationProvider):
+    """
+    AsyncIsolationProvider over an existing synchronous provider.
+
+    Calls run on executor: a concurrent.futures Executor, an object with an
+    async run(func) method, or the loop's default executor if None.
+    A timeout or cancellation returns control to the caller immediately,
+    but the blocking call itself finishes in the background.
+    """
+
+    def __init__(self, provider: IsolationProvider, executor: Optional[Any] = None):
+        super().__init__(provider.provider_name)
+        self.provider = provider
+        self.executor = executor
+
+    async def _run(self, name: str, func: Callable, *args, timeout: Optional[float] = None,
+                   long_running: bool = False, **kwargs) -> Any:
+        call = functools.partial(func, *args, **kwargs)
+        if hasattr(self.executor, 'run'):
+            # InstrumentedExecutor of the control plane
+            future = self.executor.run(call)
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, call)
+        return await self._with_timeout(name, future, timeout, long_running)
+
+    async def is_available(self, timeout: Optional[float] = None) -> bool:
+        # A property on sync providers; evaluate it off the loop as well
+        return await self._run('is_available', lambda: self.provider.is_available, timeout=timeout)
+
+    get_version = _delegate('get_version')
+    create_network = _delegate('create_network')
+    delete_network = _delegate('delete_network')
+    list_networks = _delegate('list_networks')
+    network_exists = _delegate('network_exists')
+    start_service = _delegate('start_service', long_running=True)
+    stop_service = _delegate('stop_service')
+    restart_service = _delegate('restart_service')
+    remove_service = _delegate('remove_service')
+    get_service_status = _delegate('get_service_status')
+    get_services_status = _delegate('get_services_status')
+    inspect_services = _delegate('inspect_services')
+    list_services = _delegate('list_services')
+    service_exists = _delegate('service_exists')
+    get_service_logs = _delegate('get_service_logs')
+    get_service_stats = _delegate('get_service_stats')
+    build_image = _delegate('build_image', long_running=True)
+    image_exists = _delegate('image_exists')
+    pull_image = _delegate('pull_image', long_running=True)
+    health_check = _delegate('health_check')
+
+    async def stream_service_logs(self, service_name: str, **options) -> AsyncIterator[LogLine]:
+        """IsolationProvider.stream_service_logs, pulling each line on a worker thread"""
+        iterator = self.provider.stream_service_logs(service_name, **options)
+        try:
+            while True:
+                line = await self._run('stream_service_logs', next, iterator, None, long_running=True)
+                if line is None:
+                    return
+                yield line
+        finally:
+            try:
+                iterator.close()
+            except ValueError:
+                # Still blocked in a worker thread after cancellation; it ends with the stream
+                pass
+
+    async def start_project(self, project_name: str, services: List[Dict[str, Any]],
+                            networks: Optional[List[Dict[str, Any]]] = None,
+                            timeout: Optional[float] = None, **kwargs) -> Dict[str, ServiceInfo]:
+        """IsolationProvider.start_project (dependency-ordered, already concurrent) on a worker thread"""
+        return await self._run('start_project', self.provider.start_project, project_name, services,
+                               networks, timeout=timeout, long_running=True, **kwargs)
+
+    async def start_projects(self, projects: List[Dict[str, Any]], timeout: Optional[float] = None,
+                             **kwargs) -> Dict[str, Dict[str, ServiceInfo]]:
+        """IsolationProvider.start_projects (images prefetched once for all projects) on a worker thread"""
+        return await self._run('start_projects', self.provider.start_projects, projects,
+                               timeout=timeout, long_running=True, **kwargs)
+
+
+def as_async_provider(provider: IsolationProvider, executor: Optional[Any] = None) -> AsyncIsolationProvider:
+    """Async view of a provider: its native async implementation if it has one, else an adapter"""
+    to_async = getattr(provider, 'as_async', None)
+    if to_async is not None:
+        return to_async(executor)
+    return SyncProviderAdapter(provider, executor)
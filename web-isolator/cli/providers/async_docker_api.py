@@ -0,0 +1,375 @@
+"""
+Async Docker Engine API client for Web Isolator 2.0
+HTTP/1.1 over the daemon's unix socket on asyncio streams, so many requests
+can be in flight on one event loop without a thread per call.
+"""
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+from urllib.parse import quote
+
+from .base import ProviderError, ProviderUnavailableError
+from .docker_api import (
+    DockerAPIClient, DockerAPIError, check_pull_progress, demux_stream, is_multiplexed,
+    parse_error, pull_params, request_url, socket_path_from_env
+)
+
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+# Read buffer limit per connection (also the longest line readline accepts)
+STREAM_LIMIT = 1 << 20
+
+
+class AsyncDockerAPIClient:
+    """
+    Docker Engine API client on asyncio streams with a pool of keep-alive connections.
+
+    At most max_connections requests are in flight at once, and finished
+    connections are kept open for reuse. The client is
+    bound to the event loop that uses it; pooled connections are dropped when
+    a different loop starts using it. Cancelling a request (for example from
+    asyncio.wait_for) closes its connection, since its state is then unknown.
+    """
+
+    REACHABLE_TTL = DockerAPIClient.REACHABLE_TTL
+    UNREACHABLE_TTL = DockerAPIClient.UNREACHABLE_TTL
+
+    def __init__(self, socket_path: Optional[str] = None, max_connections: int = 64,
+                 api_version: Optional[str] = None):
+        self.socket_path = socket_path or socket_path_from_env()
+        self.max_connections = max_connections
+        self.api_version = api_version
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: List[Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._reachable: Optional[bool] = None
+        self._reachable_until = 0.0
+        self._ping: Optional[asyncio.Future] = None
+        self.requests_made = 0
+        self.connections_opened = 0
+
+    # Transport
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Streams and semaphores belong to the loop that created them
+            self._loop = loop
+            self._idle = []
+            self._slots = asyncio.Semaphore(self.max_connections)
+            self._ping = None
+
+    async def _connect(self) -> Connection:
+        try:
+            connection = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+        except OSError as e:
+            self.invalidate()
+            raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+        self.connections_opened += 1
+        return connection
+
+    def _encode_request(self, method: str, path: str, params: Optional[Dict[str, Any]],
+                        body: Any) -> bytes:
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        lines = [
+            f"{method} {request_url(path, params, self.api_version)} HTTP/1.1",
+            "Host: localhost",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bool]:
+        """Read the status line and headers; returns (status, headers, keep_alive)"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        version, status, _ = (status_line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return int(status), headers, keep_alive
+
+    @staticmethod
+    async def _read_chunk(reader: asyncio.StreamReader) -> bytes:
+        """Read one chunk of a chunked body (b"" for the last one)"""
+        size_line = await reader.readline()
+        if not size_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            # Skip trailers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b""
+        data = await reader.readexactly(size)
+        await reader.readexactly(2)
+        return data
+
+    async def _read_body(self, reader: asyncio.StreamReader, method: str, status: int,
+                         headers: Dict[str, str]) -> Tuple[bytes, bool]:
+        """Read a whole response body; returns (body, connection_reusable)"""
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            return b"", True
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                chunk = await self._read_chunk(reader)
+                if not chunk:
+                    return b"".join(chunks), True
+                chunks.append(chunk)
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"])), True
+        # Delimited by the daemon closing the connection
+        return await reader.read(), False
+
+    async def _iter_body(self, reader: asyncio.StreamReader,
+                         headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """Yield a response body in pieces as they arrive"""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                chunk = await self._read_chunk(reader)
+                if not chunk:
+                    return
+                yield chunk
+        remaining = int(headers["content-length"]) if "content-length" in headers else None
+        while remaining is None or remaining > 0:
+            data = await reader.read(65536 if remaining is None else min(remaining, 65536))
+            if not data:
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      body: Any = None) -> Tuple[int, bytes]:
+        """Send a request and return (status, body). Retries once on a stale keep-alive socket."""
+        self._bind_loop()
+        data = self._encode_request(method, path, params, body)
+
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await self._connect()
+                try:
+                    writer.write(data)
+                    await writer.drain()
+                    status, headers, keep_alive = await self._read_head(reader)
+                    response, reusable = await self._read_body(reader, method, status, headers)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    try:
+                        # Collects the error the connection was lost with, so it is not logged as unhandled
+                        await writer.wait_closed()
+                    except (ConnectionError, OSError):
+                        pass
+                    # The daemon closed an idle keep-alive connection; retry on a fresh one
+                    if reused and attempt == 0:
+                        continue
+                    self.invalidate()
+                    raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+                except (OSError, ValueError) as e:
+                    writer.close()
+                    self.invalidate()
+                    raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+                except BaseException:
+                    # Cancelled mid-request: the rest of the response would corrupt the next one
+                    writer.close()
+                    raise
+
+                self.requests_made += 1
+                if keep_alive and reusable:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, response
+
+        raise ProviderError("Docker API request failed")  # pragma: no cover
+
+    async def _call(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                    body: Any = None) -> Any:
+        """Send a request, raise DockerAPIError on failure and decode a JSON body"""
+        status, data = await self.request(method, path, params, body)
+        if status >= 400:
+            raise parse_error(status, data)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data
+
+    def close(self):
+        """Close all pooled connections"""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            try:
+                writer.close()
+            except RuntimeError:
+                # Its loop is already closed
+                pass
+
+    # System
+    async def ping(self) -> bool:
+        """Check that the daemon answers on the socket"""
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            status, _ = await asyncio.wait_for(self.request("GET", "/_ping"), 5)
+            return status == 200
+        except (ProviderError, asyncio.TimeoutError):
+            return False
+
+    async def is_reachable(self) -> bool:
+        """Cached ping result; concurrent callers share one ping"""
+        self._bind_loop()
+        if self._reachable is None or time.monotonic() >= self._reachable_until:
+            if self._ping is None:
+                self._ping = asyncio.ensure_future(self._refresh_reachable())
+            await asyncio.shield(self._ping)
+        return bool(self._reachable)
+
+    async def _refresh_reachable(self):
+        try:
+            reachable = await self.ping()
+            ttl = self.REACHABLE_TTL if reachable else self.UNREACHABLE_TTL
+            self._reachable, self._reachable_until = reachable, time.monotonic() + ttl
+        finally:
+            self._ping = None
+
+    def invalidate(self):
+        """Forget the cached ping result and drop pooled connections"""
+        self._reachable = None
+        self._reachable_until = 0.0
+        self.close()
+
+    async def version(self) -> Dict[str, Any]:
+        return await self._call("GET", "/version")
+
+    # Containers
+    async def inspect_container(self, name: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/containers/{quote(name)}/json")
+
+    async def list_containers(self, all: bool = True,
+                              filters: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        params = {"all": "1" if all else "0"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return await self._call("GET", "/containers/json", params)
+
+    async def stop_container(self, name: str, timeout: int = 10):
+        await self._call("POST", f"/containers/{quote(name)}/stop", {"t": timeout})
+
+    async def restart_container(self, name: str, timeout: int = 10):
+        await self._call("POST", f"/containers/{quote(name)}/restart", {"t": timeout})
+
+    async def remove_container(self, name: str, force: bool = False):
+        await self._call("DELETE", f"/containers/{quote(name)}", {"force": "1" if force else None})
+
+    async def container_stats(self, name: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/containers/{quote(name)}/stats", {"stream": "0"})
+
+    async def container_logs(self, name: str, tail: Optional[int] = None, stdout: bool = True,
+                             stderr: bool = True, timestamps: bool = False) -> List[Tuple[int, bytes]]:
+        """Fetch (non-follow) logs as a list of (stream, payload) frames"""
+        params = {
+            "stdout": "1" if stdout else "0",
+            "stderr": "1" if stderr else "0",
+            "timestamps": "1" if timestamps else "0",
+            "tail": str(tail) if tail is not None else "all",
+        }
+        status, data = await self.request("GET", f"/containers/{quote(name)}/logs", params)
+        if status >= 400:
+            raise DockerAPIError(status, data.decode("utf-8", "replace").strip())
+        # TTY containers are not multiplexed
+        if not is_multiplexed(data):
+            return [(1, data)]
+        return demux_stream(data)
+
+    async def container_log_stream(self, name: str,
+                                   params: Dict[str, Any]) -> AsyncIterator[Tuple[int, bytes]]:
+        """
+        Yield (stream, payload) chunks of a container's logs as the daemon sends
+        them, on a dedicated connection outside the pool. With follow in params
+        this tails until the container stops or the iterator is closed.
+        """
+        # TTY containers are not multiplexed
+        tty = bool(((await self.inspect_container(name)).get("Config") or {}).get("Tty"))
+        reader, writer = await self._connect()
+        try:
+            writer.write(self._encode_request("GET", f"/containers/{quote(name)}/logs", params, None))
+            await writer.drain()
+            status, headers, _ = await self._read_head(reader)
+            if status >= 400:
+                body, _ = await self._read_body(reader, "GET", status, headers)
+                raise parse_error(status, body)
+
+            buffer = b""
+            async for data in self._iter_body(reader, headers):
+                if tty:
+                    yield 1, data
+                    continue
+                # Frames: stream type, 3 bytes padding, big-endian uint32 size, payload
+                buffer += data
+                while len(buffer) >= 8:
+                    stream_type, size = struct.unpack(">BxxxL", buffer[:8])
+                    if len(buffer) < 8 + size:
+                        break
+                    yield stream_type, buffer[8:8 + size]
+                    buffer = buffer[8 + size:]
+        except (ConnectionError, asyncio.IncompleteReadError, OSError, ValueError) as e:
+            raise ProviderUnavailableError(f"Docker stream interrupted: {e}")
+        finally:
+            writer.close()
+
+    # Networks
+    async def remove_network(self, name: str):
+        await self._call("DELETE", f"/networks/{quote(name)}")
+
+    async def list_networks(self) -> List[Dict[str, Any]]:
+        return await self._call("GET", "/networks")
+
+    async def inspect_network(self, name: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/networks/{quote(name)}")
+
+    # Images
+    async def inspect_image(self, name: str) -> Dict[str, Any]:
+        return await self._call("GET", f"/images/{quote(name, safe='')}/json")
+
+    async def pull_image(self, name: str):
+        """Pull an image, raising DockerAPIError if the progress stream reports an error"""
+        status, data = await self.request("POST", "/images/create", pull_params(name))
+        if status >= 400:
+            raise DockerAPIError(status, data.decode("utf-8", "replace").strip())
+        check_pull_progress(data)
+
+
+# Clients are shared per socket so keep-alive connections are reused across providers
+_clients: Dict[str, AsyncDockerAPIClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_async_client(socket_path: Optional[str] = None) -> AsyncDockerAPIClient:
+    """Get the process-wide async client for a daemon socket"""
+    path = socket_path or socket_path_from_env()
+    with _clients_lock:
+        client = _clients.get(path)
+        if client is None:
+            client = AsyncDockerAPIClient(path)
+            _clients[path] = client
+        return client
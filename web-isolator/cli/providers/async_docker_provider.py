@@ -0,0 +1,375 @@
+"""
+Async Docker provider for Web Isolator 2.0
+Serves status, listing, lifecycle, logs, stats and image checks natively over
+the async Engine API client. Operations with heavy local work (starting
+services with readiness checks, builds) and the docker CLI fallback run the
+sync DockerProvider on a worker thread; CLI log streams use an asyncio subprocess.
+"""
+import asyncio
+import re
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+
+from .async_base import SyncProviderAdapter
+from .async_docker_api import AsyncDockerAPIClient, get_shared_async_client
+from .base import (
+    ServiceInfo, NetworkInfo, LogLine, ProviderStatus, ProviderError, ProviderTimeoutError,
+    ProviderUnavailableError, ServiceError, NetworkError,
+    MANAGED_LABEL, PROJECT_LABEL
+)
+from .docker_provider import DockerProvider, STATUS_MAPPING
+from .logs import LogLineSplitter, log_args, log_params
+
+
+class AsyncDockerProvider(SyncProviderAdapter):
+    """AsyncIsolationProvider for Docker (see DockerProvider for backend selection)"""
+
+    def __init__(self, provider: DockerProvider, executor: Optional[Any] = None):
+        super().__init__(provider, executor)
+        self.provider: DockerProvider = provider
+        self.default_timeout = provider.command_timeout
+        self._client: Optional[AsyncDockerAPIClient] = None
+        if provider._docker_client is not None:
+            self._client = get_shared_async_client(provider._docker_client.socket_path)
+
+    async def _get_api(self) -> Optional[AsyncDockerAPIClient]:
+        """Async Engine API client if the daemon socket answers, else None (use the CLI on a thread)"""
+        if self._client is not None and await self._client.is_reachable():
+            return self._client
+        return None
+
+    async def _refresh_mirror(self, name_or_id: str):
+        """Read our own change back into the state mirror"""
+        if self.provider._mirror is not None:
+            await self._run('refresh', self.provider._refresh_mirror, name_or_id)
+
+    async def is_available(self, timeout: Optional[float] = None) -> bool:
+        if await self._get_api() is not None:
+            return True
+        return await super().is_available(timeout=timeout)
+
+    async def get_version(self, timeout: Optional[float] = None) -> str:
+        api = await self._get_api()
+        if api is None:
+            return await super().get_version(timeout=timeout)
+        version = await self._with_timeout('get_version', api.version(), timeout)
+        return f"Docker version {version.get('Version', 'unknown')}, API {version.get('ApiVersion', 'unknown')}"
+
+    # Network management
+    async def delete_network(self, network_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().delete_network(network_name, timeout=timeout)
+        try:
+            await self._with_timeout('delete_network', api.remove_network(network_name), timeout)
+            return True
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+
+    async def list_networks(self, timeout: Optional[float] = None) -> List[NetworkInfo]:
+        api = await self._get_api()
+        if api is None:
+            return await super().list_networks(timeout=timeout)
+        try:
+            networks = await self._with_timeout('list_networks', api.list_networks(), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError as e:
+            raise NetworkError(f"Failed to list networks: {e}")
+        return [self.provider._network_from_api(n) for n in networks]
+
+    async def network_exists(self, network_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().network_exists(network_name, timeout=timeout)
+        try:
+            await self._with_timeout('network_exists', api.inspect_network(network_name), timeout)
+            return True
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+
+    # Service management
+    async def stop_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().stop_service(service_name, timeout=timeout)
+        try:
+            await self._with_timeout('stop_service', api.stop_container(service_name), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+        await self._refresh_mirror(service_name)
+        return True
+
+    async def restart_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().restart_service(service_name, timeout=timeout)
+        try:
+            await self._with_timeout('restart_service', api.restart_container(service_name), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+        await self._refresh_mirror(service_name)
+        return True
+
+    async def remove_service(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().remove_service(service_name, timeout=timeout)
+
+        async def remove():
+            # Stop first if running
+            try:
+                await api.stop_container(service_name)
+            except ProviderError:
+                pass
+            await api.remove_container(service_name)
+
+        try:
+            await self._with_timeout('remove_service', remove(), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+        await self._refresh_mirror(service_name)
+        return True
+
+    async def get_service_status(self, service_name: str, timeout: Optional[float] = None) -> ProviderStatus:
+        mirror = self.provider._get_mirror()
+        record = mirror.get(service_name) if mirror else None
+        if record is not None:
+            return STATUS_MAPPING.get(record['State'].lower(), ProviderStatus.ERROR)
+
+        api = await self._get_api()
+        if api is None:
+            return await super().get_service_status(service_name, timeout=timeout)
+        try:
+            container = await self._with_timeout('get_service_status', api.inspect_container(service_name), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return ProviderStatus.ERROR
+        return STATUS_MAPPING.get(container['State']['Status'].lower(), ProviderStatus.ERROR)
+
+    async def get_services_status(self, service_names: List[str],
+                                  timeout: Optional[float] = None) -> Dict[str, ProviderStatus]:
+        try:
+            services = await self.inspect_services(service_names, timeout=timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return {name: ProviderStatus.ERROR for name in service_names}
+        return {
+            name: info.status if info else ProviderStatus.ERROR
+            for name, info in services.items()
+        }
+
+    async def inspect_services(self, service_names: List[str],
+                               timeout: Optional[float] = None) -> Dict[str, Optional[ServiceInfo]]:
+        found: Dict[str, ServiceInfo] = {}
+        missing = list(dict.fromkeys(service_names))
+
+        mirror = self.provider._get_mirror()
+        if mirror:
+            for name in missing:
+                record = mirror.get(name)
+                if record is not None:
+                    found[name] = self.provider._service_from_api(record)
+            missing = [name for name in missing if name not in found]
+
+        if missing:
+            api = await self._get_api()
+            if api is None:
+                services = await super().inspect_services(missing, timeout=timeout)
+                found.update((name, info) for name, info in services.items() if info is not None)
+            else:
+                # Name filters are OR-ed; anchor them so "web" does not match "web-2"
+                filters = {'name': [f'^/{re.escape(name)}$' for name in missing]}
+                try:
+                    containers = await self._with_timeout(
+                        'inspect_services', api.list_containers(all=True, filters=filters), timeout
+                    )
+                except ProviderTimeoutError:
+                    raise
+                except ProviderError as e:
+                    raise ServiceError(f"Failed to inspect services: {e}")
+                for container in containers:
+                    info = self.provider._service_from_api(container)
+                    found[info.name] = info
+
+        return {name: found.get(name) for name in service_names}
+
+    async def list_services(self, project_name: Optional[str] = None,
+                            timeout: Optional[float] = None) -> List[ServiceInfo]:
+        mirror = self.provider._get_mirror()
+        if mirror:
+            return [self.provider._service_from_api(c) for c in mirror.containers(project=project_name)]
+
+        api = await self._get_api()
+        if api is None:
+            return await super().list_services(project_name, timeout=timeout)
+
+        label_filters = [f'{MANAGED_LABEL}=true']
+        if project_name:
+            label_filters.append(f'{PROJECT_LABEL}={project_name}')
+        try:
+            containers = await self._with_timeout(
+                'list_services', api.list_containers(all=True, filters={'label': label_filters}), timeout
+            )
+        except ProviderTimeoutError:
+            raise
+        except ProviderError as e:
+            raise ServiceError(f"Failed to list services: {e}")
+        return [self.provider._service_from_api(c) for c in containers]
+
+    async def service_exists(self, service_name: str, timeout: Optional[float] = None) -> bool:
+        mirror = self.provider._get_mirror()
+        if mirror and mirror.get(service_name) is not None:
+            return True
+
+        api = await self._get_api()
+        if api is None:
+            return await super().service_exists(service_name, timeout=timeout)
+        try:
+            await self._with_timeout('service_exists', api.inspect_container(service_name), timeout)
+            return True
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+
+    # Logs and monitoring
+    async def get_service_logs(self, service_name: str, lines: int = 100,
+                               timeout: Optional[float] = None) -> List[str]:
+        async def collect() -> List[str]:
+            return [line.text async for line in self.stream_service_logs(service_name, lines)]
+
+        return await self._with_timeout('get_service_logs', collect(), timeout)
+
+    async def stream_service_logs(self, service_name: str, lines: Optional[int] = 100,
+                                  follow: bool = False, since: Optional[float] = None,
+                                  until: Optional[float] = None, stdout: bool = True,
+                                  stderr: bool = True, timestamps: bool = False) -> AsyncIterator[LogLine]:
+        """
+        Yield container log lines as docker produces them, over the Engine API or
+        an asyncio 'docker logs' subprocess. Nothing is read ahead of the consumer
+        beyond a few chunks, so a slow consumer slows the producer down.
+        """
+        api = await self._get_api()
+        if api:
+            chunks = api.container_log_stream(
+                service_name, log_params(lines, follow, since, until, stdout, stderr, timestamps)
+            )
+        else:
+            chunks = self._docker_output(
+                log_args(service_name, lines, follow, since, until, timestamps), stdout, stderr
+            )
+
+        splitter = LogLineSplitter(service_name, timestamps)
+        try:
+            async for stream_type, data in chunks:
+                for line in splitter.feed(stream_type, data):
+                    yield line
+            for line in splitter.flush():
+                yield line
+        except ProviderError as e:
+            raise ServiceError(f"Failed to get logs for {service_name}: {e}")
+        finally:
+            await chunks.aclose()
+
+    async def _docker_output(self, args: List[str], stdout: bool = True,
+                             stderr: bool = True) -> AsyncIterator[Tuple[int, bytes]]:
+        """Run a docker command as an asyncio subprocess and yield (1, stdout) / (2, stderr) chunks"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'docker', *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise ProviderUnavailableError("Docker command not found")
+
+        # Bounded, so the pipes stop being read while the consumer is behind
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=16)
+
+        async def pump(stream: asyncio.StreamReader, stream_type: int):
+            while True:
+                data = await stream.read(65536)
+                await chunks.put((stream_type, data))
+                if not data:
+                    return
+
+        pumps = [
+            asyncio.ensure_future(pump(process.stdout, 1)),
+            asyncio.ensure_future(pump(process.stderr, 2)),
+        ]
+        stderr_tail = b''
+        try:
+            open_streams = len(pumps)
+            while open_streams:
+                stream_type, data = await chunks.get()
+                if not data:
+                    open_streams -= 1
+                    continue
+                if stream_type == 2:
+                    stderr_tail = (stderr_tail + data)[-4096:]
+                if stdout if stream_type == 1 else stderr:
+                    yield stream_type, data
+            returncode = await process.wait()
+        finally:
+            for task in pumps:
+                task.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        if returncode != 0:
+            stderr_text = stderr_tail.decode('utf-8', 'replace').strip()
+            # The error is the last thing docker writes to stderr
+            message = stderr_text.splitlines()[-1] if stderr_text else f'exit code {returncode}'
+            raise ProviderError(f"Docker command failed: {message}")
+
+    async def get_service_stats(self, service_name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        sampled = self.provider._sampled_stats(service_name)
+        if sampled is not None:
+            return sampled
+        api = await self._get_api()
+        if api is None:
+            return await super().get_service_stats(service_name, timeout=timeout)
+        try:
+            stats = await self._with_timeout('get_service_stats', api.container_stats(service_name), timeout)
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return {}
+        return self.provider._format_api_stats(stats)
+
+    # Build operations
+    async def image_exists(self, image_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().image_exists(image_name, timeout=timeout)
+        try:
+            await self._with_timeout('image_exists', api.inspect_image(image_name), timeout)
+            return True
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+
+    async def pull_image(self, image_name: str, timeout: Optional[float] = None) -> bool:
+        api = await self._get_api()
+        if api is None:
+            return await super().pull_image(image_name, timeout=timeout)
+        try:
+            await self._with_timeout('pull_image', api.pull_image(image_name), timeout, long_running=True)
+            return True
+        except ProviderTimeoutError:
+            raise
+        except ProviderError:
+            return False
+
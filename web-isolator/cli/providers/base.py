@@ -3,10 +3,17 @@ Base provider interface for Web Isolator 2.0
 Defines the contract for isolation providers (Docker, VM, etc.)
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from enum import Enum
 
 
+# Labels put on every service the isolator starts
+MANAGED_LABEL = "isolator.managed"
+PROJECT_LABEL = "isolator.project"
+PROJECT_ID_LABEL = "isolator.project_id"
+SERVICE_LABEL = "isolator.service"
+
+
 class ProviderStatus(Enum):
     """Provider service status"""
     RUNNING = "running"
@@ -20,6 +27,9 @@ class ProviderStatus(Enum):
 class ServiceInfo:
     """Service information returned by providers"""
     
+    # Listings can hold thousands of these; no per-instance __dict__
+    __slots__ = ('service_id', 'name', 'status', 'port_mappings', 'environment', 'metadata')
+    
     def __init__(self, 
                  service_id: str,
                  name: str,
@@ -38,6 +48,8 @@ class ServiceInfo:
 class NetworkInfo:
     """Network information returned by providers"""
     
+    __slots__ = ('network_id', 'name', 'driver', 'subnet', 'metadata')
+    
     def __init__(self,
                  network_id: str,
                  name: str,
@@ -51,6 +63,26 @@ class NetworkInfo:
         self.metadata = metadata or {}
 
 
+class LogLine:
+    """One line of service output"""
+    
+    __slots__ = ('service', 'stream', 'text', 'timestamp')
+    
+    def __init__(self, service: str, stream: str, text: str, timestamp: Optional[str] = None):
+        self.service = service
+        self.stream = stream  # "stdout" or "stderr"
+        self.text = text
+        self.timestamp = timestamp  # RFC 3339 as printed by the provider, if requested
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "stream": self.stream,
+            "text": self.text,
+            "timestamp": self.timestamp
+        }
+
+
 class IsolationProvider(ABC):
     """
     Abstract base class for isolation providers.
@@ -107,8 +139,13 @@ class IsolationProvider(ABC):
                      network_name: Optional[str] = None,
                      working_dir: Optional[str] = None,
                      volumes: Optional[Dict[str, str]] = None,
+                     readiness: Optional[Dict[str, Any]] = None,
+                     labels: Optional[Dict[str, str]] = None,
                      **kwargs) -> ServiceInfo:
-        """Start a service"""
+        """
+        Start a service and wait until it is ready.
+        readiness is the service's readiness config (see providers.readiness.ReadinessSpec).
+        """
         pass
     
     @abstractmethod
@@ -131,9 +168,24 @@ class IsolationProvider(ABC):
         """Get the status of a specific service"""
         pass
     
+    def get_services_status(self, service_names: List[str]) -> Dict[str, ProviderStatus]:
+        """
+        Get the status of several services at once.
+        Providers should override this with a single batched query.
+        """
+        return {name: self.get_service_status(name) for name in service_names}
+    
+    def inspect_services(self, service_names: List[str]) -> Dict[str, Optional[ServiceInfo]]:
+        """
+        Get ServiceInfo for several services at once (None for services that do not exist).
+        The default implementation filters a single list_services() call.
+        """
+        services = {service.name: service for service in self.list_services()}
+        return {name: services.get(name) for name in service_names}
+    
     @abstractmethod
-    def list_services(self) -> List[ServiceInfo]:
-        """List all services managed by this provider"""
+    def list_services(self, project_name: Optional[str] = None) -> List[ServiceInfo]:
+        """List services managed by this provider, optionally only those of one project"""
         pass
     
     @abstractmethod
@@ -148,6 +200,40 @@ class IsolationProvider(ABC):
         """Get logs from a service"""
         pass
     
+    def stream_service_logs(self, service_name: str, lines: Optional[int] = 100,
+                            follow: bool = False, since: Optional[float] = None,
+                            until: Optional[float] = None, stdout: bool = True,
+                            stderr: bool = True, timestamps: bool = False) -> Iterator[LogLine]:
+        """
+        Yield a service's log lines incrementally (lines=None for all of them).
+        since/until are unix timestamps. The default implementation only
+        supports a plain tail through get_service_logs() (of 100 lines if lines is None).
+        """
+        if follow or since is not None or until is not None or not (stdout and stderr) or timestamps:
+            raise ProviderError(f"{self.provider_name} provider does not support streaming logs")
+        for text in self.get_service_logs(service_name, 100 if lines is None else lines):
+            yield LogLine(service_name, "stdout", text)
+    
+    def get_project_logs(self, project_name: str, services: List[Dict[str, Any]],
+                         lines: Optional[int] = 100, follow: bool = False,
+                         since: Optional[float] = None, reorder_window: float = 0.5,
+                         max_pending: int = 1000) -> Iterator[LogLine]:
+        """
+        Yield the logs of all services of a project as one stream ordered by timestamp.
+        Every service is read concurrently; lines carry the service name (not the
+        container name) and their timestamp. See logs.LogMerger for the ordering.
+        """
+        from .logs import merge_log_iterators
+        
+        streams = {
+            service['name']: self.stream_service_logs(
+                f"{project_name}-{service['name']}", lines=lines, follow=follow,
+                since=since, timestamps=True
+            )
+            for service in services
+        }
+        return merge_log_iterators(streams, reorder_window, max_pending)
+    
     @abstractmethod
     def get_service_stats(self, service_name: str) -> Dict[str, Any]:
         """Get resource usage stats for a service"""
@@ -170,15 +256,61 @@ class IsolationProvider(ABC):
         """Pull an image from registry"""
         pass
     
+    def prefetch_images(self, images: List[str], max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Pull the images that are not present locally, up to max_workers at a time.
+        Returns a report with per-image status ("present", "pulled", "failed") and timing.
+        """
+        from .prefetch import ImagePrefetcher
+        
+        return ImagePrefetcher(self, max_workers).run(images)
+    
     # Project-level operations
+    def start_projects(self, projects: List[Dict[str, Any]], max_parallel: int = 4,
+                       max_pulls: int = 4) -> Dict[str, Dict[str, ServiceInfo]]:
+        """
+        Start several projects (dicts with name, services and optionally networks and id).
+        The images of all projects are collected and prefetched once, so images shared
+        between projects are pulled a single time, before any project starts.
+        """
+        from .prefetch import collect_images
+        
+        images = collect_images(service for project in projects for service in project.get('services', []))
+        prefetched = self.prefetch_images(images, max_pulls)['images']
+        
+        started = {}
+        for project in projects:
+            started[project['name']] = self.start_project(
+                project['name'], project.get('services', []), project.get('networks'),
+                max_parallel=max_parallel, prefetch=False, project_id=project.get('id'),
+                prefetched=prefetched
+            )
+        return started
+    
     def start_project(self, project_name: str, services: List[Dict[str, Any]], 
-                     networks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, ServiceInfo]:
+                     networks: Optional[List[Dict[str, Any]]] = None,
+                     max_parallel: int = 4, prefetch: bool = True,
+                     project_id: Optional[str] = None,
+                     prefetched: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, ServiceInfo]:
         """
         Start all services for a project.
-        This is a convenience method that orchestrates multiple service starts.
+        Containers are labelled with project_id when given, so status changes can be
+        matched to the project (names are only unique within a workspace).
+        Missing images are pulled concurrently first (unless prefetch is False, e.g.
+        when start_projects() already did it and passes its per-image results as
+        prefetched); the outcome for each service's image is in its metadata['image_prefetch'].
+        Services are started concurrently (up to max_parallel at a time) in the
+        order given by their depends_on entries; on failure every service
+        that was started is removed again.
         """
+        from .orchestrator import ProjectOrchestrator, get_service_option
+        from .prefetch import collect_images, normalize_image
+        
         networks = networks or []
-        started_services = {}
+        
+        if prefetch:
+            prefetched = self.prefetch_images(collect_images(services))['images']
+        prefetched = prefetched or {}
         
         # Create networks first
         for network in networks:
@@ -190,36 +322,46 @@ class IsolationProvider(ABC):
                     subnet=network.get('subnet')
                 )
         
-        # Start services
-        for service in services:
-            service_name = f"{project_name}-{service['name']}"
-            network_name = f"{project_name}-network" if networks else None
-            
-            try:
-                service_info = self.start_service(
-                    service_name=service_name,
-                    image=service.get('image'),
-                    dockerfile_path=service.get('dockerfile_path'),
-                    command=service.get('command'),
-                    port_mappings={service.get('port', 80): service.get('port', 80)} if service.get('port') else {},
-                    environment=service.get('environment', {}),
-                    network_name=network_name
-                )
-                started_services[service['name']] = service_info
-            except Exception as e:
-                # Rollback: stop already started services
-                for started_name in started_services:
-                    self.stop_service(f"{project_name}-{started_name}")
-                raise Exception(f"Failed to start service {service['name']}: {e}")
+        network_name = f"{project_name}-network" if networks else None
+        
+        labels = {PROJECT_LABEL: project_name}
+        if project_id:
+            labels[PROJECT_ID_LABEL] = project_id
+        
+        def start(service: Dict[str, Any]) -> ServiceInfo:
+            info = self.start_service(
+                service_name=f"{project_name}-{service['name']}",
+                image=service.get('image'),
+                dockerfile_path=service.get('dockerfile_path'),
+                command=service.get('command'),
+                port_mappings={service.get('port', 80): service.get('port', 80)} if service.get('port') else {},
+                environment=service.get('environment', {}),
+                network_name=network_name,
+                readiness=get_service_option(service, 'readiness'),
+                labels=labels
+            )
+            pulled = prefetched.get(normalize_image(service['image'])) if service.get('image') else None
+            if pulled is not None:
+                info.metadata['image_prefetch'] = pulled
+            return info
+        
+        def discard(name: str):
+            # Removed, not just stopped: a leftover container would block the next start's name
+            self.remove_service(f"{project_name}-{name}")
         
-        return started_services
+        return ProjectOrchestrator(max_parallel).run(services, start, discard)
     
     def stop_project(self, project_name: str, services: List[Dict[str, Any]]) -> bool:
         """Stop all services for a project"""
         success = True
         
-        for service in services:
-            service_name = f"{project_name}-{service['name']}"
+        service_names = [f"{project_name}-{service['name']}" for service in services]
+        statuses = self.get_services_status(service_names)
+        
+        for service_name in service_names:
+            # Nothing to do for services that are already down
+            if statuses.get(service_name) == ProviderStatus.STOPPED:
+                continue
             if not self.stop_service(service_name):
                 success = False
         
@@ -231,9 +373,17 @@ class IsolationProvider(ABC):
         networks = networks or []
         success = True
         
-        # Remove services
-        for service in services:
-            service_name = f"{project_name}-{service['name']}"
+        # Remove services (ones that no longer exist are already removed)
+        service_names = [f"{project_name}-{service['name']}" for service in services]
+        try:
+            existing = self.inspect_services(service_names)
+        except ProviderError:
+            # Unknown: try to remove every service
+            existing = dict.fromkeys(service_names, True)
+        
+        for service_name in service_names:
+            if existing.get(service_name) is None:
+                continue
             if not self.remove_service(service_name):
                 success = False
         
@@ -248,12 +398,15 @@ class IsolationProvider(ABC):
     # Health check
     def health_check(self) -> Dict[str, Any]:
         """Perform a health check of the provider"""
+        from .readiness import readiness_metrics
+        
         return {
             "provider": self.provider_name,
             "available": self.is_available,
             "version": self.get_version() if self.is_available else None,
             "services_count": len(self.list_services()) if self.is_available else 0,
-            "networks_count": len(self.list_networks()) if self.is_available else 0
+            "networks_count": len(self.list_networks()) if self.is_available else 0,
+            "readiness": readiness_metrics.stats()
         }
 
 
@@ -267,6 +420,11 @@ class ProviderUnavailableError(ProviderError):
     pass
 
 
+class ProviderTimeoutError(ProviderError):
+    """Raised when a provider operation does not finish within its timeout"""
+    pass
+
+
 class ServiceError(ProviderError):
     """Raised when a service operation fails"""
     pass
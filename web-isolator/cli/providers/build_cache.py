@@ -0,0 +1,244 @@
+"""
+Content-addressed build cache for Web Isolator 2.0
+Hashes a build's inputs (Dockerfile, build args, build context honoring
+.dockerignore) so an image is only rebuilt when one of them changed.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+
+# Image label holding the digest of the inputs an image was built from
+BUILD_DIGEST_LABEL = "isolator.build-digest"
+
+# Files modified this recently are re-hashed even if mtime/size match, because
+# a second write within the filesystem's timestamp granularity is invisible
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class DockerIgnore:
+    """Matcher for .dockerignore patterns (last matching pattern wins, ! re-includes)"""
+
+    def __init__(self, patterns: List[str]):
+        self.rules: List[Tuple[re.Pattern, bool]] = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            include = pattern.startswith('!')
+            if include:
+                pattern = pattern[1:].strip()
+            pattern = os.path.normpath(pattern).replace(os.sep, '/').lstrip('/')
+            if pattern in ('', '.'):
+                continue
+            self.rules.append((re.compile(self._translate(pattern)), include))
+        self.has_exceptions = any(include for _, include in self.rules)
+
+    @classmethod
+    def from_context(cls, context: str) -> "DockerIgnore":
+        path = os.path.join(context, '.dockerignore')
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls(f.read().splitlines())
+        except FileNotFoundError:
+            return cls([])
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """Glob (with ** for any number of directories) to a regex; also matches everything below"""
+        regex = ''
+        i = 0
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith('**', i):
+                i += 2
+                if pattern.startswith('/', i):
+                    i += 1
+                    regex += '(?:.*/)?'
+                else:
+                    regex += '.*'
+                continue
+            if c == '*':
+                regex += '[^/]*'
+            elif c == '?':
+                regex += '[^/]'
+            elif c == '[':
+                end = pattern.find(']', i + 1)
+                if end == -1:
+                    regex += re.escape(c)
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    regex += f'[{body}]'
+                    i = end
+            else:
+                regex += re.escape(c)
+            i += 1
+        return f'^{regex}(?:/.*)?$'
+
+    def is_excluded(self, rel_path: str) -> bool:
+        excluded = False
+        for regex, include in self.rules:
+            if regex.match(rel_path):
+                excluded = not include
+        return excluded
+
+
+class BuildCache:
+    """
+    Maps the digest of a build's inputs to the image built from it.
+
+    Files whose mtime and size are unchanged since the last run reuse their
+    stored hash. The index (per-file hashes, builds and hit/miss statistics)
+    is persisted as JSON under ~/.isolator, once per build by record_hit() or
+    record_build().
+    """
+
+    def __init__(self, index_path: Optional[str] = None):
+        if index_path is None:
+            isolator_dir = Path.home() / ".isolator"
+            isolator_dir.mkdir(exist_ok=True)
+            index_path = str(isolator_dir / "build_cache.json")
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._index = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = {}
+        index.setdefault('contexts', {})
+        index.setdefault('builds', {})
+        index.setdefault('stats', {
+            'hits': 0, 'misses': 0, 'hash_time': 0.0,
+            'files_hashed': 0, 'files_reused': 0,
+        })
+        return index
+
+    def _save(self):
+        """Write the index atomically (lock must be held)"""
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def compute_digest(self, dockerfile_path: str, build_context: str,
+                       build_options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Digest of the Dockerfile, build options and every file docker would send as context.
+        The file hashes are kept in memory until the build is recorded.
+        """
+        started = time.perf_counter()
+        context = os.path.abspath(build_context)
+        ignore = DockerIgnore.from_context(context)
+
+        with self._lock:
+            previous = self._index['contexts'].get(context, {})
+        current: Dict[str, List[Any]] = {}
+        hashed = reused = 0
+        racy_after = time.time_ns() - RACY_WINDOW_NS
+
+        for dirpath, dirnames, filenames in os.walk(context):
+            rel_dir = os.path.relpath(dirpath, context).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir + '/'
+            # Skip excluded directories, unless a ! pattern could re-include something below them
+            if not ignore.has_exceptions:
+                dirnames[:] = [d for d in dirnames if not ignore.is_excluded(rel_dir + d)]
+            dirnames.sort()
+
+            for filename in filenames:
+                rel_path = rel_dir + filename
+                if ignore.is_excluded(rel_path):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                except OSError:
+                    continue
+
+                entry = previous.get(rel_path)
+                if (entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size
+                        and stat.st_mtime_ns < racy_after):
+                    file_hash = entry[2]
+                    reused += 1
+                else:
+                    file_hash = _hash_file(os.path.join(dirpath, filename))
+                    hashed += 1
+                executable = bool(stat.st_mode & 0o111)
+                current[rel_path] = [stat.st_mtime_ns, stat.st_size, file_hash, executable]
+
+        digest = hashlib.sha256()
+        # The Dockerfile may live outside the context
+        digest.update(b'dockerfile\0' + _hash_file(dockerfile_path).encode() + b'\0')
+        digest.update(b'options\0' + json.dumps(build_options or {}, sort_keys=True, default=str).encode() + b'\0')
+        for rel_path in sorted(current):
+            _, _, file_hash, executable = current[rel_path]
+            digest.update(f'{rel_path}\0{int(executable)}\0{file_hash}\0'.encode())
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._index['contexts'][context] = current
+            stats = self._index['stats']
+            stats['hash_time'] += elapsed
+            stats['last_hash_time'] = elapsed
+            stats['files_hashed'] += hashed
+            stats['files_reused'] += reused
+
+        return digest.hexdigest()
+
+    def record_hit(self, image_tag: str, digest: str):
+        """Record that image_tag was reused for digest"""
+        with self._lock:
+            self._index['stats']['hits'] += 1
+            build = self._index['builds'].setdefault(image_tag, {'digest': digest})
+            build['last_hit_at'] = time.time()
+            self._save()
+
+    def record_build(self, image_tag: str, digest: str, build_time: float):
+        """Record that image_tag was (re)built for digest"""
+        with self._lock:
+            self._index['stats']['misses'] += 1
+            self._index['builds'][image_tag] = {
+                'digest': digest,
+                'built_at': time.time(),
+                'build_time': build_time,
+            }
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            stats = dict(self._index['stats'])
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            stats['images'] = len(self._index['builds'])
+            return stats
+
+
+def _hash_file(path: str) -> str:
+    """sha256 of a file's contents"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+_cache: Optional[BuildCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_build_cache() -> BuildCache:
+    """Get the process-wide build cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BuildCache()
+        return _cache
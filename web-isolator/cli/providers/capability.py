@@ -0,0 +1,105 @@
+"""
+Capability probes for Web Isolator 2.0 providers
+Caches the result of "is this tool installed, and which version" checks so
+providers do not spawn a process for every operation.
+"""
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class CapabilityProbe:
+    """
+    Cached availability/version probe for a command line tool.
+
+    The probe command (e.g. ``docker --version``) is run at most once per TTL;
+    negative results expire sooner so a freshly installed tool is picked up.
+    """
+
+    def __init__(self, command: List[str], ttl: float = 30.0,
+                 negative_ttl: float = 5.0, timeout: float = 5.0):
+        self.command = command
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._version: Optional[str] = None
+        self._expires_at = 0.0
+
+        # Probe statistics
+        self.probe_count = 0
+        self.cache_hits = 0
+
+    def _run_probe(self):
+        """Run the probe command and store the result (lock must be held)"""
+        self.probe_count += 1
+        try:
+            result = subprocess.run(
+                self.command,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+            self._available = result.returncode == 0
+            self._version = result.stdout.strip() if self._available else None
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            self._available = False
+            self._version = None
+
+        ttl = self.ttl if self._available else self.negative_ttl
+        self._expires_at = time.monotonic() + ttl
+
+    def _refresh(self):
+        """Re-run the probe if the cached result has expired"""
+        with self._lock:
+            if self._available is not None and time.monotonic() < self._expires_at:
+                self.cache_hits += 1
+                return
+            self._run_probe()
+
+    def is_available(self) -> bool:
+        """Whether the tool is available (cached)"""
+        self._refresh()
+        return bool(self._available)
+
+    def get_version(self) -> Optional[str]:
+        """Version string reported by the probe command (cached)"""
+        self._refresh()
+        return self._version
+
+    def invalidate(self):
+        """Drop the cached result so the next check probes again"""
+        with self._lock:
+            self._available = None
+            self._version = None
+            self._expires_at = 0.0
+
+    def stats(self) -> Dict[str, object]:
+        """Get probe statistics"""
+        with self._lock:
+            return {
+                "command": " ".join(self.command),
+                "available": self._available,
+                "version": self._version,
+                "probe_count": self.probe_count,
+                "cache_hits": self.cache_hits,
+                "expires_in": max(0.0, self._expires_at - time.monotonic()),
+            }
+
+
+# Probes are shared process-wide so every provider instance sees the same state
+_probes: Dict[str, CapabilityProbe] = {}
+_probes_lock = threading.Lock()
+
+
+def get_probe(name: str, command: List[str], **kwargs) -> CapabilityProbe:
+    """Get the shared probe registered under name, creating it on first use"""
+    with _probes_lock:
+        probe = _probes.get(name)
+        if probe is None:
+            probe = CapabilityProbe(command, **kwargs)
+            _probes[name] = probe
+        return probe
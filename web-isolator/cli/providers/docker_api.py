@@ -0,0 +1,435 @@
+"""
+Docker Engine API client for Web Isolator 2.0
+Talks HTTP/1.1 to the Docker daemon over its unix socket with pooled
+keep-alive connections, instead of forking the docker CLI per operation.
+"""
+import http.client
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from .base import ProviderError, ProviderTimeoutError, ProviderUnavailableError
+
+
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+
+
+class DockerAPIError(ProviderError):
+    """Raised when the Docker Engine API returns an error response"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that connects to a unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        # Host is only used for the Host header
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def socket_path_from_env() -> str:
+    """Resolve the daemon socket from DOCKER_HOST, defaulting to /var/run/docker.sock"""
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if docker_host.startswith("unix://"):
+        return docker_host[len("unix://"):]
+    return DEFAULT_SOCKET_PATH
+
+
+def request_url(path: str, params: Optional[Dict[str, Any]] = None,
+                api_version: Optional[str] = None) -> str:
+    """Request target for an API path; None-valued params are left out"""
+    url = f"/v{api_version}{path}" if api_version else path
+    if params:
+        query = {k: v for k, v in params.items() if v is not None}
+        if query:
+            url += "?" + urlencode(query)
+    return url
+
+
+def parse_error(status: int, data: bytes) -> "DockerAPIError":
+    """DockerAPIError for an error response, using the JSON message if there is one"""
+    message = data.decode("utf-8", "replace")
+    try:
+        message = json.loads(message).get("message", message)
+    except (ValueError, AttributeError):
+        pass
+    return DockerAPIError(status, message.strip())
+
+
+def pull_params(name: str) -> Dict[str, str]:
+    """fromImage/tag query params for pulling an image reference"""
+    image, tag = name, "latest"
+    last_part = name.rsplit("/", 1)[-1]
+    if "@" not in name and ":" in last_part:
+        image, tag = name.rsplit(":", 1)
+    return {"fromImage": image, "tag": tag}
+
+
+def check_pull_progress(data: bytes):
+    """Raise DockerAPIError if a pull progress stream reports an error"""
+    for line in data.splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if "error" in event:
+            raise DockerAPIError(500, event["error"])
+
+
+def is_multiplexed(data: bytes) -> bool:
+    """Whether a logs/attach payload starts with a stream frame header"""
+    return len(data) >= 8 and data[0] in (0, 1, 2) and data[1:4] == b"\x00\x00\x00"
+
+
+def demux_stream(data: bytes) -> List[Tuple[int, bytes]]:
+    """
+    Split a multiplexed attach/logs stream into (stream, payload) frames.
+    Each frame has an 8 byte header: stream type (1=stdout, 2=stderr), 3 bytes
+    padding, then a big-endian uint32 payload size.
+    """
+    frames = []
+    offset = 0
+    while offset + 8 <= len(data):
+        stream_type, size = struct.unpack(">BxxxL", data[offset:offset + 8])
+        offset += 8
+        frames.append((stream_type, data[offset:offset + size]))
+        offset += size
+    return frames
+
+
+class DockerAPIClient:
+    """Minimal Docker Engine API client with a pool of keep-alive connections"""
+
+    # How long a ping result is trusted before checking the socket again
+    REACHABLE_TTL = 30.0
+    UNREACHABLE_TTL = 5.0
+
+    def __init__(self, socket_path: Optional[str] = None, pool_size: int = 4,
+                 timeout: float = 30.0, api_version: Optional[str] = None):
+        self.socket_path = socket_path or socket_path_from_env()
+        self.timeout = timeout
+        self.api_version = api_version
+        self._pool: "queue.LifoQueue[UnixHTTPConnection]" = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._reachable: Optional[bool] = None
+        self._reachable_until = 0.0
+        self.requests_made = 0
+        self.connections_opened = 0
+
+    # Transport
+    def _acquire(self) -> UnixHTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.connections_opened += 1
+            return UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+
+    def _release(self, conn: UnixHTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        return request_url(path, params, self.api_version)
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                body: Any = None, timeout: Optional[float] = None) -> Tuple[int, bytes]:
+        """Send a request and return (status, body). Retries once on a stale keep-alive socket."""
+        url = self._url(path, params)
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            conn = self._acquire()
+            if timeout is not None:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                conn.close()
+                # The daemon closed an idle keep-alive connection; retry on a fresh one
+                if attempt == 0:
+                    continue
+                self.invalidate()
+                raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self.invalidate()
+                raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+
+            with self._lock:
+                self.requests_made += 1
+            if timeout is not None:
+                conn.timeout = self.timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(self.timeout)
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+
+        raise ProviderError("Docker API request failed")  # pragma: no cover
+
+    def _call(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+              body: Any = None, timeout: Optional[float] = None) -> Any:
+        """Send a request, raise DockerAPIError on failure and decode a JSON body"""
+        status, data = self.request(method, path, params, body, timeout)
+        if status >= 400:
+            raise parse_error(status, data)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data
+
+    def stream(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None) -> Iterator[bytes]:
+        """
+        Yield response lines from a streaming endpoint (events, follow logs).
+        Uses a dedicated connection; iteration ends when the daemon closes the
+        stream or no data arrives within timeout.
+        """
+        conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        try:
+            try:
+                conn.request(method, self._url(path, params))
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException) as e:
+                self.invalidate()
+                raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+            if response.status >= 400:
+                raise DockerAPIError(response.status, response.read().decode("utf-8", "replace").strip())
+
+            while True:
+                try:
+                    line = response.readline()
+                except socket.timeout:
+                    return
+                except (OSError, http.client.HTTPException) as e:
+                    raise ProviderUnavailableError(f"Docker stream interrupted: {e}")
+                if not line:
+                    return
+                yield line
+        finally:
+            conn.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # System
+    def ping(self) -> bool:
+        """Check that the daemon answers on the socket"""
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            status, _ = self.request("GET", "/_ping", timeout=5)
+            return status == 200
+        except ProviderError:
+            return False
+
+    def is_reachable(self) -> bool:
+        """Cached ping result"""
+        now = time.monotonic()
+        if self._reachable is None or now >= self._reachable_until:
+            self._reachable = self.ping()
+            ttl = self.REACHABLE_TTL if self._reachable else self.UNREACHABLE_TTL
+            self._reachable_until = now + ttl
+        return self._reachable
+
+    def invalidate(self):
+        """Forget the cached ping result and drop pooled connections"""
+        self._reachable = None
+        self._reachable_until = 0.0
+        self.close()
+
+    def version(self) -> Dict[str, Any]:
+        return self._call("GET", "/version")
+
+    def events(self, filters: Optional[Dict[str, List[str]]] = None, since: Optional[float] = None,
+               until: Optional[float] = None, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Yield decoded events from the daemon's event stream"""
+        params: Dict[str, Any] = {
+            "since": str(int(since)) if since is not None else None,
+            "until": str(int(until)) if until is not None else None,
+        }
+        if filters:
+            params["filters"] = json.dumps(filters)
+        for line in self.stream("GET", "/events", params, timeout=timeout):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    # Containers
+    def inspect_container(self, name: str) -> Dict[str, Any]:
+        return self._call("GET", f"/containers/{quote(name)}/json")
+
+    def list_containers(self, all: bool = True,
+                        filters: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        params = {"all": "1" if all else "0"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return self._call("GET", "/containers/json", params)
+
+    def create_container(self, name: str, config: Dict[str, Any]) -> str:
+        result = self._call("POST", "/containers/create", {"name": name}, body=config)
+        return result["Id"]
+
+    def start_container(self, name: str):
+        self._call("POST", f"/containers/{quote(name)}/start")
+
+    def stop_container(self, name: str, timeout: int = 10):
+        # Allow the stop grace period on top of the normal request timeout
+        self._call("POST", f"/containers/{quote(name)}/stop", {"t": timeout},
+                   timeout=self.timeout + timeout)
+
+    def restart_container(self, name: str, timeout: int = 10):
+        self._call("POST", f"/containers/{quote(name)}/restart", {"t": timeout},
+                   timeout=self.timeout + timeout)
+
+    def remove_container(self, name: str, force: bool = False):
+        self._call("DELETE", f"/containers/{quote(name)}", {"force": "1" if force else None})
+
+    def container_stats(self, name: str) -> Dict[str, Any]:
+        # Without one-shot the daemon waits for a second sample so precpu_stats is filled in
+        return self._call("GET", f"/containers/{quote(name)}/stats", {"stream": "0"})
+
+    def container_logs(self, name: str, tail: Optional[int] = None, stdout: bool = True,
+                       stderr: bool = True, timestamps: bool = False) -> List[Tuple[int, bytes]]:
+        """Fetch (non-follow) logs as a list of (stream, payload) frames"""
+        params = {
+            "stdout": "1" if stdout else "0",
+            "stderr": "1" if stderr else "0",
+            "timestamps": "1" if timestamps else "0",
+            "tail": str(tail) if tail is not None else "all",
+        }
+        status, data = self.request("GET", f"/containers/{quote(name)}/logs", params)
+        if status >= 400:
+            raise DockerAPIError(status, data.decode("utf-8", "replace").strip())
+        # TTY containers are not multiplexed
+        if not is_multiplexed(data):
+            return [(1, data)]
+        return demux_stream(data)
+
+    def container_log_stream(self, name: str, params: Dict[str, Any],
+                             timeout: Optional[float] = None) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield (stream, payload) chunks of a container's logs as the daemon sends
+        them, on a dedicated connection. With follow in params this tails until
+        the container stops or the iterator is closed; timeout limits the wait
+        for each chunk.
+        """
+        # TTY containers are not multiplexed
+        tty = bool((self.inspect_container(name).get("Config") or {}).get("Tty"))
+        conn = UnixHTTPConnection(self.socket_path, timeout=timeout)
+        try:
+            try:
+                conn.request("GET", self._url(f"/containers/{quote(name)}/logs", params))
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException) as e:
+                self.invalidate()
+                raise ProviderUnavailableError(f"Docker daemon connection failed: {e}")
+            if response.status >= 400:
+                raise parse_error(response.status, response.read())
+
+            while True:
+                try:
+                    if tty:
+                        frame = (1, response.read1(65536))
+                        if not frame[1]:
+                            return
+                    else:
+                        header = response.read(8)
+                        if len(header) < 8:
+                            return
+                        stream_type, size = struct.unpack(">BxxxL", header)
+                        frame = (stream_type, response.read(size))
+                except socket.timeout:
+                    raise ProviderTimeoutError(f"No log output from {name} within {timeout:g}s")
+                except (OSError, http.client.HTTPException) as e:
+                    raise ProviderUnavailableError(f"Docker stream interrupted: {e}")
+                yield frame
+        finally:
+            conn.close()
+
+    # Networks
+    def create_network(self, name: str, driver: str = "bridge", subnet: Optional[str] = None,
+                       labels: Optional[Dict[str, str]] = None) -> str:
+        config: Dict[str, Any] = {"Name": name, "Driver": driver, "CheckDuplicate": True}
+        if subnet:
+            config["IPAM"] = {"Config": [{"Subnet": subnet}]}
+        if labels:
+            config["Labels"] = labels
+        return self._call("POST", "/networks/create", body=config)["Id"]
+
+    def remove_network(self, name: str):
+        self._call("DELETE", f"/networks/{quote(name)}")
+
+    def list_networks(self) -> List[Dict[str, Any]]:
+        return self._call("GET", "/networks")
+
+    def inspect_network(self, name: str) -> Dict[str, Any]:
+        return self._call("GET", f"/networks/{quote(name)}")
+
+    # Images
+    def inspect_image(self, name: str) -> Dict[str, Any]:
+        return self._call("GET", f"/images/{quote(name, safe='')}/json")
+
+    def pull_image(self, name: str):
+        """Pull an image, raising DockerAPIError if the progress stream reports an error"""
+        # Pulls can take a long time; the daemon streams progress until done
+        status, data = self.request("POST", "/images/create", pull_params(name),
+                                    timeout=max(self.timeout, 600))
+        if status >= 400:
+            raise DockerAPIError(status, data.decode("utf-8", "replace").strip())
+        check_pull_progress(data)
+
+
+# Clients are shared per socket so keep-alive connections are reused across providers
+_clients: Dict[str, DockerAPIClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(socket_path: Optional[str] = None) -> DockerAPIClient:
+    """Get the process-wide client for a daemon socket"""
+    path = socket_path or socket_path_from_env()
+    with _clients_lock:
+        client = _clients.get(path)
+        if client is None:
+            client = DockerAPIClient(path)
+            _clients[path] = client
+        return client
@@ -1,56 +1,223 @@
 """
 Docker provider implementation for Web Isolator 2.0
 """
+import os
 import subprocess
 import json
+import math
 import re
+import selectors
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 from .base import (
-    IsolationProvider, ServiceInfo, NetworkInfo, ProviderStatus,
-    ProviderError, ProviderUnavailableError, ServiceError, NetworkError
+    IsolationProvider, ServiceInfo, NetworkInfo, LogLine, ProviderStatus,
+    ProviderError, ProviderUnavailableError, ProviderTimeoutError, ServiceError, NetworkError,
+    MANAGED_LABEL, PROJECT_LABEL, SERVICE_LABEL
+)
+from .async_base import AsyncIsolationProvider
+from .build_cache import BUILD_DIGEST_LABEL, BuildCache, get_build_cache
+from .capability import get_probe
+from .docker_api import DockerAPIClient, DockerAPIError, get_shared_client
+from .logs import iter_log_lines, log_args, log_params
+from .readiness import ReadinessSpec, ReadinessTimeout, readiness_metrics, wait_for_endpoints
+from .resource_sampler import ResourceSampler
+from .state_mirror import ContainerStateMirror, ProjectListener, get_shared_mirror
+
+
+# Docker container state -> ProviderStatus
+STATUS_MAPPING = {
+    'running': ProviderStatus.RUNNING,
+    'exited': ProviderStatus.STOPPED,
+    'created': ProviderStatus.STOPPED,
+    'restarting': ProviderStatus.STARTING,
+    'paused': ProviderStatus.STOPPED,
+    'dead': ProviderStatus.ERROR
+}
+
+# Default timeout of docker CLI commands (override with ISOLATOR_DOCKER_TIMEOUT)
+DEFAULT_COMMAND_TIMEOUT = 30.0
+
+# Timeout of builds and pulls, which routinely take longer than other commands
+LONG_COMMAND_TIMEOUT = 1800.0
+
+# stderr fragments that mean the Docker daemon could not be reached
+DAEMON_UNREACHABLE_MARKERS = (
+    "Cannot connect to the Docker daemon",
+    "Is the docker daemon running",
+    "error during connect",
 )
 
 
 class DockerProvider(IsolationProvider):
-    """Docker-based isolation provider"""
+    """
+    Docker-based isolation provider.
+    
+    Operations go through the Docker Engine API over the daemon's unix socket
+    when it is reachable, and fall back to the docker CLI otherwise. Set
+    ISOLATOR_DOCKER_BACKEND=cli to force the CLI backend.
+    """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         super().__init__("docker")
-        self._docker_client = None
+        self.backend = backend or os.environ.get("ISOLATOR_DOCKER_BACKEND", "auto")
+        self._docker_client: Optional[DockerAPIClient] = None
+        if self.backend != "cli":
+            self._docker_client = get_shared_client()
+        self._probe = get_probe("docker", ['docker', '--version'])
+        self._mirror: Optional[ContainerStateMirror] = None
+        self._sampler: Optional[ResourceSampler] = None
+        self._build_cache: Optional[BuildCache] = None
+        self.command_timeout = float(os.environ.get("ISOLATOR_DOCKER_TIMEOUT", DEFAULT_COMMAND_TIMEOUT))
+    
+    def as_async(self, executor: Optional[Any] = None) -> "AsyncIsolationProvider":
+        """Async interface to this provider (Engine API calls run on the event loop)"""
+        from .async_docker_provider import AsyncDockerProvider
+        return AsyncDockerProvider(self, executor)
+    
+    def _get_api(self) -> Optional[DockerAPIClient]:
+        """Engine API client if the daemon socket answers, else None (use the CLI)"""
+        if self._docker_client is not None and self._docker_client.is_reachable():
+            return self._docker_client
+        return None
+    
+    def start_state_mirror(self, on_project_status: Optional[ProjectListener] = None) -> bool:
+        """
+        Serve status reads from an in-memory mirror fed by the Docker events stream.
+        on_project_status(project_name, status, project_id) is called on project transitions.
+        Returns False if the Engine API is not reachable (CLI backend).
+        """
+        api = self._get_api()
+        if api is None:
+            return False
+        
+        self._mirror = get_shared_mirror(api)
+        if on_project_status:
+            self._mirror.add_listener(on_project_status)
+        self._mirror.start()
+        return True
+    
+    def stop_state_mirror(self):
+        """Stop the state mirror; reads go to the daemon again"""
+        if self._mirror:
+            self._mirror.stop()
+            self._mirror = None
+    
+    def state_mirror_stats(self) -> Optional[Dict[str, Any]]:
+        """State mirror statistics, or None if the mirror is not running"""
+        return self._mirror.stats() if self._mirror else None
+    
+    def start_resource_sampler(self, interval: float = 5.0, capacity: int = 720,
+                               cgroup_root: Optional[str] = None) -> ResourceSampler:
+        """
+        Sample CPU, memory, IO and pids of running managed containers from the
+        cgroup filesystem every interval seconds (capacity samples are kept).
+        get_service_stats() answers from the sampler while its data is fresh.
+        """
+        if self._sampler is None:
+            self._sampler = ResourceSampler(self._running_containers, interval, capacity, cgroup_root)
+        self._sampler.start()
+        return self._sampler
+    
+    def stop_resource_sampler(self):
+        """Stop sampling container resources"""
+        if self._sampler:
+            self._sampler.stop()
+            self._sampler = None
+    
+    @property
+    def resource_sampler(self) -> Optional[ResourceSampler]:
+        return self._sampler
+    
+    def _running_containers(self) -> List[Dict[str, Any]]:
+        """Running managed containers (full id, name, project, service) for the sampler"""
+        mirror = self._get_mirror()
+        if mirror:
+            containers = [c for c in mirror.containers() if c.get('State') == 'running']
+        else:
+            api = self._get_api()
+            if api is None:
+                return self._running_containers_cli()
+            containers = api.list_containers(all=False, filters={'label': [f'{MANAGED_LABEL}=true']})
+        
+        running = []
+        for container in containers:
+            labels = container.get('Labels') or {}
+            running.append(self._sampled_container(
+                container['Id'], (container.get('Names') or [''])[0].lstrip('/'), labels.get(PROJECT_LABEL)
+            ))
+        return running
+    
+    def _running_containers_cli(self) -> List[Dict[str, Any]]:
+        """_running_containers through 'docker ps'"""
+        result = self._run_docker_command([
+            'ps', '--no-trunc', '--filter', f'label={MANAGED_LABEL}=true',
+            '--format', f'{{{{.ID}}}}\t{{{{.Names}}}}\t{{{{.Label "{PROJECT_LABEL}"}}}}'
+        ])
+        running = []
+        for line in result.stdout.splitlines():
+            fields = line.split('\t')
+            if len(fields) == 3:
+                running.append(self._sampled_container(fields[0], fields[1].split(',')[0], fields[2] or None))
+        return running
+    
+    def _sampled_container(self, container_id: str, name: str, project: Optional[str]) -> Dict[str, Any]:
+        prefix = f"{project}-" if project else None
+        service = name[len(prefix):] if prefix and name.startswith(prefix) else name
+        return {'id': container_id, 'name': name, 'project': project, 'service': service}
+    
+    def _sampled_stats(self, service_name: str) -> Optional[Dict[str, Any]]:
+        """get_service_stats() from the resource sampler, if it has a fresh sample"""
+        if self._sampler is None:
+            return None
+        sample = self._sampler.latest(service_name)
+        if sample is None or time.time() - sample['timestamp'] > 2 * self._sampler.interval:
+            return None
+        
+        def pair(first: Optional[float], second: Optional[float], binary: bool = False) -> str:
+            return f"{_format_bytes(first or 0, binary)} / {_format_bytes(second or 0, binary)}"
+        
+        # NaN: not readable from this cgroup
+        cpu_percent = 0.0 if math.isnan(sample['cpu_percent']) else sample['cpu_percent']
+        memory_used = 0.0 if math.isnan(sample['memory_bytes']) else sample['memory_bytes']
+        return {
+            'cpu_percent': f"{cpu_percent:.2f}%",
+            'memory_usage': pair(memory_used, sample['memory_limit'], True),
+            'network_io': pair(sample['net_rx'], sample['net_tx']),
+            'block_io': pair(sample['io_read'], sample['io_write'])
+        }
+    
+    def _get_mirror(self) -> Optional[ContainerStateMirror]:
+        """State mirror if it is running and in sync, else None"""
+        if self._mirror is not None and self._mirror.synced:
+            return self._mirror
+        return None
+    
+    def _refresh_mirror(self, name_or_id: str):
+        """Read our own change back into the mirror without waiting for its event"""
+        if self._mirror is not None:
+            self._mirror.refresh(name_or_id)
     
     @property
     def is_available(self) -> bool:
-        """Check if Docker is available"""
-        try:
-            result = subprocess.run(
-                ['docker', '--version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        """Check if Docker is available (cached by the API client / capability probe)"""
+        return self._get_api() is not None or self._probe.is_available()
     
     def get_version(self) -> str:
         """Get Docker version"""
         if not self.is_available:
             raise ProviderUnavailableError("Docker is not available")
         
-        try:
-            result = subprocess.run(
-                ['docker', '--version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            return result.stdout.strip()
-        except subprocess.TimeoutExpired:
-            raise ProviderError("Timeout getting Docker version")
+        api = self._get_api()
+        if api:
+            version = api.version()
+            return f"Docker version {version.get('Version', 'unknown')}, API {version.get('ApiVersion', 'unknown')}"
+        
+        return self._probe.get_version() or ""
     
-    def _run_docker_command(self, args: List[str], check: bool = True) -> subprocess.CompletedProcess:
-        """Run a docker command and return the result"""
+    def _run_docker_command(self, args: List[str], check: bool = True,
+                            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run a docker command and return the result (timeout defaults to command_timeout)"""
         if not self.is_available:
             raise ProviderUnavailableError("Docker is not available")
         
@@ -60,22 +227,73 @@ class DockerProvider(IsolationProvider):
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=timeout or self.command_timeout
             )
             
+            if result.returncode != 0 and any(m in result.stderr for m in DAEMON_UNREACHABLE_MARKERS):
+                # Daemon went away: make the next availability check probe again
+                self._probe.invalidate()
+            
             if check and result.returncode != 0:
                 raise ProviderError(f"Docker command failed: {result.stderr}")
             
             return result
         except subprocess.TimeoutExpired:
-            raise ProviderError(f"Docker command timed out: {args}")
+            raise ProviderTimeoutError(f"Docker command timed out: {args}")
+        except FileNotFoundError:
+            self._probe.invalidate()
+            raise ProviderUnavailableError("Docker command not found")
+    
+    def _stream_docker_command(self, args: List[str], timeout: Optional[float] = None) -> Iterator[str]:
+        """Run a docker command and yield its non-empty stdout lines as they are produced"""
+        if not self.is_available:
+            raise ProviderUnavailableError("Docker is not available")
+        
+        try:
+            process = subprocess.Popen(
+                ['docker'] + args,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
         except FileNotFoundError:
+            self._probe.invalidate()
             raise ProviderUnavailableError("Docker command not found")
+        
+        timer = threading.Timer(timeout or self.command_timeout, process.kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                if line:
+                    yield line
+            stderr = process.stderr.read()
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+        
+        if returncode != 0:
+            if any(m in stderr for m in DAEMON_UNREACHABLE_MARKERS):
+                self._probe.invalidate()
+            raise ProviderError(f"Docker command failed: {stderr.strip() or f'exit code {returncode}'}")
     
     # Network management
     def create_network(self, name: str, driver: str = "bridge", 
                       subnet: Optional[str] = None, **kwargs) -> NetworkInfo:
         """Create a Docker network"""
+        api = self._get_api()
+        if api and not kwargs:
+            try:
+                network_id = api.create_network(name, driver, subnet)
+                return NetworkInfo(network_id=network_id, name=name, driver=driver, subnet=subnet)
+            except ProviderError as e:
+                raise NetworkError(f"Failed to create network {name}: {e}")
+        
         args = ['network', 'create', '--driver', driver]
         
         if subnet:
@@ -104,6 +322,10 @@ class DockerProvider(IsolationProvider):
     def delete_network(self, network_name: str) -> bool:
         """Delete a Docker network"""
         try:
+            api = self._get_api()
+            if api:
+                api.remove_network(network_name)
+                return True
             self._run_docker_command(['network', 'rm', network_name])
             return True
         except ProviderError:
@@ -112,22 +334,22 @@ class DockerProvider(IsolationProvider):
     def list_networks(self) -> List[NetworkInfo]:
         """List Docker networks"""
         try:
-            result = self._run_docker_command([
-                'network', 'ls', '--format', 
-                '{{.ID}}\\t{{.Name}}\\t{{.Driver}}\\t{{.Scope}}'
-            ])
+            api = self._get_api()
+            if api:
+                return [self._network_from_api(n) for n in api.list_networks()]
             
             networks = []
-            for line in result.stdout.strip().split('\\n'):
-                if line:
-                    parts = line.split('\\t')
-                    if len(parts) >= 3:
-                        networks.append(NetworkInfo(
-                            network_id=parts[0],
-                            name=parts[1],
-                            driver=parts[2],
-                            metadata={'scope': parts[3] if len(parts) > 3 else 'local'}
-                        ))
+            for line in self._stream_docker_command(['network', 'ls', '--format', '{{json .}}']):
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                networks.append(NetworkInfo(
+                    network_id=row.get('ID', ''),
+                    name=row.get('Name', ''),
+                    driver=row.get('Driver', ''),
+                    metadata={'scope': row.get('Scope') or 'local'}
+                ))
             
             return networks
         except ProviderError as e:
@@ -136,11 +358,26 @@ class DockerProvider(IsolationProvider):
     def network_exists(self, network_name: str) -> bool:
         """Check if a network exists"""
         try:
+            api = self._get_api()
+            if api:
+                api.inspect_network(network_name)
+                return True
             self._run_docker_command(['network', 'inspect', network_name])
             return True
         except ProviderError:
             return False
     
+    def _network_from_api(self, network: Dict[str, Any]) -> NetworkInfo:
+        """Build NetworkInfo from an Engine API network object"""
+        ipam_config = (network.get('IPAM') or {}).get('Config') or []
+        return NetworkInfo(
+            network_id=network['Id'][:12],
+            name=network['Name'],
+            driver=network.get('Driver', ''),
+            subnet=ipam_config[0].get('Subnet') if ipam_config else None,
+            metadata={'scope': network.get('Scope', 'local')}
+        )
+    
     # Service management
     def start_service(self, 
                      service_name: str,
@@ -152,11 +389,18 @@ class DockerProvider(IsolationProvider):
                      network_name: Optional[str] = None,
                      working_dir: Optional[str] = None,
                      volumes: Optional[Dict[str, str]] = None,
+                     readiness: Optional[Dict[str, Any]] = None,
+                     labels: Optional[Dict[str, str]] = None,
                      **kwargs) -> ServiceInfo:
         """Start a Docker container"""
         
         args = ['run', '-d', '--name', service_name]
         
+        # Labels mark the container as managed by the isolator
+        labels = dict(labels or {}, **{MANAGED_LABEL: 'true', SERVICE_LABEL: service_name})
+        for key, value in labels.items():
+            args.extend(['--label', f'{key}={value}'])
+        
         # Port mappings
         if port_mappings:
             for host_port, container_port in port_mappings.items():
@@ -190,22 +434,46 @@ class DockerProvider(IsolationProvider):
             # Build image first
             build_tag = f"{service_name}:latest"
             self.build_image(dockerfile_path, build_tag)
-            args.append(build_tag)
+            run_image = build_tag
         elif image:
-            args.append(image)
+            run_image = image
         else:
             raise ServiceError("Either image or dockerfile_path must be provided")
+        args.append(run_image)
         
         # Command
         if command:
             args.extend(command.split())
         
+        spec = ReadinessSpec.from_config(readiness)
+        
         try:
-            result = self._run_docker_command(args)
-            container_id = result.stdout.strip()
+            # Event timestamps have second resolution
+            since = time.time() - 1
+            started_at = time.monotonic()
+            
+            api = self._get_api()
+            if api and not kwargs:
+                container_id = self._run_container_via_api(
+                    api, service_name, run_image, command, port_mappings,
+                    environment, network_name, working_dir, volumes, labels
+                )
+            else:
+                # 'docker run' pulls a missing image implicitly
+                result = self._run_docker_command(args, timeout=LONG_COMMAND_TIMEOUT)
+                container_id = result.stdout.strip()
             
-            # Wait a moment for container to start
-            time.sleep(2)
+            try:
+                self._wait_until_ready(service_name, container_id, spec, port_mappings, since)
+            except ServiceError as e:
+                if isinstance(e, ReadinessTimeout):
+                    readiness_metrics.record_timeout(service_name, time.monotonic() - started_at)
+                # Not part of the project's started services, so nothing else would remove it
+                self._discard_container(container_id)
+                raise
+            time_to_ready = time.monotonic() - started_at
+            readiness_metrics.record_ready(service_name, time_to_ready)
+            self._refresh_mirror(container_id)
             
             return ServiceInfo(
                 service_id=container_id,
@@ -213,14 +481,144 @@ class DockerProvider(IsolationProvider):
                 status=self.get_service_status(service_name),
                 port_mappings=port_mappings or {},
                 environment=environment or {},
-                metadata={'image': image or build_tag or 'unknown', 'dockerfile_path': dockerfile_path}
+                metadata={
+                    'image': image or build_tag or 'unknown',
+                    'dockerfile_path': dockerfile_path,
+                    'time_to_ready': time_to_ready
+                }
             )
         except ProviderError as e:
             raise ServiceError(f"Failed to start service {service_name}: {e}")
     
+    def _wait_until_ready(self, service_name: str, container_id: str, spec: ReadinessSpec,
+                          port_mappings: Optional[Dict[int, int]], since: float):
+        """Block until the container passes its readiness checks or the spec times out"""
+        deadline = time.monotonic() + spec.timeout
+        
+        if spec.state or spec.healthcheck:
+            api = self._get_api()
+            if api:
+                state = self._wait_for_state_via_events(api, container_id, spec, deadline, since)
+            else:
+                state = self._wait_for_state_via_inspect(container_id, spec, deadline)
+            
+            ready = _readiness_from_state(state, spec)
+            if ready is None:
+                raise ReadinessTimeout(
+                    f"Service {service_name} not ready within {spec.timeout:g}s "
+                    f"(state: {state.get('Status')}, health: {(state.get('Health') or {}).get('Status')})"
+                )
+            if not ready:
+                raise ServiceError(
+                    f"Service {service_name} failed to become ready "
+                    f"(state: {state.get('Status')}, exit code: {state.get('ExitCode')}, "
+                    f"health: {(state.get('Health') or {}).get('Status')})"
+                )
+        
+        wait_for_endpoints(service_name, spec, port_mappings, deadline)
+    
+    def _wait_for_state_via_events(self, api: DockerAPIClient, container_id: str, spec: ReadinessSpec,
+                                   deadline: float, since: float) -> Dict[str, Any]:
+        """Wait on the daemon's event stream, re-inspecting the container whenever it changes"""
+        filters = {
+            'type': ['container'],
+            'container': [container_id],
+            'event': ['start', 'die', 'oom', 'health_status']
+        }
+        seen = set()
+        
+        while True:
+            state = api.inspect_container(container_id).get('State', {})
+            remaining = deadline - time.monotonic()
+            if _readiness_from_state(state, spec) is not None or remaining <= 0:
+                return state
+            
+            # Block until an event we have not handled yet arrives (or the deadline passes)
+            for event in api.events(filters=filters, since=since, timeout=remaining):
+                key = (event.get('timeNano'), event.get('Action') or event.get('status'))
+                if key not in seen:
+                    seen.add(key)
+                    break
+    
+    def _wait_for_state_via_inspect(self, container_id: str, spec: ReadinessSpec,
+                                    deadline: float) -> Dict[str, Any]:
+        """CLI fallback: poll 'docker inspect' with backoff"""
+        interval = spec.interval
+        while True:
+            result = self._run_docker_command(['inspect', '--format', '{{json .State}}', container_id])
+            state = json.loads(result.stdout.strip() or '{}')
+            remaining = deadline - time.monotonic()
+            if _readiness_from_state(state, spec) is not None or remaining <= 0:
+                return state
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, 1.0)
+    
+    def _run_container_via_api(self, api: DockerAPIClient, service_name: str, image: str,
+                               command: Optional[str], port_mappings: Optional[Dict[int, int]],
+                               environment: Optional[Dict[str, str]], network_name: Optional[str],
+                               working_dir: Optional[str], volumes: Optional[Dict[str, str]],
+                               labels: Optional[Dict[str, str]] = None) -> str:
+        """Equivalent of 'docker run -d' through the Engine API; returns the container ID"""
+        config: Dict[str, Any] = {'Image': image}
+        if labels:
+            config['Labels'] = labels
+        host_config: Dict[str, Any] = {}
+        
+        if command:
+            config['Cmd'] = command.split()
+        if environment:
+            config['Env'] = [f'{key}={value}' for key, value in environment.items()]
+        if working_dir:
+            config['WorkingDir'] = working_dir
+        if port_mappings:
+            config['ExposedPorts'] = {f'{c}/tcp': {} for c in port_mappings.values()}
+            host_config['PortBindings'] = {
+                f'{container_port}/tcp': [{'HostPort': str(host_port)}]
+                for host_port, container_port in port_mappings.items()
+            }
+        if volumes:
+            host_config['Binds'] = [f'{host}:{container}' for host, container in volumes.items()]
+        if network_name:
+            host_config['NetworkMode'] = network_name
+        if host_config:
+            config['HostConfig'] = host_config
+        
+        try:
+            container_id = api.create_container(service_name, config)
+        except DockerAPIError as e:
+            if e.status != 404:
+                raise
+            # Image is not present locally; 'docker run' would pull it
+            api.pull_image(image)
+            container_id = api.create_container(service_name, config)
+        
+        try:
+            api.start_container(container_id)
+        except ProviderError:
+            api.remove_container(container_id, force=True)
+            raise
+        return container_id
+    
+    def _discard_container(self, container_id: str):
+        """Stop and remove a container, best effort"""
+        try:
+            api = self._get_api()
+            if api:
+                api.remove_container(container_id, force=True)
+            else:
+                self._run_docker_command(['rm', '-f', container_id])
+            self._refresh_mirror(container_id)
+        except ProviderError as e:
+            print(f"Warning: Could not remove container {container_id}: {e}")
+    
     def stop_service(self, service_name: str) -> bool:
         """Stop a Docker container"""
         try:
+            api = self._get_api()
+            if api:
+                api.stop_container(service_name)
+                self._refresh_mirror(service_name)
+                return True
             self._run_docker_command(['stop', service_name])
             return True
         except ProviderError:
@@ -229,6 +627,11 @@ class DockerProvider(IsolationProvider):
     def restart_service(self, service_name: str) -> bool:
         """Restart a Docker container"""
         try:
+            api = self._get_api()
+            if api:
+                api.restart_container(service_name)
+                self._refresh_mirror(service_name)
+                return True
             self._run_docker_command(['restart', service_name])
             return True
         except ProviderError:
@@ -240,6 +643,11 @@ class DockerProvider(IsolationProvider):
             # Stop first if running
             self.stop_service(service_name)
             # Remove container
+            api = self._get_api()
+            if api:
+                api.remove_container(service_name)
+                self._refresh_mirror(service_name)
+                return True
             self._run_docker_command(['rm', service_name])
             return True
         except ProviderError:
@@ -247,69 +655,168 @@ class DockerProvider(IsolationProvider):
     
     def get_service_status(self, service_name: str) -> ProviderStatus:
         """Get Docker container status"""
+        mirror = self._get_mirror()
+        record = mirror.get(service_name) if mirror else None
+        if record is not None:
+            return STATUS_MAPPING.get(record['State'].lower(), ProviderStatus.ERROR)
+        
         try:
-            result = self._run_docker_command([
-                'inspect', service_name, '--format', '{{.State.Status}}'
-            ])
-            
-            docker_status = result.stdout.strip().lower()
+            api = self._get_api()
+            if api:
+                docker_status = api.inspect_container(service_name)['State']['Status'].lower()
+            else:
+                result = self._run_docker_command([
+                    'inspect', service_name, '--format', '{{.State.Status}}'
+                ])
+                docker_status = result.stdout.strip().lower()
             
             # Map Docker status to ProviderStatus
-            status_mapping = {
-                'running': ProviderStatus.RUNNING,
-                'exited': ProviderStatus.STOPPED,
-                'created': ProviderStatus.STOPPED,
-                'restarting': ProviderStatus.STARTING,
-                'paused': ProviderStatus.STOPPED,
-                'dead': ProviderStatus.ERROR
-            }
-            
-            return status_mapping.get(docker_status, ProviderStatus.ERROR)
+            return STATUS_MAPPING.get(docker_status, ProviderStatus.ERROR)
             
         except ProviderError:
             return ProviderStatus.ERROR
     
-    def list_services(self) -> List[ServiceInfo]:
-        """List Docker containers"""
+    def get_services_status(self, service_names: List[str]) -> Dict[str, ProviderStatus]:
+        """Get the status of several containers with one daemon call"""
         try:
-            result = self._run_docker_command([
-                'ps', '-a', '--format',
-                '{{.ID}}\\t{{.Names}}\\t{{.Status}}\\t{{.Image}}\\t{{.Ports}}'
-            ])
+            services = self.inspect_services(service_names)
+        except ProviderError:
+            return {name: ProviderStatus.ERROR for name in service_names}
+        
+        return {
+            name: info.status if info else ProviderStatus.ERROR
+            for name, info in services.items()
+        }
+    
+    def inspect_services(self, service_names: List[str]) -> Dict[str, Optional[ServiceInfo]]:
+        """Inspect several containers with a single API list call or one 'docker inspect a b c ...'"""
+        found: Dict[str, ServiceInfo] = {}
+        missing = list(dict.fromkeys(service_names))
+        
+        mirror = self._get_mirror()
+        if mirror:
+            for name in missing:
+                record = mirror.get(name)
+                if record is not None:
+                    found[name] = self._service_from_api(record)
+            missing = [name for name in missing if name not in found]
+        
+        if missing:
+            try:
+                api = self._get_api()
+                if api:
+                    # Name filters are OR-ed; anchor them so "web" does not match "web-2"
+                    name_filters = [f'^/{re.escape(name)}$' for name in missing]
+                    for container in api.list_containers(all=True, filters={'name': name_filters}):
+                        info = self._service_from_api(container)
+                        found[info.name] = info
+                else:
+                    # Exits non-zero if any name is missing but still prints the others
+                    result = self._run_docker_command(['inspect'] + missing, check=False)
+                    for data in json.loads(result.stdout.strip() or '[]'):
+                        info = self._service_from_inspect(data)
+                        found[info.name] = info
+            except ProviderError as e:
+                raise ServiceError(f"Failed to inspect services: {e}")
+        
+        return {name: found.get(name) for name in service_names}
+    
+    def list_services(self, project_name: Optional[str] = None) -> List[ServiceInfo]:
+        """List isolator-managed Docker containers, optionally only those of one project"""
+        mirror = self._get_mirror()
+        if mirror:
+            return [self._service_from_api(c) for c in mirror.containers(project=project_name)]
+        
+        label_filters = [f'{MANAGED_LABEL}=true']
+        if project_name:
+            label_filters.append(f'{PROJECT_LABEL}={project_name}')
+        
+        try:
+            api = self._get_api()
+            if api:
+                return [
+                    self._service_from_api(c)
+                    for c in api.list_containers(all=True, filters={'label': label_filters})
+                ]
+            
+            args = ['ps', '-a', '--format', '{{json .}}']
+            for label in label_filters:
+                args.extend(['--filter', f'label={label}'])
             
+            # Parse rows as docker prints them instead of buffering the whole listing
             services = []
-            for line in result.stdout.strip().split('\\n'):
-                if line:
-                    parts = line.split('\\t')
-                    if len(parts) >= 4:
-                        container_id, name, status, image = parts[:4]
-                        ports_str = parts[4] if len(parts) > 4 else ""
-                        
-                        # Parse port mappings
-                        port_mappings = self._parse_port_mappings(ports_str)
-                        
-                        # Map status
-                        provider_status = ProviderStatus.STOPPED
-                        if 'Up' in status:
-                            provider_status = ProviderStatus.RUNNING
-                        elif 'Exited' in status:
-                            provider_status = ProviderStatus.STOPPED
-                        
-                        services.append(ServiceInfo(
-                            service_id=container_id,
-                            name=name,
-                            status=provider_status,
-                            port_mappings=port_mappings,
-                            metadata={'image': image, 'docker_status': status}
-                        ))
+            for line in self._stream_docker_command(args):
+                service = self._service_from_ps(line)
+                if service is not None:
+                    services.append(service)
             
             return services
         except ProviderError as e:
             raise ServiceError(f"Failed to list services: {e}")
     
+    def _service_from_ps(self, line: str) -> Optional[ServiceInfo]:
+        """Build ServiceInfo from one line of 'docker ps --format {{json .}}'"""
+        try:
+            row = json.loads(line)
+        except ValueError:
+            return None
+        
+        status = row.get('Status', '')
+        # State is only printed by newer docker versions
+        state = row.get('State') or ('running' if status.startswith('Up') else 'exited')
+        return ServiceInfo(
+            service_id=row.get('ID', ''),
+            name=row.get('Names', '').split(',')[0],
+            status=STATUS_MAPPING.get(state.lower(), ProviderStatus.STOPPED),
+            port_mappings=self._parse_port_mappings(row.get('Ports', '')),
+            metadata={'image': row.get('Image'), 'docker_status': status}
+        )
+    
+    def _service_from_api(self, container: Dict[str, Any]) -> ServiceInfo:
+        """Build ServiceInfo from an Engine API container list entry"""
+        port_mappings = {
+            port['PublicPort']: port['PrivatePort']
+            for port in container.get('Ports') or []
+            if port.get('PublicPort')
+        }
+        names = container.get('Names') or ['']
+        return ServiceInfo(
+            service_id=container['Id'][:12],
+            name=names[0].lstrip('/'),
+            status=STATUS_MAPPING.get(container.get('State', '').lower(), ProviderStatus.STOPPED),
+            port_mappings=port_mappings,
+            metadata={'image': container.get('Image'), 'docker_status': container.get('Status')}
+        )
+    
+    def _service_from_inspect(self, data: Dict[str, Any]) -> ServiceInfo:
+        """Build ServiceInfo from 'docker inspect' output"""
+        port_mappings = {}
+        ports = (data.get('NetworkSettings') or {}).get('Ports') or {}
+        for container_port, bindings in ports.items():
+            for binding in bindings or []:
+                if binding.get('HostPort'):
+                    port_mappings[int(binding['HostPort'])] = int(container_port.split('/')[0])
+        
+        state = data.get('State') or {}
+        return ServiceInfo(
+            service_id=data['Id'][:12],
+            name=data['Name'].lstrip('/'),
+            status=STATUS_MAPPING.get(state.get('Status', '').lower(), ProviderStatus.ERROR),
+            port_mappings=port_mappings,
+            metadata={'image': (data.get('Config') or {}).get('Image'), 'docker_status': state.get('Status')}
+        )
+    
     def service_exists(self, service_name: str) -> bool:
         """Check if a Docker container exists"""
+        mirror = self._get_mirror()
+        if mirror and mirror.get(service_name) is not None:
+            return True
+        
         try:
+            api = self._get_api()
+            if api:
+                api.inspect_container(service_name)
+                return True
             self._run_docker_command(['inspect', service_name])
             return True
         except ProviderError:
@@ -332,45 +839,184 @@ class DockerProvider(IsolationProvider):
     
     # Logs and monitoring
     def get_service_logs(self, service_name: str, lines: int = 100, 
-                        follow: bool = False) -> List[str]:
-        """Get Docker container logs"""
-        args = ['logs']
-        if follow:
-            args.append('-f')
-        args.extend(['--tail', str(lines), service_name])
+                        follow: bool = False) -> Union[List[str], Iterator[str]]:
+        """Get Docker container logs (with follow, an iterator that keeps tailing)"""
+        texts = (line.text for line in self.stream_service_logs(service_name, lines, follow=follow))
+        return texts if follow else list(texts)
+    
+    def stream_service_logs(self, service_name: str, lines: Optional[int] = 100,
+                            follow: bool = False, since: Optional[float] = None,
+                            until: Optional[float] = None, stdout: bool = True,
+                            stderr: bool = True, timestamps: bool = False) -> Iterator[LogLine]:
+        """
+        Yield container log lines as docker produces them, without buffering the log.
+        Reading is driven by the consumer, so a slow consumer slows the producer down.
+        With follow, tailing continues until the container stops or the iterator is closed.
+        """
+        # Following may legitimately stay silent for a long time
+        timeout = None if follow else self.command_timeout
+        api = self._get_api()
+        if api:
+            params = log_params(lines, follow, since, until, stdout, stderr, timestamps)
+            chunks = api.container_log_stream(service_name, params, timeout=timeout)
+        else:
+            args = log_args(service_name, lines, follow, since, until, timestamps)
+            chunks = (
+                chunk for chunk in self._stream_docker_output(args, timeout=timeout)
+                if (stdout if chunk[0] == 1 else stderr)
+            )
         
         try:
-            result = self._run_docker_command(args)
-            return result.stdout.split('\\n')
+            yield from iter_log_lines(service_name, chunks, timestamps)
         except ProviderError as e:
             raise ServiceError(f"Failed to get logs for {service_name}: {e}")
     
+    def _stream_docker_output(self, args: List[str], timeout: Optional[float] = None) -> Iterator[Tuple[int, bytes]]:
+        """
+        Run a docker command and yield (1, stdout chunk) / (2, stderr chunk) as they are produced.
+        timeout=None lets the command run until it exits or the iterator is closed.
+        """
+        if not self.is_available:
+            raise ProviderUnavailableError("Docker is not available")
+        
+        try:
+            process = subprocess.Popen(['docker'] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            self._probe.invalidate()
+            raise ProviderUnavailableError("Docker command not found")
+        
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer:
+            timer.start()
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ, 1)
+        selector.register(process.stderr, selectors.EVENT_READ, 2)
+        stderr_tail = b''
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    data = os.read(key.fileobj.fileno(), 65536)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        continue
+                    if key.data == 2:
+                        stderr_tail = (stderr_tail + data)[-4096:]
+                    yield key.data, data
+            returncode = process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            selector.close()
+            process.stdout.close()
+            process.stderr.close()
+        
+        if timed_out.is_set():
+            raise ProviderTimeoutError(f"Docker command timed out: {args}")
+        if returncode != 0:
+            stderr = stderr_tail.decode('utf-8', 'replace').strip()
+            if any(m in stderr for m in DAEMON_UNREACHABLE_MARKERS):
+                self._probe.invalidate()
+            # The error is the last thing docker writes to stderr
+            message = stderr.splitlines()[-1] if stderr else f'exit code {returncode}'
+            raise ProviderError(f"Docker command failed: {message}")
+    
     def get_service_stats(self, service_name: str) -> Dict[str, Any]:
         """Get Docker container stats"""
+        sampled = self._sampled_stats(service_name)
+        if sampled is not None:
+            return sampled
+        
         try:
+            api = self._get_api()
+            if api:
+                return self._format_api_stats(api.container_stats(service_name))
+            
             result = self._run_docker_command([
-                'stats', service_name, '--no-stream', '--format',
-                '{{.CPUPerc}}\\t{{.MemUsage}}\\t{{.NetIO}}\\t{{.BlockIO}}'
+                'stats', service_name, '--no-stream', '--format', '{{json .}}'
             ])
             
-            parts = result.stdout.strip().split('\\t')
-            if len(parts) >= 4:
-                return {
-                    'cpu_percent': parts[0],
-                    'memory_usage': parts[1],
-                    'network_io': parts[2],
-                    'block_io': parts[3]
-                }
+            try:
+                row = json.loads(result.stdout.strip() or '{}')
+            except ValueError:
+                return {}
+            if not row:
+                return {}
             
-            return {}
+            return {
+                'cpu_percent': row.get('CPUPerc'),
+                'memory_usage': row.get('MemUsage'),
+                'network_io': row.get('NetIO'),
+                'block_io': row.get('BlockIO')
+            }
         except ProviderError:
             return {}
     
+    def _format_api_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Format Engine API stats like 'docker stats' does"""
+        if not stats or not stats.get('cpu_stats'):
+            return {}
+        
+        cpu = stats.get('cpu_stats', {})
+        precpu = stats.get('precpu_stats', {})
+        cpu_delta = cpu.get('cpu_usage', {}).get('total_usage', 0) - \
+            precpu.get('cpu_usage', {}).get('total_usage', 0)
+        system_delta = cpu.get('system_cpu_usage', 0) - precpu.get('system_cpu_usage', 0)
+        online_cpus = cpu.get('online_cpus') or len(cpu.get('cpu_usage', {}).get('percpu_usage') or []) or 1
+        cpu_percent = (cpu_delta / system_delta) * online_cpus * 100.0 if system_delta > 0 else 0.0
+        
+        memory = stats.get('memory_stats', {})
+        # Match the CLI, which excludes page cache from usage
+        memory_stat = memory.get('stats', {})
+        cache = memory_stat.get('inactive_file', memory_stat.get('cache', 0))
+        memory_used = max(0, memory.get('usage', 0) - cache)
+        
+        rx = tx = 0
+        for network in (stats.get('networks') or {}).values():
+            rx += network.get('rx_bytes', 0)
+            tx += network.get('tx_bytes', 0)
+        
+        read = written = 0
+        for entry in (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+            op = entry.get('op', '').lower()
+            if op == 'read':
+                read += entry.get('value', 0)
+            elif op == 'write':
+                written += entry.get('value', 0)
+        
+        return {
+            'cpu_percent': f"{cpu_percent:.2f}%",
+            'memory_usage': f"{_format_bytes(memory_used, True)} / {_format_bytes(memory.get('limit', 0), True)}",
+            'network_io': f"{_format_bytes(rx)} / {_format_bytes(tx)}",
+            'block_io': f"{_format_bytes(read)} / {_format_bytes(written)}"
+        }
+    
     # Build operations
     def build_image(self, dockerfile_path: str, image_tag: str, 
                    build_context: str = ".", **kwargs) -> bool:
-        """Build Docker image"""
+        """Build Docker image, reusing the existing image if the build inputs did not change"""
+        digest = None
+        if not kwargs.get('no_cache'):
+            try:
+                digest = self._get_build_cache().compute_digest(dockerfile_path, build_context, kwargs)
+            except OSError:
+                # Let docker report the unreadable Dockerfile/context
+                digest = None
+            if digest and self._image_build_digest(image_tag) == digest:
+                self._get_build_cache().record_hit(image_tag, digest)
+                return True
+        
         args = ['build', '-t', image_tag, '-f', dockerfile_path]
+        if digest:
+            args.extend(['--label', f'{BUILD_DIGEST_LABEL}={digest}'])
         
         # Add build args
         for key, value in kwargs.items():
@@ -383,14 +1029,47 @@ class DockerProvider(IsolationProvider):
         args.append(build_context)
         
         try:
-            self._run_docker_command(args)
+            started = time.perf_counter()
+            self._run_docker_command(args, timeout=LONG_COMMAND_TIMEOUT)
+            if digest:
+                self._get_build_cache().record_build(image_tag, digest, time.perf_counter() - started)
             return True
         except ProviderError as e:
             raise ServiceError(f"Failed to build image {image_tag}: {e}")
     
+    def _get_build_cache(self) -> BuildCache:
+        if self._build_cache is None:
+            self._build_cache = get_build_cache()
+        return self._build_cache
+    
+    def _image_build_digest(self, image_tag: str) -> Optional[str]:
+        """Build digest label of a local image, or None if it has none or does not exist"""
+        try:
+            api = self._get_api()
+            if api:
+                labels = (api.inspect_image(image_tag).get('Config') or {}).get('Labels')
+            else:
+                result = self._run_docker_command(
+                    ['image', 'inspect', '--format', '{{json .Config.Labels}}', image_tag], check=False
+                )
+                if result.returncode != 0:
+                    return None
+                labels = json.loads(result.stdout.strip() or 'null')
+        except (ProviderError, ValueError):
+            return None
+        return (labels or {}).get(BUILD_DIGEST_LABEL)
+    
+    def build_cache_stats(self) -> Dict[str, Any]:
+        """Build cache hit/miss and hashing statistics"""
+        return self._get_build_cache().stats()
+    
     def image_exists(self, image_name: str) -> bool:
         """Check if Docker image exists locally"""
         try:
+            api = self._get_api()
+            if api:
+                api.inspect_image(image_name)
+                return True
             self._run_docker_command(['image', 'inspect', image_name])
             return True
         except ProviderError:
@@ -399,7 +1078,40 @@ class DockerProvider(IsolationProvider):
     def pull_image(self, image_name: str) -> bool:
         """Pull Docker image"""
         try:
-            self._run_docker_command(['pull', image_name])
+            api = self._get_api()
+            if api:
+                api.pull_image(image_name)
+                return True
+            self._run_docker_command(['pull', image_name], timeout=LONG_COMMAND_TIMEOUT)
             return True
         except ProviderError:
-            return False
\ No newline at end of file
+            return False
+
+
+def _format_bytes(value: float, binary: bool = False) -> str:
+    """Human readable size as printed by 'docker stats' (binary units for memory)"""
+    base = 1024.0 if binary else 1000.0
+    units = ['B', 'KiB', 'MiB', 'GiB', 'TiB'] if binary else ['B', 'kB', 'MB', 'GB', 'TB']
+    for unit in units[:-1]:
+        if abs(value) < base:
+            return f"{value:.4g}{unit}"
+        value /= base
+    return f"{value:.4g}{units[-1]}"
+
+
+def _readiness_from_state(state: Dict[str, Any], spec: ReadinessSpec) -> Optional[bool]:
+    """True if a container State is ready, False if it can no longer become ready, None if pending"""
+    status = state.get('Status')
+    if status in ('exited', 'dead'):
+        return False
+    
+    health = (state.get('Health') or {}).get('Status')
+    if spec.healthcheck and health:
+        # Only images with a HEALTHCHECK report a health status
+        if health == 'unhealthy':
+            return False
+        return True if health == 'healthy' else None
+    
+    if spec.state and status != 'running':
+        return None
+    return True
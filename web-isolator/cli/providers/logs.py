@@ -0,0 +1,294 @@
+"""
+Log stream decoding for Web Isolator 2.0
+Turns demultiplexed (stream, bytes) chunks into LogLine objects as they
+arrive, keeping at most one partial line per stream in memory, and merges
+the lines of several services into one stream ordered by timestamp.
+"""
+import asyncio
+import heapq
+import itertools
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import LogLine
+
+
+# Docker stream type -> stream name
+STREAM_NAMES = {0: "stdout", 1: "stdout", 2: "stderr"}
+
+# A line longer than this is emitted in pieces instead of buffering it whole
+MAX_LINE_BYTES = 64 * 1024
+
+# RFC 3339 with up to nanosecond precision, as in 'docker logs --timestamps'
+TIMESTAMP_RE = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|z|[+-]\d{2}:\d{2})$')
+
+
+def log_params(lines: Optional[int] = 100, follow: bool = False, since: Optional[float] = None,
+               until: Optional[float] = None, stdout: bool = True, stderr: bool = True,
+               timestamps: bool = False) -> Dict[str, Any]:
+    """Engine API query params for /containers/{id}/logs"""
+    return {
+        "follow": "1" if follow else "0",
+        "stdout": "1" if stdout else "0",
+        "stderr": "1" if stderr else "0",
+        "timestamps": "1" if timestamps else "0",
+        "tail": str(lines) if lines is not None else "all",
+        "since": f"{since:.9f}" if since is not None else None,
+        "until": f"{until:.9f}" if until is not None else None,
+    }
+
+
+def log_args(service_name: str, lines: Optional[int] = 100, follow: bool = False,
+             since: Optional[float] = None, until: Optional[float] = None,
+             timestamps: bool = False) -> List[str]:
+    """'docker logs' arguments for the same options"""
+    args = ['logs', '--tail', str(lines) if lines is not None else 'all']
+    if follow:
+        args.append('--follow')
+    if since is not None:
+        args.extend(['--since', f'{since:.9f}'])
+    if until is not None:
+        args.extend(['--until', f'{until:.9f}'])
+    if timestamps:
+        args.append('--timestamps')
+    args.append(service_name)
+    return args
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[int]:
+    """Nanoseconds since the epoch of an RFC 3339 log timestamp (None if it does not parse)"""
+    if not timestamp:
+        return None
+    match = TIMESTAMP_RE.match(timestamp)
+    if not match:
+        return None
+    date_time, fraction, zone = match.groups()
+    try:
+        parsed = datetime.fromisoformat(date_time + ('+00:00' if zone in ('Z', 'z') else zone))
+    except ValueError:
+        return None
+    nanos = int((fraction or '0').ljust(9, '0')[:9])
+    return int(parsed.timestamp()) * 1_000_000_000 + nanos
+
+
+class LogLineSplitter:
+    """Reassembles lines from chunks of one or more interleaved streams"""
+
+    def __init__(self, service: str, timestamps: bool = False):
+        self.service = service
+        self.timestamps = timestamps
+        self._partial: Dict[int, bytes] = {}
+
+    def _line(self, stream_type: int, data: bytes) -> LogLine:
+        text = data.decode('utf-8', 'replace').rstrip('\r')
+        timestamp = None
+        if self.timestamps:
+            timestamp, _, text = text.partition(' ')
+        return LogLine(self.service, STREAM_NAMES.get(stream_type, "stdout"), text, timestamp)
+
+    def feed(self, stream_type: int, data: bytes) -> List[LogLine]:
+        """Add a chunk and return the lines it completed"""
+        buffer = self._partial.pop(stream_type, b'') + data
+        *complete, rest = buffer.split(b'\n')
+        lines = [self._line(stream_type, line) for line in complete]
+        while len(rest) > MAX_LINE_BYTES:
+            lines.append(self._line(stream_type, rest[:MAX_LINE_BYTES]))
+            rest = rest[MAX_LINE_BYTES:]
+        if rest:
+            self._partial[stream_type] = rest
+        return lines
+
+    def flush(self) -> List[LogLine]:
+        """Lines left without a trailing newline when the stream ended"""
+        partial, self._partial = self._partial, {}
+        return [self._line(stream_type, data) for stream_type, data in partial.items()]
+
+
+def iter_log_lines(service: str, chunks: Iterable, timestamps: bool = False) -> Iterator[LogLine]:
+    """LogLines from an iterable of (stream_type, bytes) chunks"""
+    splitter = LogLineSplitter(service, timestamps)
+    for stream_type, data in chunks:
+        yield from splitter.feed(stream_type, data)
+    yield from splitter.flush()
+
+
+def prefixed(line: LogLine, width: int = 0) -> str:
+    """'service | text', with the service name padded to width as in 'docker compose logs'"""
+    return f"{line.service.ljust(width)} | {line.text}"
+
+
+class LogMerger:
+    """
+    K-way merge of per-source log lines by timestamp, on a heap.
+
+    Each source delivers its own lines in order. The earliest buffered line
+    is released as soon as every open source has a line buffered (nothing
+    earlier can still arrive), or once it has waited reorder_window seconds,
+    which bounds how long a quiet source or clock skew can hold the stream
+    back. At most max_pending lines are buffered; beyond that the earliest
+    ones are released early. Lines without a timestamp sort as the newest
+    seen so far.
+    """
+
+    def __init__(self, sources: Iterable[str], reorder_window: float = 0.5, max_pending: int = 1000):
+        self.reorder_window = reorder_window
+        self.max_pending = max_pending
+        self._heap: List[Tuple[int, int, float, str, LogLine]] = []
+        self._buffered: Dict[str, int] = dict.fromkeys(sources, 0)  # open sources only
+        self._seq = itertools.count()
+        self._newest_ns = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, source: str, line: LogLine, now: float):
+        timestamp_ns = parse_timestamp(line.timestamp)
+        if timestamp_ns is None:
+            timestamp_ns = self._newest_ns
+        elif timestamp_ns > self._newest_ns:
+            self._newest_ns = timestamp_ns
+        heapq.heappush(self._heap, (timestamp_ns, next(self._seq), now, source, line))
+        if source in self._buffered:
+            self._buffered[source] += 1
+
+    def close(self, source: str):
+        """The source has ended; it no longer holds lines back"""
+        self._buffered.pop(source, None)
+
+    def deadline(self) -> Optional[float]:
+        """When the earliest buffered line is released at the latest (None if nothing is buffered)"""
+        return self._heap[0][2] + self.reorder_window if self._heap else None
+
+    def pop_ready(self, now: float) -> List[LogLine]:
+        """Remove and return the lines that can be released, in order"""
+        ready = []
+        heap = self._heap
+        while heap:
+            _, _, arrived, source, line = heap[0]
+            if not (len(heap) > self.max_pending or arrived + self.reorder_window <= now
+                    or all(self._buffered.values())):
+                break
+            heapq.heappop(heap)
+            if source in self._buffered:
+                self._buffered[source] -= 1
+            ready.append(line)
+        return ready
+
+
+def _relabel(source: str, line: LogLine) -> LogLine:
+    """The line under its source name (e.g. the service rather than its container)"""
+    return LogLine(source, line.stream, line.text, line.timestamp)
+
+
+def _stream_error(source: str, error: Exception) -> LogLine:
+    return LogLine(source, "stderr", f"[log stream error: {error}]")
+
+
+def merge_log_iterators(streams: Dict[str, Iterator[LogLine]], reorder_window: float = 0.5,
+                        max_pending: int = 1000) -> Iterator[LogLine]:
+    """
+    Merge blocking line iterators, read concurrently on one thread each.
+    A failing source ends with an error line instead of ending the merge.
+    Pumps still blocked in a read when the merge is closed exit with their next line.
+    """
+    lines: "queue.Queue[Tuple[str, Optional[LogLine]]]" = queue.Queue(maxsize=max_pending)
+    stopped = threading.Event()
+
+    def put(item: Tuple[str, Optional[LogLine]]) -> bool:
+        while not stopped.is_set():
+            try:
+                lines.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def pump(source: str, iterator: Iterator[LogLine]):
+        try:
+            for line in iterator:
+                if not put((source, _relabel(source, line))):
+                    return
+        except Exception as e:
+            put((source, _stream_error(source, e)))
+        finally:
+            put((source, None))
+
+    merger = LogMerger(streams, reorder_window, max_pending)
+    for source, iterator in streams.items():
+        threading.Thread(target=pump, args=(source, iterator), daemon=True,
+                         name=f"log-merge-{source}").start()
+
+    open_sources = len(streams)
+    try:
+        while open_sources or len(merger):
+            if open_sources:
+                deadline = merger.deadline()
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    source, line = lines.get(timeout=timeout)
+                except queue.Empty:
+                    pass
+                else:
+                    if line is None:
+                        merger.close(source)
+                        open_sources -= 1
+                    else:
+                        merger.push(source, line, time.monotonic())
+            yield from merger.pop_ready(time.monotonic())
+    finally:
+        stopped.set()
+
+
+async def merge_log_streams(streams: Dict[str, AsyncIterator[LogLine]], reorder_window: float = 0.5,
+                            max_pending: int = 1000) -> AsyncIterator[LogLine]:
+    """
+    Merge async line iterators, read concurrently on one task each.
+    A failing source ends with an error line instead of ending the merge.
+    """
+    lines: "asyncio.Queue[Tuple[str, Optional[LogLine]]]" = asyncio.Queue(maxsize=max_pending)
+    loop = asyncio.get_running_loop()
+
+    async def pump(source: str, iterator: AsyncIterator[LogLine]):
+        try:
+            async for line in iterator:
+                await lines.put((source, _relabel(source, line)))
+        except Exception as e:
+            await lines.put((source, _stream_error(source, e)))
+        finally:
+            await iterator.aclose()
+        # Not reached when cancelled, so a full queue cannot block the cleanup
+        await lines.put((source, None))
+
+    merger = LogMerger(streams, reorder_window, max_pending)
+    pumps = [asyncio.ensure_future(pump(source, iterator)) for source, iterator in streams.items()]
+
+    open_sources = len(streams)
+    try:
+        while open_sources or len(merger):
+            if open_sources:
+                if lines.empty():
+                    deadline = merger.deadline()
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    try:
+                        item = await asyncio.wait_for(lines.get(), timeout)
+                    except asyncio.TimeoutError:
+                        item = None
+                else:
+                    item = lines.get_nowait()
+                if item is not None:
+                    source, line = item
+                    if line is None:
+                        merger.close(source)
+                        open_sources -= 1
+                    else:
+                        merger.push(source, line, loop.time())
+            for line in merger.pop_ready(loop.time()):
+                yield line
+    finally:
+        for task in pumps:
+            task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
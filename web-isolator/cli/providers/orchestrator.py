@@ -0,0 +1,139 @@
+"""
+Project orchestration for Web Isolator 2.0
+Starts a project's services concurrently while respecting their dependencies.
+"""
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Callable, Set
+
+from .base import ServiceError, ServiceInfo
+
+
+def get_service_option(service: Dict[str, Any], key: str) -> Any:
+    """
+    Read a per-service option such as depends_on or readiness.
+    Looks at the top-level key (workspace.json) and falls back to the service
+    metadata (database rows store these options as JSON).
+    """
+    value = service.get(key)
+    if value is None:
+        metadata = service.get('metadata') or {}
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except ValueError:
+                metadata = {}
+        value = metadata.get(key) if isinstance(metadata, dict) else None
+    return value
+
+
+def get_dependencies(service: Dict[str, Any]) -> List[str]:
+    """Read a service's dependencies"""
+    depends_on = get_service_option(service, 'depends_on')
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    return list(depends_on or [])
+
+
+def build_dependency_graph(services: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """
+    Map each service name to the set of service names it depends on.
+    Raises ServiceError for unknown dependencies or dependency cycles.
+    """
+    names = {service['name'] for service in services}
+    graph: Dict[str, Set[str]] = {}
+    for service in services:
+        deps = set(get_dependencies(service))
+        unknown = deps - names
+        if unknown:
+            raise ServiceError(
+                f"Service {service['name']} depends on unknown service(s): {', '.join(sorted(unknown))}"
+            )
+        graph[service['name']] = deps
+
+    # Kahn's algorithm: anything left over is part of a cycle
+    remaining = {name: set(deps) for name, deps in graph.items()}
+    while True:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    if remaining:
+        raise ServiceError(f"Dependency cycle between services: {', '.join(sorted(remaining))}")
+
+    return graph
+
+
+class ProjectOrchestrator:
+    """
+    Starts services in dependency order with bounded parallelism.
+
+    A service is started as soon as everything it depends on is up, with at
+    most max_parallel starts in flight. If any service fails, nothing new is
+    scheduled, in-flight starts are allowed to finish, and every service that
+    did start is discarded (stopped and removed, so its name is free for the
+    next start) in reverse start order.
+    """
+
+    def __init__(self, max_parallel: int = 4):
+        self.max_parallel = max(1, max_parallel)
+
+    def run(self, services: List[Dict[str, Any]],
+            start: Callable[[Dict[str, Any]], ServiceInfo],
+            discard: Callable[[str], Any]) -> Dict[str, ServiceInfo]:
+        """Start services with start(service) and roll back with discard(name) on failure"""
+        graph = build_dependency_graph(services)
+        by_name = {service['name']: service for service in services}
+        dependents: Dict[str, List[str]] = {name: [] for name in graph}
+        for name, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(name)
+        pending = {name: len(deps) for name, deps in graph.items()}
+
+        started: Dict[str, ServiceInfo] = {}
+        start_order: List[str] = []
+        lock = threading.Lock()
+        failure = None
+
+        def run_one(name: str) -> ServiceInfo:
+            info = start(by_name[name])
+            with lock:
+                started[name] = info
+                start_order.append(name)
+            return info
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            in_flight = {}
+            ready = [service['name'] for service in services if pending[service['name']] == 0]
+
+            while (ready and failure is None) or in_flight:
+                # Submit only what can run now, so nothing queued in the pool starts after a failure
+                while ready and failure is None and len(in_flight) < self.max_parallel:
+                    name = ready.pop(0)
+                    in_flight[executor.submit(run_one, name)] = name
+
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = in_flight.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        if failure is None:
+                            failure = (name, error)
+                        continue
+                    for dependent in dependents[name]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            ready.append(dependent)
+
+        if failure is not None:
+            # Rollback: discard already started services, newest first
+            for name in reversed(start_order):
+                discard(name)
+            failed_name, error = failure
+            raise ServiceError(f"Failed to start service {failed_name}: {error}")
+
+        return started
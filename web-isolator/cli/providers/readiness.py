@@ -0,0 +1,201 @@
+"""
+Service readiness for Web Isolator 2.0
+Decides when a freshly started service is ready for use (container running,
+HEALTHCHECK healthy, port accepting connections, HTTP endpoint answering)
+and records how long each service took to get there.
+"""
+import http.client
+import socket
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from .base import ServiceError
+
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_INTERVAL = 0.1
+MAX_INTERVAL = 1.0
+
+
+class ReadinessTimeout(ServiceError):
+    """Raised when a service does not become ready within its timeout"""
+    pass
+
+
+class ReadinessSpec:
+    """
+    What to wait for before a service counts as started.
+
+    Built from the optional ``readiness`` block of a service in workspace.json::
+
+        "readiness": {"http": "/health", "port": 8000, "timeout": 30}
+
+    state       wait for the container to be running (default on)
+    healthcheck wait for the image HEALTHCHECK to report healthy, if it has one (default on)
+    tcp         wait for the port to accept TCP connections
+    http        path (or full URL) that must answer with a 2xx/3xx status
+    port        container port to probe (default: the first mapped port)
+    timeout     seconds before giving up
+    """
+
+    def __init__(self,
+                 state: bool = True,
+                 healthcheck: bool = True,
+                 tcp: bool = False,
+                 http: Optional[str] = None,
+                 port: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 interval: float = DEFAULT_INTERVAL):
+        self.state = state
+        self.healthcheck = healthcheck
+        self.tcp = tcp
+        self.http = http
+        self.port = port
+        self.timeout = timeout
+        self.interval = interval
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ReadinessSpec":
+        """Build a spec from a readiness config block (None gives the defaults)"""
+        config = config or {}
+        return cls(
+            state=bool(config.get('state', True)),
+            healthcheck=bool(config.get('healthcheck', True)),
+            tcp=bool(config.get('tcp', False)),
+            http=config.get('http'),
+            port=config.get('port'),
+            timeout=float(config.get('timeout', DEFAULT_TIMEOUT)),
+            interval=float(config.get('interval', DEFAULT_INTERVAL))
+        )
+
+    def host_port(self, port_mappings: Optional[Dict[int, int]]) -> Optional[int]:
+        """Host port to probe for the configured container port"""
+        port_mappings = port_mappings or {}
+        if self.port is None:
+            return next(iter(port_mappings), None)
+        for host_port, container_port in port_mappings.items():
+            if int(container_port) == int(self.port):
+                return int(host_port)
+        # Not published: assume the port is reachable as-is (host networking)
+        return int(self.port)
+
+
+def _sleep_until_next(interval: float, deadline: float) -> float:
+    """Sleep for interval (capped at the deadline) and return the next, backed-off interval"""
+    time.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+    return min(interval * 2, MAX_INTERVAL)
+
+
+def wait_for_tcp(host: str, port: int, deadline: float, interval: float = DEFAULT_INTERVAL) -> bool:
+    """Wait until host:port accepts a TCP connection; False if the deadline passes first"""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            with socket.create_connection((host, port), timeout=min(remaining, 2.0)):
+                return True
+        except OSError:
+            pass
+        interval = _sleep_until_next(interval, deadline)
+
+
+def wait_for_http(url: str, deadline: float, interval: float = DEFAULT_INTERVAL) -> bool:
+    """Wait until a GET on url answers with a 2xx/3xx status; False if the deadline passes first"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        conn = connection_class(parts.hostname, parts.port, timeout=min(remaining, 2.0))
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if 200 <= response.status < 400:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        interval = _sleep_until_next(interval, deadline)
+
+
+def wait_for_endpoints(service_name: str, spec: ReadinessSpec,
+                       port_mappings: Optional[Dict[int, int]], deadline: float,
+                       host: str = "127.0.0.1"):
+    """Run the TCP/HTTP checks of a spec, raising ReadinessTimeout if one does not pass in time"""
+    port = spec.host_port(port_mappings)
+
+    if spec.tcp:
+        if port is None:
+            raise ServiceError(f"Service {service_name} has a TCP readiness check but no port")
+        if not wait_for_tcp(host, port, deadline, spec.interval):
+            raise ReadinessTimeout(
+                f"Service {service_name} did not accept connections on port {port} within {spec.timeout:g}s"
+            )
+
+    if spec.http:
+        if spec.http.startswith(("http://", "https://")):
+            url = spec.http
+        elif port is None:
+            raise ServiceError(f"Service {service_name} has an HTTP readiness check but no port")
+        else:
+            url = f"http://{host}:{port}/{spec.http.lstrip('/')}"
+        if not wait_for_http(url, deadline, spec.interval):
+            raise ReadinessTimeout(f"Service {service_name} did not answer {url} within {spec.timeout:g}s")
+
+
+class ReadinessMetrics:
+    """Time-to-ready per service"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services: Dict[str, Dict[str, Any]] = {}
+        self.ready_count = 0
+        self.timeout_count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record_ready(self, service_name: str, seconds: float):
+        """Record that a service became ready after seconds"""
+        with self._lock:
+            self._services[service_name] = {"status": "ready", "time_to_ready": seconds, "at": time.time()}
+            self.ready_count += 1
+            self.total_time += seconds
+            self.max_time = max(self.max_time, seconds)
+
+    def record_timeout(self, service_name: str, seconds: float):
+        """Record that a service did not become ready"""
+        with self._lock:
+            self._services[service_name] = {"status": "timeout", "time_to_ready": None,
+                                            "waited": seconds, "at": time.time()}
+            self.timeout_count += 1
+
+    def get(self, service_name: str) -> Optional[Dict[str, Any]]:
+        """Last readiness result for a service"""
+        with self._lock:
+            result = self._services.get(service_name)
+            return dict(result) if result else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get readiness statistics"""
+        with self._lock:
+            return {
+                "ready_count": self.ready_count,
+                "timeout_count": self.timeout_count,
+                "avg_time_to_ready": self.total_time / self.ready_count if self.ready_count else 0.0,
+                "max_time_to_ready": self.max_time,
+                "services": {name: dict(result) for name, result in self._services.items()},
+            }
+
+
+# Shared by every provider in the process
+readiness_metrics = ReadinessMetrics()
@@ -0,0 +1,551 @@
+"""
+Container resource sampler for Web Isolator 2.0
+Reads CPU, memory, IO and pids of isolator-managed containers straight from
+the cgroup filesystem at a fixed interval, into fixed-size numeric ring
+buffers, instead of asking the daemon for one blocking 'docker stats' each.
+"""
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_CGROUP_ROOT = "/sys/fs/cgroup"
+DEFAULT_PROC_ROOT = "/proc"
+
+# Series columns; rates are per second over the last interval, NaN when unknown.
+# Container cpu_percent is relative to one CPU (as in 'docker stats'), host cpu_percent to all of them.
+CONTAINER_METRICS = ('cpu_percent', 'memory_bytes', 'io_read_bps', 'io_write_bps',
+                     'net_rx_bps', 'net_tx_bps', 'pids')
+HOST_METRICS = ('cpu_percent', 'memory_used_bytes')
+
+# Above this a cgroup v1 memory limit means "unlimited"
+UNLIMITED_MEMORY = 1 << 62
+
+NAN = float('nan')
+
+
+class RingSeries:
+    """
+    Fixed-capacity time series stored column by column in array('d').
+
+    Appending overwrites the oldest sample once full, so memory is
+    (1 + len(metrics)) * 8 bytes * capacity whatever the uptime.
+    Timestamps must not decrease.
+    """
+
+    __slots__ = ('metrics', 'capacity', 'count', '_next', '_times', '_columns')
+
+    def __init__(self, metrics: Sequence[str], capacity: int):
+        self.metrics = tuple(metrics)
+        self.capacity = capacity
+        self.count = 0
+        self._next = 0
+        self._times = array('d', bytes(8 * capacity))
+        self._columns = [array('d', bytes(8 * capacity)) for _ in self.metrics]
+
+    def append(self, timestamp: float, values: Sequence[float]):
+        slot = self._next
+        self._times[slot] = timestamp
+        for column, value in zip(self._columns, values):
+            column[slot] = value
+        self._next = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _slot(self, index: int) -> int:
+        """Physical slot of the index-th oldest sample"""
+        return (self._next - self.count + index) % self.capacity
+
+    def _slice(self, column: array, start: int) -> array:
+        """Samples start.. (oldest first) of a column, copied in at most two slices"""
+        first = self._slot(start)
+        length = self.count - start
+        if first + length <= self.capacity:
+            return column[first:first + length]
+        return column[first:] + column[:first + length - self.capacity]
+
+    def _window_start(self, since: float) -> int:
+        """Index of the oldest sample taken at or after since (binary search)"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._times[self._slot(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Tuple[array, Dict[str, array]]:
+        """(timestamps, {metric: values}) of the samples in the last seconds (all if None)"""
+        start = 0
+        if seconds is not None and self.count:
+            start = self._window_start((now if now is not None else time.time()) - seconds)
+        return (self._slice(self._times, start),
+                {metric: self._slice(column, start) for metric, column in zip(self.metrics, self._columns)})
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Newest sample as {metric: value} (None if empty)"""
+        if not self.count:
+            return None
+        slot = self._slot(self.count - 1)
+        sample = {metric: column[slot] for metric, column in zip(self.metrics, self._columns)}
+        sample['timestamp'] = self._times[slot]
+        return sample
+
+    def summary(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """min/avg/max/p95 and last value per metric over the last seconds"""
+        times, columns = self.window(seconds, now)
+        return {
+            "samples": len(times),
+            "from": times[0] if times else None,
+            "to": times[-1] if times else None,
+            "metrics": {metric: summarize(values) for metric, values in columns.items()},
+        }
+
+
+def summarize(values: Sequence[float]) -> Optional[Dict[str, float]]:
+    """last/min/avg/max/p95 of values, ignoring NaN (None if there are none)"""
+    known = [value for value in values if not math.isnan(value)]
+    if not known:
+        return None
+    last = known[-1]
+    known.sort()
+    return {
+        "last": last,
+        "min": known[0],
+        "avg": sum(known) / len(known),
+        "max": known[-1],
+        # Nearest-rank percentile
+        "p95": known[max(0, math.ceil(0.95 * len(known)) - 1)],
+    }
+
+
+class CgroupReader:
+    """
+    Reads a container's counters from a cgroup v2 (unified) or v1 hierarchy.
+
+    Both the systemd (system.slice/docker-<id>.scope) and the cgroupfs
+    (docker/<id>) layouts are looked up. The roots can point at a copy of
+    the hierarchy, e.g. a fake tree in tests or a host mount in a container.
+    """
+
+    def __init__(self, root: str = DEFAULT_CGROUP_ROOT, proc_root: str = DEFAULT_PROC_ROOT):
+        self.root = root
+        self.proc_root = proc_root
+        self.unified = os.path.exists(os.path.join(root, 'cgroup.controllers'))
+
+    def _candidates(self, container_id: str) -> List[str]:
+        return [f'system.slice/docker-{container_id}.scope', f'docker/{container_id}']
+
+    def locate(self, container_id: str) -> Optional[str]:
+        """Path of a container's cgroup relative to the (controller) root, or None"""
+        base = self.root if self.unified else os.path.join(self.root, 'memory')
+        for relative in self._candidates(container_id):
+            if os.path.isdir(os.path.join(base, relative)):
+                return relative
+        return None
+
+    def _path(self, controller: str, relative: str, name: str) -> str:
+        if self.unified:
+            return os.path.join(self.root, relative, name)
+        return os.path.join(self.root, controller, relative, name)
+
+    def _read(self, controller: str, relative: str, name: str) -> Optional[str]:
+        try:
+            with open(self._path(controller, relative, name)) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _read_int(self, controller: str, relative: str, name: str) -> Optional[int]:
+        text = self._read(controller, relative, name)
+        try:
+            return int(text) if text is not None else None
+        except ValueError:
+            return None
+
+    def _read_keyed(self, controller: str, relative: str, name: str) -> Dict[str, int]:
+        """'key value' lines, as in cpu.stat and memory.stat"""
+        values = {}
+        for line in (self._read(controller, relative, name) or '').splitlines():
+            key, _, value = line.partition(' ')
+            if value.strip().isdigit():
+                values[key] = int(value)
+        return values
+
+    def read(self, relative: str) -> Optional[Dict[str, float]]:
+        """
+        Counters of one cgroup: cpu_usec, io_read, io_write (cumulative), memory,
+        memory_limit (None if unlimited), pids and pid (a member process).
+        None once the cgroup is gone.
+        """
+        if self.unified:
+            cpu_usec = self._read_keyed('cpu', relative, 'cpu.stat').get('usage_usec')
+            memory = self._read_int('memory', relative, 'memory.current')
+            inactive_file = self._read_keyed('memory', relative, 'memory.stat').get('inactive_file', 0)
+            limit = self._read_int('memory', relative, 'memory.max')  # "max" -> None
+            io_read, io_write = self._io_v2(relative)
+        else:
+            usage_ns = self._read_int('cpuacct', relative, 'cpuacct.usage')
+            cpu_usec = usage_ns // 1000 if usage_ns is not None else None
+            memory = self._read_int('memory', relative, 'memory.usage_in_bytes')
+            inactive_file = self._read_keyed('memory', relative, 'memory.stat').get('total_inactive_file', 0)
+            limit = self._read_int('memory', relative, 'memory.limit_in_bytes')
+            if limit is not None and limit >= UNLIMITED_MEMORY:
+                limit = None
+            io_read, io_write = self._io_v1(relative)
+
+        if cpu_usec is None and memory is None:
+            return None
+
+        procs = self._read('pids', relative, 'cgroup.procs') or ''
+        return {
+            'cpu_usec': cpu_usec,
+            # Like 'docker stats', page cache that can be reclaimed does not count
+            'memory': max(0, memory - inactive_file) if memory is not None else None,
+            'memory_limit': limit,
+            'io_read': io_read,
+            'io_write': io_write,
+            'pids': self._read_int('pids', relative, 'pids.current'),
+            'pid': int(procs.split(None, 1)[0]) if procs.strip() else None,
+        }
+
+    def _io_v2(self, relative: str) -> Tuple[Optional[int], Optional[int]]:
+        text = self._read('io', relative, 'io.stat')
+        if text is None:
+            return None, None
+        read = written = 0
+        for line in text.splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key == 'rbytes':
+                    read += int(value)
+                elif key == 'wbytes':
+                    written += int(value)
+        return read, written
+
+    def _io_v1(self, relative: str) -> Tuple[Optional[int], Optional[int]]:
+        text = self._read('blkio', relative, 'blkio.throttle.io_service_bytes')
+        if text is None:
+            return None, None
+        read = written = 0
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) == 3 and parts[1] == 'Read':
+                read += int(parts[2])
+            elif len(parts) == 3 and parts[1] == 'Write':
+                written += int(parts[2])
+        return read, written
+
+    def read_network(self, pid: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        """(rx_bytes, tx_bytes) of a process's network namespace, loopback excluded"""
+        if pid is None:
+            return None, None
+        try:
+            with open(os.path.join(self.proc_root, str(pid), 'net', 'dev')) as f:
+                lines = f.read().splitlines()[2:]
+        except OSError:
+            return None, None
+        rx = tx = 0
+        for line in lines:
+            interface, _, counters = line.partition(':')
+            fields = counters.split()
+            if interface.strip() == 'lo' or len(fields) < 9:
+                continue
+            rx += int(fields[0])
+            tx += int(fields[8])
+        return rx, tx
+
+    def read_host(self) -> Dict[str, Optional[int]]:
+        """Host CPU jiffies (busy, total) and memory (total, available) in bytes"""
+        host: Dict[str, Optional[int]] = dict.fromkeys(('cpu_busy', 'cpu_total', 'memory_total',
+                                                        'memory_available'))
+        try:
+            with open(os.path.join(self.proc_root, 'stat')) as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            # guest time is already included in user/nice
+            total = sum(fields[:8])
+            host['cpu_busy'], host['cpu_total'] = total - idle, total
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            with open(os.path.join(self.proc_root, 'meminfo')) as f:
+                meminfo = {line.split(':')[0]: int(line.split()[1]) * 1024
+                           for line in f if line.split()[1:2] and line.split()[1].isdigit()}
+            host['memory_total'] = meminfo.get('MemTotal')
+            host['memory_available'] = meminfo.get('MemAvailable')
+        except (OSError, ValueError):
+            pass
+        return host
+
+
+class _Container:
+    """Sampling state of one container"""
+
+    __slots__ = ('id', 'name', 'project', 'service', 'cgroup', 'memory_limit', 'previous', 'series')
+
+    def __init__(self, container_id: str, name: str, project: Optional[str], service: Optional[str],
+                 cgroup: str, capacity: int):
+        self.id = container_id
+        self.name = name
+        self.project = project
+        self.service = service
+        self.cgroup = cgroup
+        self.memory_limit: Optional[int] = None
+        self.previous: Optional[Tuple[float, Dict[str, Any], Tuple[Optional[int], Optional[int]]]] = None
+        self.series = RingSeries(CONTAINER_METRICS, capacity)
+
+
+def _rate(current: Optional[float], previous: Optional[float], elapsed: float) -> float:
+    if current is None or previous is None or elapsed <= 0 or current < previous:
+        return NAN
+    return (current - previous) / elapsed
+
+
+def _sum(values: List[float]) -> float:
+    """Sum of the known values (NaN if none is known)"""
+    known = [value for value in values if not math.isnan(value)]
+    return sum(known) if known else NAN
+
+
+class ResourceSampler:
+    """
+    Samples every running managed container at a fixed interval.
+
+    discover() returns the containers to sample as dicts with id (full),
+    name, project and service. Besides one series per container the sampler
+    keeps per-project and overall sums (taken at the same instants) and a
+    host series, each holding capacity samples (an hour at the defaults).
+    """
+
+    def __init__(self, discover: Callable[[], List[Dict[str, Any]]], interval: float = 5.0,
+                 capacity: int = 720, cgroup_root: Optional[str] = None, proc_root: Optional[str] = None):
+        self.discover = discover
+        self.interval = interval
+        self.capacity = capacity
+        self.reader = CgroupReader(
+            cgroup_root or os.environ.get("ISOLATOR_CGROUP_ROOT", DEFAULT_CGROUP_ROOT),
+            proc_root or os.environ.get("ISOLATOR_PROC_ROOT", DEFAULT_PROC_ROOT)
+        )
+        self.cpu_count = os.cpu_count() or 1
+
+        self._lock = threading.Lock()
+        self._containers: Dict[str, _Container] = {}
+        self._projects: Dict[str, RingSeries] = {}
+        self._total = RingSeries(CONTAINER_METRICS, capacity)
+        self._host = RingSeries(HOST_METRICS, capacity)
+        self._host_previous: Optional[Dict[str, Optional[int]]] = None
+        self.memory_total: Optional[int] = None
+        self._listeners: List[Callable[[float, Dict[str, Dict[str, Any]]], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Sampler statistics
+        self.ticks = 0
+        self.errors = 0
+        self.last_tick_duration = 0.0
+
+    def add_listener(self, listener: Callable[[float, Dict[str, Dict[str, Any]]], None]):
+        """Call listener(timestamp, {container name: sample}) after every tick"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def start(self):
+        """Start sampling in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="isolator-resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling (the collected series stay readable)"""
+        self._stop.set()
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                print(f"Warning: resource sampling failed: {e}")
+            # Fixed rate: a slow tick shortens the next wait instead of drifting
+            next_tick += self.interval
+            self._stop.wait(max(0.0, next_tick - time.monotonic()))
+
+    def sample(self, now: Optional[float] = None):
+        """Take one sample of every container (called by the sampling thread)"""
+        started = time.perf_counter()
+        now = now if now is not None else time.time()
+        discovered = {c['id']: c for c in self.discover()}
+
+        # Containers that stopped are forgotten; new ones are located once
+        for container_id in list(self._containers):
+            if container_id not in discovered:
+                with self._lock:
+                    del self._containers[container_id]
+        for container_id, info in discovered.items():
+            if container_id not in self._containers:
+                cgroup = self.reader.locate(container_id)
+                if cgroup is None:
+                    continue
+                container = _Container(container_id, info['name'], info.get('project'), info.get('service'),
+                                       cgroup, self.capacity)
+                with self._lock:
+                    self._containers[container_id] = container
+
+        samples: Dict[str, Dict[str, Any]] = {}
+        by_project: Dict[str, List[List[float]]] = {}
+        every: List[List[float]] = []
+        for container in list(self._containers.values()):
+            values = self._sample_container(container, now)
+            if values is None:
+                continue
+            samples[container.name] = dict(zip(CONTAINER_METRICS, values), project=container.project,
+                                           service=container.service, memory_limit=container.memory_limit)
+            every.append(values)
+            if container.project:
+                by_project.setdefault(container.project, []).append(values)
+
+        with self._lock:
+            if every:
+                self._total.append(now, [_sum(list(column)) for column in zip(*every)])
+            for project, rows in by_project.items():
+                series = self._projects.get(project)
+                if series is None:
+                    series = self._projects[project] = RingSeries(CONTAINER_METRICS, self.capacity)
+                series.append(now, [_sum(list(column)) for column in zip(*rows)])
+            self._sample_host(now)
+            listeners = list(self._listeners)
+
+        self.ticks += 1
+        self.last_tick_duration = time.perf_counter() - started
+        for listener in listeners:
+            try:
+                listener(now, samples)
+            except Exception as e:
+                print(f"Warning: resource sampler listener failed: {e}")
+
+    def _sample_container(self, container: _Container, now: float) -> Optional[List[float]]:
+        counters = self.reader.read(container.cgroup)
+        if counters is None:
+            return None
+        network = self.reader.read_network(counters['pid'])
+        container.memory_limit = counters['memory_limit']
+
+        previous = container.previous
+        container.previous = (now, counters, network)
+        if previous is None:
+            # Rates need two samples
+            return None
+        elapsed = now - previous[0]
+        cpu_rate = _rate(counters['cpu_usec'], previous[1]['cpu_usec'], elapsed)
+        values = [
+            cpu_rate / 1e4 if not math.isnan(cpu_rate) else NAN,  # usec per second -> percent of one CPU
+            float(counters['memory']) if counters['memory'] is not None else NAN,
+            _rate(counters['io_read'], previous[1]['io_read'], elapsed),
+            _rate(counters['io_write'], previous[1]['io_write'], elapsed),
+            _rate(network[0], previous[2][0], elapsed),
+            _rate(network[1], previous[2][1], elapsed),
+            float(counters['pids']) if counters['pids'] is not None else NAN,
+        ]
+        with self._lock:
+            container.series.append(now, values)
+        return values
+
+    def _sample_host(self, now: float):
+        """Append a host sample (lock must be held)"""
+        host = self.reader.read_host()
+        previous, self._host_previous = self._host_previous, host
+        self.memory_total = host['memory_total']
+        if previous is None:
+            return
+        cpu_percent = NAN
+        if None not in (host['cpu_total'], previous['cpu_total'], host['cpu_busy'], previous['cpu_busy']):
+            total = host['cpu_total'] - previous['cpu_total']
+            if total > 0:
+                cpu_percent = (host['cpu_busy'] - previous['cpu_busy']) / total * 100
+        if host['memory_total'] is not None and host['memory_available'] is not None:
+            memory_used = float(host['memory_total'] - host['memory_available'])
+        else:
+            memory_used = NAN
+        self._host.append(now, [cpu_percent, memory_used])
+
+    # Reads
+    def latest(self, name_or_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Newest sample of a container by name or (prefix of) ID, with its
+        cumulative io_read/io_write/net_rx/net_tx byte counters and memory_limit.
+        """
+        with self._lock:
+            for container in self._containers.values():
+                if container.name == name_or_id or (len(name_or_id) >= 12 and container.id.startswith(name_or_id)):
+                    sample = container.series.latest()
+                    if sample is None or container.previous is None:
+                        return None
+                    _, counters, network = container.previous
+                    sample.update(io_read=counters['io_read'], io_write=counters['io_write'],
+                                  net_rx=network[0], net_tx=network[1],
+                                  memory_limit=container.memory_limit or self.memory_total)
+                    return sample
+        return None
+
+    def container_stats(self, name: str, window: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Summary of one container over the last window seconds"""
+        with self._lock:
+            for container in self._containers.values():
+                if container.name == name:
+                    return self._container_summary(container, window)
+        return None
+
+    def _container_summary(self, container: _Container, window: Optional[float]) -> Dict[str, Any]:
+        summary = container.series.summary(window)
+        summary.update(container=container.name, service=container.service,
+                       memory_limit=container.memory_limit)
+        return summary
+
+    def project_stats(self, project: str, window: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Summary of a project's containers, summed and per service, over the last window seconds"""
+        with self._lock:
+            series = self._projects.get(project)
+            if series is None:
+                return None
+            summary = series.summary(window)
+            summary["services"] = [
+                self._container_summary(container, window)
+                for container in self._containers.values() if container.project == project
+            ]
+            return summary
+
+    def system_stats(self, window: Optional[float] = None) -> Dict[str, Any]:
+        """Summary of all managed containers and of the host over the last window seconds"""
+        with self._lock:
+            return {
+                "containers": len(self._containers),
+                "projects": sorted(project for project in self._projects
+                                   if any(c.project == project for c in self._containers.values())),
+                "total": self._total.summary(window),
+                "host": self._host.summary(window),
+                "cpu_count": self.cpu_count,
+                "memory_total": self.memory_total,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get sampler statistics"""
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive() and not self._stop.is_set(),
+                "interval": self.interval,
+                "capacity": self.capacity,
+                "containers": len(self._containers),
+                "ticks": self.ticks,
+                "errors": self.errors,
+                "last_tick_duration": self.last_tick_duration,
+                "cgroup_root": self.reader.root,
+                "cgroup_version": 2 if self.reader.unified else 1,
+            }
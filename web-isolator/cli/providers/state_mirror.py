@@ -0,0 +1,285 @@
+"""
+Container state mirror for Web Isolator 2.0
+Keeps an in-memory copy of isolator-managed containers, loaded with one bulk
+snapshot and then updated from the Docker events stream, so status reads do
+not hit the daemon.
+"""
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from .base import ProviderError, MANAGED_LABEL, PROJECT_LABEL, PROJECT_ID_LABEL
+from .docker_api import DockerAPIClient
+
+
+# Event action -> container State
+ACTION_STATES = {
+    'die': 'exited',
+    'stop': 'exited',
+    'pause': 'paused',
+    'unpause': 'running',
+}
+
+# Actions after which names, ports or state are re-read from the daemon
+REFRESH_ACTIONS = {'create', 'start', 'restart', 'rename', 'update'}
+
+MIRRORED_ACTIONS = sorted(set(ACTION_STATES) | REFRESH_ACTIONS | {'destroy', 'health_status'})
+
+# (project name, project ID) from a container's labels; the ID is None on containers started without it
+ProjectKey = Tuple[str, Optional[str]]
+ProjectListener = Callable[[str, str, Optional[str]], None]
+
+
+def _project_key(record: Dict[str, Any]) -> Optional[ProjectKey]:
+    labels = record.get('Labels') or {}
+    project = labels.get(PROJECT_LABEL)
+    return (project, labels.get(PROJECT_ID_LABEL)) if project is not None else None
+
+
+class ContainerStateMirror:
+    """
+    Event-fed mirror of managed containers.
+
+    Records have the shape of an Engine API container list entry (Id, Names,
+    State, Status, Image, Ports, Labels) plus Health. Listeners are called with
+    (project_name, status, project_id) whenever a project's aggregate status
+    changes: "running" if any of its containers runs, "stopped" otherwise.
+    Projects are told apart by their project ID label where containers have one.
+    """
+
+    def __init__(self, api: DockerAPIClient, idle_timeout: float = 10.0, retry_interval: float = 2.0):
+        self.api = api
+        self.idle_timeout = idle_timeout
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._containers: Dict[str, Dict[str, Any]] = {}
+        self._project_status: Dict[ProjectKey, str] = {}
+        self._listeners: List[ProjectListener] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._synced = threading.Event()
+        self._since = 0.0
+        self._last_event_nano = 0
+
+        # Mirror statistics
+        self.snapshots = 0
+        self.events_applied = 0
+        self.refreshes = 0
+        self.resyncs = 0
+
+    @property
+    def filters(self) -> Dict[str, List[str]]:
+        return {'label': [f'{MANAGED_LABEL}=true']}
+
+    @property
+    def synced(self) -> bool:
+        """Whether the mirror currently reflects the daemon"""
+        return self._synced.is_set()
+
+    def add_listener(self, listener: ProjectListener):
+        """Call listener(project_name, status, project_id) on project status transitions"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def start(self):
+        """Load the initial snapshot and start following events in the background"""
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        # A stopped thread may still be waiting for its stream to time out; it keeps its own stop event
+        self._stop = threading.Event()
+        self._snapshot()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="isolator-state-mirror",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop following events (the thread ends once the current stream times out)"""
+        self._stop.set()
+        self._synced.clear()
+
+    # Reads
+    def get(self, name_or_id: str) -> Optional[Dict[str, Any]]:
+        """Container record by name or (prefix of) ID"""
+        with self._lock:
+            name = self._name_of(name_or_id)
+            return dict(self._containers[name]) if name is not None else None
+
+    def _name_of(self, name_or_id: str) -> Optional[str]:
+        """Resolve a container name or ID (prefix of at least 12 chars) (lock must be held)"""
+        if name_or_id in self._containers:
+            return name_or_id
+        if len(name_or_id) >= 12:
+            return next((n for n, r in self._containers.items() if r['Id'].startswith(name_or_id)), None)
+        return None
+
+    def containers(self, project: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All mirrored containers, optionally only those of one project"""
+        with self._lock:
+            return [
+                dict(record) for record in self._containers.values()
+                if project is None or (record.get('Labels') or {}).get(PROJECT_LABEL) == project
+            ]
+
+    def project_status(self, project: str, project_id: Optional[str] = None) -> Optional[str]:
+        """Aggregate status of a project's containers"""
+        with self._lock:
+            return self._project_status.get((project, project_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get mirror statistics"""
+        with self._lock:
+            return {
+                "synced": self.synced,
+                "containers": len(self._containers),
+                "projects": len(self._project_status),
+                "snapshots": self.snapshots,
+                "events_applied": self.events_applied,
+                "refreshes": self.refreshes,
+                "resyncs": self.resyncs,
+            }
+
+    # Updates
+    def refresh(self, name_or_id: str):
+        """Re-read one container from the daemon (used after our own changes)"""
+        try:
+            containers = self.api.list_containers(all=True, filters={'id': [name_or_id]})
+            if not containers:
+                name_filter = f'^/{re.escape(name_or_id)}$'
+                containers = self.api.list_containers(all=True, filters={'name': [name_filter]})
+        except ProviderError:
+            return
+        self.refreshes += 1
+        notifications = []
+        with self._lock:
+            if not containers:
+                name = self._name_of(name_or_id)
+                if name is not None:
+                    notifications = self._update_projects([self._containers.pop(name)])
+            for container in containers:
+                if (container.get('Labels') or {}).get(MANAGED_LABEL) == 'true':
+                    notifications += self._put(container)
+        self._notify(notifications)
+
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                # Only the mirrored actions, so e.g. healthcheck exec_* events are not streamed
+                filters = dict(self.filters, type=['container'], event=MIRRORED_ACTIONS)
+                for event in self.api.events(filters=filters, since=self._since, timeout=self.idle_timeout):
+                    if stop.is_set():
+                        return
+                    self._apply(event)
+            except ProviderError:
+                if stop.is_set():
+                    return
+                # Events may have been missed: reload everything once the daemon is back
+                self._synced.clear()
+                stop.wait(self.retry_interval)
+                try:
+                    self._snapshot()
+                    self.resyncs += 1
+                except ProviderError:
+                    continue
+
+    def _snapshot(self):
+        """Replace the mirror with the daemon's current container list"""
+        since = time.time()
+        containers = self.api.list_containers(all=True, filters=self.filters)
+        with self._lock:
+            previous = list(self._containers.values())
+            self._containers = {}
+            for container in containers:
+                self._containers[container['Names'][0].lstrip('/')] = dict(container)
+            notifications = self._update_projects(previous + containers)
+            # Events of the current second may be replayed; _apply skips ones already seen
+            self._since = since - 1
+            self._last_event_nano = int(self._since * 1e9)
+            self.snapshots += 1
+        self._synced.set()
+        self._notify(notifications)
+
+    def _apply(self, event: Dict[str, Any]):
+        """Apply one container event"""
+        action = (event.get('Action') or event.get('status') or '').split(':')[0]
+        time_nano = event.get('timeNano') or int(event.get('time', 0) * 1e9)
+        if time_nano <= self._last_event_nano:
+            return
+        # Every event moves the resume point, so ignored ones are not replayed after a reconnect
+        self._last_event_nano = time_nano
+        self._since = time_nano / 1e9
+        if action not in MIRRORED_ACTIONS:
+            return
+        self.events_applied += 1
+
+        container_id = event.get('id') or (event.get('Actor') or {}).get('ID', '')
+        if action in REFRESH_ACTIONS:
+            self.refresh(container_id)
+            return
+
+        notifications = []
+        with self._lock:
+            name = self._name_of(container_id)
+            if name is None:
+                return
+            record = self._containers[name]
+            if action == 'destroy':
+                del self._containers[name]
+            elif action == 'health_status':
+                record['Health'] = (event.get('Action') or event.get('status')).split(':', 1)[1].strip()
+            else:
+                record['State'] = ACTION_STATES[action]
+            notifications = self._update_projects([record])
+        self._notify(notifications)
+
+    def _put(self, container: Dict[str, Any]) -> List[tuple]:
+        """Insert/replace a record (lock must be held)"""
+        name = container['Names'][0].lstrip('/')
+        stale = [n for n, r in self._containers.items() if r['Id'] == container['Id'] and n != name]
+        for old_name in stale:
+            del self._containers[old_name]
+        previous = self._containers.get(name)
+        record = dict(container)
+        if previous and 'Health' in previous:
+            record.setdefault('Health', previous['Health'])
+        self._containers[name] = record
+        return self._update_projects([record])
+
+    def _update_projects(self, records: List[Dict[str, Any]]) -> List[tuple]:
+        """Recompute aggregate status of the projects of records (lock must be held)"""
+        projects = {_project_key(r) for r in records} - {None}
+        changes = []
+        for project in projects:
+            states = [r.get('State') for r in self._containers.values() if _project_key(r) == project]
+            status = 'running' if 'running' in states else 'stopped'
+            if self._project_status.get(project) != status:
+                self._project_status[project] = status
+                changes.append((project, status))
+        return changes
+
+    def _notify(self, changes: List[tuple]):
+        with self._lock:
+            listeners = list(self._listeners)
+        for (project, project_id), status in changes:
+            for listener in listeners:
+                try:
+                    listener(project, status, project_id)
+                except Exception as e:
+                    print(f"Warning: state mirror listener failed for {project}: {e}")
+
+
+# One mirror per daemon, shared by every provider instance
+_mirrors: Dict[str, ContainerStateMirror] = {}
+_mirrors_lock = threading.Lock()
+
+
+def get_shared_mirror(api: DockerAPIClient) -> ContainerStateMirror:
+    """Get the process-wide mirror for a client's daemon socket"""
+    with _mirrors_lock:
+        mirror = _mirrors.get(api.socket_path)
+        if mirror is None:
+            mirror = ContainerStateMirror(api)
+            _mirrors[api.socket_path] = mirror
+        return mirror
@@ -0,0 +1,142 @@
+"""
+Shared fixtures for the Web Isolator 2.0 test suite
+"""
+import json
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# Modules import each other as top-level packages (core, providers, api), as in api/server.py
+sys.path.insert(0, str(Path(__file__).parent.parent / "cli"))
+
+
+# (status, body, extra headers); a list body is sent with chunked transfer encoding
+Response = Tuple[int, Union[bytes, List[bytes]], Dict[str, str]]
+Route = Callable[[Dict[str, List[str]]], Response]
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    return status, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"}
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    def handle_error(self, request, client_address):
+        # Clients going away mid-response (e.g. a stopped event stream) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeEngine:
+    """
+    Minimal Docker Engine API served over a unix socket.
+
+    Routes map (method, path) to a function of the query parameters.
+    Connections and requests are counted so tests can check connection reuse.
+    With close_after_response the server drops every connection after one
+    response without announcing it, like a daemon closing idle keep-alives.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.routes: Dict[Tuple[str, str], Route] = {
+            ("GET", "/_ping"): lambda query: (200, b"OK", {}),
+            ("GET", "/version"): lambda query: json_response({"Version": "24.0.0", "ApiVersion": "1.43"}),
+        }
+        self.close_after_response = False
+        self.connections = 0
+        self.requests: List[Tuple[str, str, Dict[str, List[str]]]] = []
+        self._sockets: List[socket.socket] = []
+        self._server: Optional[_Server] = None
+
+    def route(self, method: str, path: str, handler: Route):
+        self.routes[(method, path)] = handler
+
+    def _handler(self):
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                engine.connections += 1
+                engine._sockets.append(self.request)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _serve(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                engine.requests.append((self.command, url.path, query))
+
+                handler = engine.routes.get((self.command, url.path))
+                if handler is None:
+                    status, body, headers = json_response({"message": f"page not found: {url.path}"}, 404)
+                else:
+                    status, body, headers = handler(query)
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if isinstance(body, list):
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for chunk in body:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                self.wfile.flush()
+                if engine.close_after_response:
+                    self.close_connection = True
+
+            do_GET = do_POST = do_DELETE = _serve
+
+        return Handler
+
+    def start(self):
+        self._server = _Server(self.socket_path, self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def stop(self):
+        """Stop serving and remove the socket, as when the daemon goes away"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for sock in self._sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+@pytest.fixture
+def fake_engine():
+    # Unix socket paths are limited to ~100 bytes, so not under pytest's tmp_path
+    directory = tempfile.mkdtemp(prefix="isolator-")
+    engine = FakeEngine(os.path.join(directory, "docker.sock"))
+    engine.start()
+    yield engine
+    engine.stop()
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,131 @@
+"""
+Tests for the content-addressed build cache
+"""
+import os
+import time
+
+import pytest
+
+from providers.build_cache import BuildCache, DockerIgnore
+
+
+# Old enough to be outside the racy window
+OLD = time.time() - 3600
+
+
+def write(root, rel_path: str, content: str = "x", mtime: float = OLD):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def context(tmp_path):
+    root = tmp_path / "app"
+    write(root, "Dockerfile", "FROM node:18-alpine\nCOPY . .\n")
+    write(root, "package.json", '{"name": "app"}')
+    write(root, "src/index.js", "console.log('hi')")
+    write(root, "node_modules/left-pad/index.js", "module.exports = 1")
+    write(root, "debug.log", "noise")
+    write(root, ".dockerignore", "# dependencies\nnode_modules\n*.log\n")
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BuildCache(str(tmp_path / "build_cache.json"))
+
+
+def digest(cache, context, **options):
+    return cache.compute_digest(str(context / "Dockerfile"), str(context), options)
+
+
+class TestDockerIgnore:
+    def test_patterns_match_like_docker(self):
+        ignore = DockerIgnore(["node_modules", "**/*.tmp", "docs/*.md", "!docs/README.md", "/build", "data?"])
+
+        assert ignore.is_excluded("node_modules/left-pad/index.js")
+        assert ignore.is_excluded("a/b/cache.tmp")
+        assert ignore.is_excluded("cache.tmp")
+        assert ignore.is_excluded("docs/guide.md")
+        assert not ignore.is_excluded("docs/README.md")
+        assert not ignore.is_excluded("docs/api/guide.md")
+        assert ignore.is_excluded("build/app.js")
+        assert ignore.is_excluded("data1")
+        assert not ignore.is_excluded("src/node_modules.js")
+
+    def test_the_last_matching_pattern_wins(self):
+        ignore = DockerIgnore(["*.log", "!keep.log", "keep*"])
+
+        assert ignore.is_excluded("keep.log")
+        assert ignore.has_exceptions
+
+
+class TestComputeDigest:
+    def test_excluded_files_do_not_change_the_digest(self, cache, context):
+        before = digest(cache, context)
+
+        write(context, "debug.log", "more noise")
+        write(context, "node_modules/left-pad/index.js", "module.exports = 22")
+
+        assert digest(cache, context) == before
+
+    def test_included_files_options_and_modes_change_the_digest(self, cache, context):
+        before = digest(cache, context)
+
+        assert digest(cache, context, build_args={"NODE_ENV": "production"}) != before
+        os.chmod(context / "src/index.js", 0o755)
+        assert digest(cache, context) != before
+        write(context, "src/index.js", "console.log('bye')")
+        assert digest(cache, context) != before
+
+    def test_a_negated_pattern_re_includes_files_below_an_excluded_directory(self, cache, context):
+        write(context, ".dockerignore", "node_modules\n!node_modules/left-pad/index.js\n")
+        before = digest(cache, context)
+
+        write(context, "node_modules/left-pad/index.js", "module.exports = 22")
+
+        assert digest(cache, context) != before
+
+    def test_unchanged_files_reuse_their_hash(self, cache, context):
+        first = digest(cache, context)
+        # Dockerfile, .dockerignore, package.json, src/index.js
+        assert (cache.stats()["files_hashed"], cache.stats()["files_reused"]) == (4, 0)
+
+        assert digest(cache, context) == first
+        assert (cache.stats()["files_hashed"], cache.stats()["files_reused"]) == (4, 4)
+
+        write(context, "package.json", '{"name": "app", "private": true}')
+        digest(cache, context)
+        assert (cache.stats()["files_hashed"], cache.stats()["files_reused"]) == (5, 7)
+
+    def test_recently_modified_files_are_always_rehashed(self, cache, context):
+        write(context, "src/index.js", "console.log('hi')", mtime=time.time())
+        digest(cache, context)
+        hashed = cache.stats()["files_hashed"]
+
+        digest(cache, context)
+
+        assert cache.stats()["files_hashed"] == hashed + 1
+
+
+class TestIndex:
+    def test_the_index_is_saved_once_per_build(self, tmp_path, cache, context):
+        index_path = tmp_path / "build_cache.json"
+
+        image_digest = digest(cache, context)
+        assert not index_path.exists()
+
+        cache.record_build("app:dev", image_digest, 12.5)
+        saved = index_path.stat().st_mtime_ns
+
+        reloaded = BuildCache(str(index_path))
+        assert digest(reloaded, context) == image_digest
+        assert reloaded.stats()["files_reused"] == 4
+        assert index_path.stat().st_mtime_ns == saved
+
+        reloaded.record_hit("app:dev", image_digest)
+        stats = reloaded.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["images"]) == (1, 1, 0.5, 1)
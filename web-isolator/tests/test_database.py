@@ -0,0 +1,148 @@
+"""
+Tests for the SQLite connection pool and the database manager built on it
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from core.connection_pool import ConnectionPool
+from core.database import DatabaseManager
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "isolator.db"))
+    yield db
+    db.close()
+
+
+def workspace_names(db):
+    return [workspace['name'] for workspace in db.list_workspaces()]
+
+
+class TestConnectionPool:
+    def test_connections_are_configured_for_wal(self, pool):
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.execute("SELECT 1 AS one").fetchone()["one"] == 1
+
+    def test_released_connections_are_reused(self, pool):
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+
+        stats = pool.stats()
+        assert (stats["misses"], stats["hits"], stats["open_connections"]) == (1, 1, 1)
+
+    def test_an_exhausted_pool_waits_then_times_out(self, pool):
+        held = [pool.acquire(), pool.acquire()]
+        threading.Timer(0.05, pool.release, args=(held.pop(),)).start()
+
+        held.append(pool.acquire())
+        assert pool.stats()["waits"] == 1
+
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+        for conn in held:
+            pool.release(conn)
+
+    def test_a_half_finished_transaction_is_rolled_back_on_release(self, pool):
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE items (name TEXT)")
+            conn.commit()
+            conn.execute("INSERT INTO items VALUES ('draft')")
+            assert conn.in_transaction
+
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_a_closed_pool_refuses_connections(self, pool):
+        conn = pool.acquire()
+        pool.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            pool.acquire()
+        pool.release(conn)
+        assert pool.stats()["open_connections"] == 0
+
+    def test_an_in_memory_database_has_a_single_connection(self):
+        assert ConnectionPool(":memory:", max_size=8).max_size == 1
+
+
+class TestNestedConnections:
+    def test_an_inner_commit_does_not_commit_the_outer_transaction(self, db):
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO workspaces (id, name, description) VALUES ('w1', 'outer', '')")
+            # create_workspace commits on the connection it shares with this block
+            db.create_workspace("inner")
+            assert conn.in_transaction
+            conn.rollback()
+
+        assert workspace_names(db) == []
+
+    def test_the_outer_commit_keeps_inner_writes(self, db):
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO workspaces (id, name, description) VALUES ('w1', 'outer', '')")
+            db.create_workspace("inner")
+            conn.commit()
+
+        assert workspace_names(db) == ["inner", "outer"]
+
+    def test_a_failing_inner_call_only_undoes_its_own_statements(self, db):
+        db.create_workspace("existing")
+
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO workspaces (id, name, description) VALUES ('w1', 'outer', '')")
+            with pytest.raises(RuntimeError):
+                with db._get_connection() as inner:
+                    inner.execute("INSERT INTO workspaces (id, name, description) VALUES ('w2', 'inner', '')")
+                    raise RuntimeError("validation failed")
+            conn.commit()
+
+        assert workspace_names(db) == ["existing", "outer"]
+
+    def test_nested_calls_share_one_pooled_connection(self, db):
+        before = db.get_pool_stats()["open_connections"]
+
+        with db._get_connection():
+            db.create_workspace("inner")
+            db.list_workspaces()
+
+        assert db.get_pool_stats()["open_connections"] == before
+
+
+class TestEnvironmentVariables:
+    @pytest.fixture
+    def service_id(self, db):
+        project_id = db.create_project(db.create_workspace("dev"), "shop", "/src/shop")
+        return db.create_service(project_id, "api", "backend")
+
+    def test_replace_deletes_only_variables_missing_from_the_mapping(self, db, service_id):
+        db.set_environment_variables(service_id, {"A": "1", "B": "2", "C": "3"})
+
+        db.set_environment_variables(service_id, {"B": "20", "D": "4"}, replace=True)
+
+        assert db.get_environment_variables(service_id) == {"B": "20", "D": "4"}
+
+    def test_replace_with_more_keys_than_sqlite_parameters(self, db, service_id):
+        # The pool hands this single connection back to every call below
+        with db._get_connection() as conn:
+            conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        old = {f"OLD_{i}": "x" for i in range(2500)}
+        new = {f"NEW_{i}": "y" for i in range(2500)}
+        db.set_environment_variables(service_id, old)
+
+        db.set_environment_variables(service_id, new, replace=True)
+
+        assert db.get_environment_variables(service_id) == new
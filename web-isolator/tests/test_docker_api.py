@@ -0,0 +1,198 @@
+"""
+Tests for the Docker Engine API clients and the docker provider's CLI fallback
+"""
+import struct
+import subprocess
+
+import pytest
+
+from conftest import json_response
+from providers.async_docker_api import AsyncDockerAPIClient
+from providers.docker_api import DockerAPIClient, DockerAPIError, demux_stream
+from providers.docker_provider import DockerProvider
+
+
+def frame(stream_type: int, payload: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+
+LOG_FRAMES = [(1, b"listening on :8000\n"), (2, b"warning: debug mode\n"), (1, b"GET / 200\n")]
+LOG_BODY = b"".join(frame(stream_type, payload) for stream_type, payload in LOG_FRAMES)
+
+
+def split(data: bytes, size: int):
+    """Chunks of data cutting across frame boundaries"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def serve_logs(engine, chunked: bool = False, tty: bool = False):
+    engine.route("GET", "/containers/web/json", lambda query: json_response({"Config": {"Tty": tty}}))
+    body = split(LOG_BODY, 5) if chunked else LOG_BODY
+    engine.route("GET", "/containers/web/logs", lambda query: (200, body, {}))
+
+
+class TestDockerAPIClient:
+    def test_requests_reuse_a_keep_alive_connection(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+
+        for _ in range(3):
+            assert client.version()["Version"] == "24.0.0"
+
+        assert client.requests_made == 3
+        assert client.connections_opened == 1
+        assert fake_engine.connections == 1
+
+    def test_stale_keep_alive_connection_is_retried(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        fake_engine.close_after_response = True
+
+        assert client.version()["ApiVersion"] == "1.43"
+        # The pooled connection was closed by the daemon; the retry opens a new one
+        assert client.version()["ApiVersion"] == "1.43"
+
+        assert fake_engine.connections == 2
+        assert client.requests_made == 2
+
+    def test_error_response_raises_docker_api_error(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        fake_engine.route("GET", "/containers/missing/json",
+                          lambda query: json_response({"message": "No such container: missing"}, 404))
+
+        with pytest.raises(DockerAPIError) as error:
+            client.inspect_container("missing")
+
+        assert error.value.status == 404
+        assert error.value.message == "No such container: missing"
+
+    def test_unreachable_socket_is_reported(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        assert client.is_reachable()
+
+        fake_engine.stop()
+        client.invalidate()
+
+        assert not client.is_reachable()
+
+    def test_container_logs_are_demultiplexed(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        serve_logs(fake_engine)
+
+        assert client.container_logs("web", tail=10) == LOG_FRAMES
+        _, path, query = fake_engine.requests[-1]
+        assert path == "/containers/web/logs"
+        assert query["tail"] == ["10"]
+
+    def test_log_stream_reassembles_frames_split_across_chunks(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        serve_logs(fake_engine, chunked=True)
+
+        frames = list(client.container_log_stream("web", {"stdout": "1", "stderr": "1"}, timeout=5))
+
+        assert frames == LOG_FRAMES
+
+    def test_tty_log_stream_is_not_demultiplexed(self, fake_engine):
+        client = DockerAPIClient(fake_engine.socket_path)
+        serve_logs(fake_engine, tty=True)
+
+        frames = list(client.container_log_stream("web", {"stdout": "1"}, timeout=5))
+
+        assert {stream_type for stream_type, _ in frames} == {1}
+        assert b"".join(payload for _, payload in frames) == LOG_BODY
+
+
+def test_demux_stream_ignores_a_truncated_header():
+    assert demux_stream(LOG_BODY + b"\x01\x00") == LOG_FRAMES
+
+
+class TestAsyncDockerAPIClient:
+    @pytest.mark.asyncio
+    async def test_requests_reuse_a_keep_alive_connection(self, fake_engine):
+        client = AsyncDockerAPIClient(fake_engine.socket_path)
+
+        for _ in range(3):
+            assert (await client.version())["Version"] == "24.0.0"
+
+        assert client.requests_made == 3
+        assert client.connections_opened == 1
+        assert fake_engine.connections == 1
+        client.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_keep_alive_connection_is_retried(self, fake_engine):
+        client = AsyncDockerAPIClient(fake_engine.socket_path)
+        fake_engine.close_after_response = True
+
+        assert (await client.version())["ApiVersion"] == "1.43"
+        assert (await client.version())["ApiVersion"] == "1.43"
+
+        assert fake_engine.connections == 2
+        assert client.requests_made == 2
+        client.close()
+
+    @pytest.mark.asyncio
+    async def test_container_logs_are_demultiplexed(self, fake_engine):
+        client = AsyncDockerAPIClient(fake_engine.socket_path)
+        serve_logs(fake_engine)
+
+        assert await client.container_logs("web") == LOG_FRAMES
+        client.close()
+
+    @pytest.mark.asyncio
+    async def test_log_stream_reassembles_frames_split_across_chunks(self, fake_engine):
+        client = AsyncDockerAPIClient(fake_engine.socket_path)
+        serve_logs(fake_engine, chunked=True)
+
+        frames = [item async for item in client.container_log_stream("web", {"stdout": "1", "stderr": "1"})]
+
+        assert frames == LOG_FRAMES
+        client.close()
+
+
+class TestCLIFallback:
+    @pytest.fixture
+    def docker_cli(self, monkeypatch):
+        """Record docker CLI invocations instead of running them"""
+        commands = []
+
+        def run(cmd, **kwargs):
+            commands.append(cmd)
+            stdout = "Docker version 24.0.0, build abc" if cmd[1:] == ["--version"] else ""
+            return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+        monkeypatch.setattr(subprocess, "run", run)
+        return commands
+
+    def provider(self, monkeypatch, socket_path: str) -> DockerProvider:
+        monkeypatch.setenv("DOCKER_HOST", f"unix://{socket_path}")
+        monkeypatch.delenv("ISOLATOR_DOCKER_BACKEND", raising=False)
+        provider = DockerProvider()
+        provider._probe.invalidate()
+        return provider
+
+    def test_engine_api_is_used_when_the_socket_answers(self, monkeypatch, fake_engine, docker_cli):
+        fake_engine.route("POST", "/containers/web/stop", lambda query: (204, b"", {}))
+        provider = self.provider(monkeypatch, fake_engine.socket_path)
+
+        assert provider.stop_service("web")
+
+        assert ("POST", "/containers/web/stop", {"t": ["10"]}) in fake_engine.requests
+        assert not [cmd for cmd in docker_cli if cmd[1:] != ["--version"]]
+
+    def test_cli_is_used_without_a_daemon_socket(self, monkeypatch, tmp_path, docker_cli):
+        provider = self.provider(monkeypatch, str(tmp_path / "missing.sock"))
+
+        assert provider.stop_service("web")
+
+        assert ["docker", "stop", "web"] in docker_cli
+
+    def test_cli_takes_over_when_the_daemon_goes_away(self, monkeypatch, fake_engine, docker_cli):
+        fake_engine.route("POST", "/containers/web/stop", lambda query: (204, b"", {}))
+        provider = self.provider(monkeypatch, fake_engine.socket_path)
+        assert provider.stop_service("web")
+
+        fake_engine.stop()
+        # The failed request drops the cached reachability, so the next call probes again
+        provider.stop_service("web")
+        assert provider.stop_service("web")
+
+        assert ["docker", "stop", "web"] in docker_cli
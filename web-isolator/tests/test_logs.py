@@ -0,0 +1,145 @@
+"""
+Tests for merging several services' logs into one timestamp-ordered stream
+"""
+import asyncio
+
+import pytest
+
+from providers.base import LogLine
+from providers.logs import LogMerger, merge_log_iterators, merge_log_streams, parse_timestamp
+
+
+def at(second: float) -> str:
+    """RFC 3339 timestamp with nanoseconds, as printed by 'docker logs --timestamps'"""
+    return f"2024-05-01T12:00:{second:012.9f}Z"
+
+
+def line(service: str, second: float, text: str = "") -> LogLine:
+    return LogLine(service, "stdout", text or f"{service}@{second}", at(second))
+
+
+def texts(lines):
+    return [log_line.text for log_line in lines]
+
+
+class TestLogMerger:
+    def test_lines_are_released_in_timestamp_order_once_every_source_has_one(self):
+        merger = LogMerger(["api", "db"], reorder_window=10)
+
+        merger.push("api", line("api", 2), now=0)
+        merger.push("api", line("api", 3), now=0)
+        assert merger.pop_ready(now=0) == []
+
+        merger.push("db", line("db", 1), now=0)
+        # db@1 is released; api@2 waits until db has a line again (or the window passes)
+        assert texts(merger.pop_ready(now=0)) == ["db@1"]
+
+        merger.push("db", line("db", 2.5), now=0)
+        assert texts(merger.pop_ready(now=0)) == ["api@2", "db@2.5"]
+
+    def test_a_quiet_source_holds_lines_back_for_the_reorder_window_only(self):
+        merger = LogMerger(["api", "db"], reorder_window=0.5)
+        merger.push("api", line("api", 1), now=10.0)
+
+        assert merger.deadline() == 10.5
+        assert merger.pop_ready(now=10.4) == []
+        assert texts(merger.pop_ready(now=10.5)) == ["api@1"]
+        assert merger.deadline() is None
+
+    def test_a_closed_source_does_not_hold_lines_back(self):
+        merger = LogMerger(["api", "db"], reorder_window=10)
+        merger.push("api", line("api", 1), now=0)
+
+        merger.close("db")
+
+        assert texts(merger.pop_ready(now=0)) == ["api@1"]
+
+    def test_the_buffer_is_bounded_by_max_pending(self):
+        merger = LogMerger(["api", "db"], reorder_window=10, max_pending=3)
+        for second in range(5):
+            merger.push("api", line("api", second), now=0)
+
+        assert texts(merger.pop_ready(now=0)) == ["api@0", "api@1"]
+        assert len(merger) == 3
+
+    def test_lines_without_a_timestamp_sort_as_the_newest_seen(self):
+        merger = LogMerger(["api", "db"], reorder_window=10)
+        merger.push("api", line("api", 5), now=0)
+        merger.push("api", LogLine("api", "stderr", "no timestamp"), now=0)
+        merger.push("db", line("db", 6), now=0)
+        merger.close("api")
+        merger.close("db")
+
+        assert texts(merger.pop_ready(now=0)) == ["api@5", "no timestamp", "db@6"]
+
+
+def test_parse_timestamp_keeps_nanoseconds_and_offsets():
+    assert parse_timestamp("2024-05-01T12:00:01.000000123Z") - parse_timestamp(at(1)) == 123
+    assert parse_timestamp("2024-05-01T14:00:01+02:00") == parse_timestamp(at(1))
+    assert parse_timestamp("not a timestamp") is None
+
+
+class TestMergeLogIterators:
+    def test_finite_streams_are_merged_in_timestamp_order(self):
+        streams = {
+            "api": iter([line("api-container", 1, "a1"), line("api-container", 4, "a4")]),
+            "db": iter([line("db-container", 2, "d2"), line("db-container", 3, "d3")]),
+        }
+
+        merged = list(merge_log_iterators(streams, reorder_window=5))
+
+        assert texts(merged) == ["a1", "d2", "d3", "a4"]
+        # Lines carry the service name, not the container name
+        assert [log_line.service for log_line in merged] == ["api", "db", "db", "api"]
+
+    def test_a_failing_stream_ends_with_an_error_line(self):
+        def failing():
+            yield line("worker", 2, "w2")
+            raise RuntimeError("container gone")
+
+        streams = {"api": iter([line("api", 1, "a1"), line("api", 3, "a3")]), "worker": failing()}
+
+        merged = list(merge_log_iterators(streams, reorder_window=5))
+
+        assert texts(merged)[:2] == ["a1", "w2"]
+        assert "[log stream error: container gone]" in texts(merged)
+        assert "a3" in texts(merged)
+
+
+class TestMergeLogStreams:
+    @pytest.mark.asyncio
+    async def test_async_streams_are_merged_in_timestamp_order(self):
+        async def stream(*lines, delay: float = 0.0):
+            for log_line in lines:
+                await asyncio.sleep(delay)
+                yield log_line
+
+        streams = {
+            "api": stream(line("api", 1, "a1"), line("api", 3, "a3"), delay=0.01),
+            "db": stream(line("db", 2, "d2"), line("db", 4, "d4")),
+        }
+
+        merged = [log_line async for log_line in merge_log_streams(streams, reorder_window=5)]
+
+        assert texts(merged) == ["a1", "d2", "a3", "d4"]
+
+    @pytest.mark.asyncio
+    async def test_closing_the_merge_stops_every_source(self):
+        closed = []
+
+        async def endless(service: str):
+            try:
+                second = 0
+                while True:
+                    second += 1
+                    yield line(service, second)
+                    await asyncio.sleep(0.001)
+            finally:
+                closed.append(service)
+
+        merged = merge_log_streams({"api": endless("api"), "db": endless("db")}, reorder_window=0.05)
+        first = [await merged.__anext__() for _ in range(4)]
+        await merged.aclose()
+
+        assert sorted(closed) == ["api", "db"]
+        assert len(first) == 4
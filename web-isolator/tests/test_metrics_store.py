@@ -0,0 +1,187 @@
+"""
+Tests for the embedded metrics store (segment files, rollups, compaction)
+"""
+import math
+import os
+import time
+from array import array
+
+import pytest
+
+from core.metrics_store import DAY, MetricsStore, Segment, rollup_buffer, write_segment
+
+
+NAN = math.nan
+
+
+def sample(cpu, memory=100.0, rx=NAN, tx=NAN, project="shop", service="api"):
+    return {"project": project, "service": service, "cpu_percent": cpu, "memory_bytes": memory,
+            "net_rx_bps": rx, "net_tx_bps": tx}
+
+
+def span_start(offset: float = 0.0) -> float:
+    """Start of a 10-minute segment span, offset seconds from about half an hour ago"""
+    return math.floor((time.time() - 1800) / 600) * 600 + offset
+
+
+def files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".seg"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MetricsStore(str(tmp_path / "metrics"))
+
+
+def test_segments_round_trip(tmp_path):
+    path = str(tmp_path / "a.seg")
+    keys = [("shop", "api"), (None, "adhoc")]
+    columns = {"time": array('d', [10.0, 20.0, 15.0]), "key": array('I', [0, 1, 0]),
+               "cpu_percent": array('d', [1.5, NAN, 3.0])}
+
+    write_segment(path, "raw", keys, columns)
+    segment = Segment(path)
+
+    assert segment.keys == keys
+    assert (segment.rows, segment.start, segment.end) == (3, 10.0, 20.0)
+    assert segment.column_names == ["time", "key", "cpu_percent"]
+    read = segment.read(["key", "cpu_percent", "missing"])
+    assert list(read) == ["key", "cpu_percent"]
+    assert list(read["key"]) == [0, 1, 0]
+    assert read["cpu_percent"][0] == 1.5 and math.isnan(read["cpu_percent"][1])
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_a_file_that_is_not_a_segment_is_rejected(tmp_path):
+    path = tmp_path / "junk.seg"
+    path.write_bytes(b"not a segment")
+
+    with pytest.raises(ValueError):
+        Segment(str(path))
+
+
+def test_rollups_weight_each_metric_by_its_own_sample_count():
+    keys = [("shop", "api")]
+    # First minute: three cpu samples but only one network rate (no pid known before)
+    columns = {
+        "time": array('d', [0.0, 10.0, 20.0, 60.0, 70.0, 80.0]),
+        "key": array('I', [0] * 6),
+        "cpu_percent": array('d', [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]),
+        "memory_bytes": array('d', [100.0] * 6),
+        "net_rx_bps": array('d', [NAN, NAN, 30.0, 60.0, 60.0, 60.0]),
+        "net_tx_bps": array('d', [NAN] * 6),
+    }
+    minutes = rollup_buffer([(keys, columns)])
+    assert list(minutes.columns["net_rx_bps.count"]) == [1.0, 3.0]
+    assert list(minutes.columns["cpu_percent.count"]) == [3.0, 3.0]
+
+    merged = rollup_buffer([minutes.as_segment()], step=300)
+
+    assert merged.columns["net_rx_bps.avg"][0] == pytest.approx((30.0 + 3 * 60.0) / 4)
+    assert merged.columns["cpu_percent.avg"][0] == pytest.approx(3.5)
+    assert merged.columns["net_rx_bps.count"][0] == 4.0
+    assert math.isnan(merged.columns["net_tx_bps.avg"][0])
+    assert merged.columns["net_tx_bps.count"][0] == 0.0
+
+
+def test_a_segment_is_rolled_up_when_its_span_ends(store):
+    start = span_start()
+    for second in range(0, 120, 10):
+        store.record(start + second, {"shop-api": sample(cpu=second / 10)})
+    assert files(store.rollup_dir) == []
+
+    store.record(start + 600, {"shop-api": sample(cpu=50.0)})
+
+    raw_name = f"{int(start * 1000)}"
+    assert files(store.raw_dir) == [f"{raw_name}.r.seg"]
+    assert files(store.rollup_dir) == [f"{raw_name}.seg"]
+    rollup = Segment(os.path.join(store.rollup_dir, f"{raw_name}.seg"))
+    columns = rollup.read(["time", "cpu_percent.avg", "cpu_percent.max", "cpu_percent.count"])
+    assert list(columns["time"]) == [start, start + 60]
+    assert list(columns["cpu_percent.avg"]) == [2.5, 8.5]
+    assert list(columns["cpu_percent.max"]) == [5.0, 11.0]
+    assert list(columns["cpu_percent.count"]) == [6.0, 6.0]
+    assert store.stats()["segments_rolled_up"] == 1
+
+
+def test_segments_left_open_are_rolled_up_after_a_restart(tmp_path):
+    path = str(tmp_path / "metrics")
+    start = span_start()
+    first = MetricsStore(path)
+    for second in range(0, 60, 10):
+        first.record(start + second, {"shop-api": sample(cpu=4.0)})
+    first.close()
+    assert files(first.rollup_dir) == []
+
+    second = MetricsStore(path)
+
+    assert files(second.raw_dir) == [f"{int(start * 1000)}.r.seg"]
+    assert files(second.rollup_dir) == [f"{int(start * 1000)}.seg"]
+    assert second.segments_rolled_up == 1
+    history = second.query("shop", start=start, end=start + 600, step=60)
+    assert history["tier"] == "1m"
+    assert history["series"][0]["points"] == [
+        {"t": start, "cpu_percent": {"avg": 4.0, "min": 4.0, "max": 4.0},
+         "memory_bytes": {"avg": 100.0, "min": 100.0, "max": 100.0}, "net_rx_bps": None, "net_tx_bps": None}
+    ]
+
+
+def test_compaction_merges_past_days_into_one_file(store):
+    yesterday = math.floor(time.time() / DAY) * DAY - DAY
+    for span in range(3):
+        for second in range(0, 600, 60):
+            store.record(yesterday + span * 600 + second, {"shop-api": sample(cpu=float(span))})
+    assert len(files(store.rollup_dir)) == 2
+
+    store.compact()
+
+    assert files(store.rollup_dir) == [f"day-{int(yesterday)}.seg"]
+    # Rolled-up raw segments are past raw retention; the open one is not rolled up yet
+    assert files(store.raw_dir) == [f"{int((yesterday + 1200) * 1000)}.seg"]
+    day = Segment(os.path.join(store.rollup_dir, f"day-{int(yesterday)}.seg"))
+    assert day.rows == 20
+    assert (day.start, day.end) == (yesterday, yesterday + 1140)
+
+
+def test_retention_deletes_old_segments(store):
+    start = span_start()
+    store.record(start, {"shop-api": sample(cpu=1.0)})
+    store.record(start + 600, {"shop-api": sample(cpu=2.0)})
+    store.flush()
+    rolled_up, still_open = f"{int(start * 1000)}.r.seg", f"{int((start + 600) * 1000)}.seg"
+    assert files(store.raw_dir) == [rolled_up, still_open]
+
+    store.compact(now=start + 2 * 3600)
+
+    assert files(store.raw_dir) == [still_open]
+    assert len(files(store.rollup_dir)) == 1
+
+    store.compact(now=start + 8 * DAY)
+
+    assert files(store.rollup_dir) == []
+    assert store.stats()["files_deleted"] == 2
+
+
+def test_queries_pick_the_tier_from_range_and_step(store):
+    start = span_start()
+    for second in range(0, 600, 10):
+        store.record(start + second, {"shop-api": sample(cpu=1.0), "shop-db": sample(cpu=3.0, service="db")})
+    store.record(start + 600, {"shop-api": sample(cpu=5.0)})
+
+    raw = store.query("shop", "api", start=start, end=start + 700, step=30)
+    assert raw["tier"] == "raw"
+    assert [series["service"] for series in raw["series"]] == ["api"]
+    points = raw["series"][0]["points"]
+    assert len(points) == 21
+    # The last point comes from the open segment, still in memory
+    assert points[-1]["t"] == start + 600 and points[-1]["cpu_percent"]["avg"] == 5.0
+
+    minutes = store.query("shop", start=start, end=start + 700, step=120)
+    assert minutes["tier"] == "1m"
+    assert sorted(series["service"] for series in minutes["series"]) == ["api", "db"]
+
+    old = store.query("shop", start=time.time() - 2 * 3600, step=10)
+    assert old["tier"] == "1m"
+
+    with pytest.raises(ValueError):
+        store.query("shop", start=start, end=start + 60, metrics=["disk_bytes"])
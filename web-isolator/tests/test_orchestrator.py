@@ -0,0 +1,124 @@
+"""
+Tests for starting a project's services in dependency order
+"""
+import threading
+import time
+
+import pytest
+
+from providers.base import ServiceError, ServiceInfo, ProviderStatus
+from providers.orchestrator import ProjectOrchestrator, build_dependency_graph, get_service_option
+
+
+class Recorder:
+    """start/discard callbacks that record what ran; services in fail raise on start"""
+
+    def __init__(self, fail=(), start_time: float = 0.0):
+        self.fail = set(fail)
+        self.start_time = start_time
+        self.started = []
+        self.discarded = []
+        self._lock = threading.Lock()
+        self._running = 0
+        self.max_concurrent = 0
+
+    def start(self, service):
+        with self._lock:
+            self._running += 1
+            self.max_concurrent = max(self.max_concurrent, self._running)
+        try:
+            time.sleep(self.start_time)
+            if service['name'] in self.fail:
+                raise RuntimeError("port already allocated")
+            with self._lock:
+                self.started.append(service['name'])
+            return ServiceInfo(service['name'], service['name'], ProviderStatus.RUNNING)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def discard(self, name):
+        self.discarded.append(name)
+
+
+def service(name, *depends_on):
+    return {"name": name, "depends_on": list(depends_on)}
+
+
+def test_services_start_after_their_dependencies():
+    recorder = Recorder(start_time=0.01)
+    services = [service("web", "api"), service("api", "db", "cache"), service("db"), service("cache")]
+
+    started = ProjectOrchestrator(max_parallel=4).run(services, recorder.start, recorder.discard)
+
+    order = recorder.started
+    assert set(started) == {"web", "api", "db", "cache"}
+    assert order.index("api") > max(order.index("db"), order.index("cache"))
+    assert order[-1] == "web"
+    # db and cache have no dependencies between them
+    assert recorder.max_concurrent == 2
+
+
+def test_no_more_than_max_parallel_services_start_at_once():
+    recorder = Recorder(start_time=0.02)
+    services = [service(f"worker-{i}") for i in range(6)]
+
+    ProjectOrchestrator(max_parallel=2).run(services, recorder.start, recorder.discard)
+
+    assert recorder.max_concurrent == 2
+    assert len(recorder.started) == 6
+
+
+def test_nothing_starts_after_a_failure():
+    recorder = Recorder(fail={"a"})
+    services = [service("a"), service("b"), service("c")]
+
+    with pytest.raises(ServiceError, match="Failed to start service a: port already allocated"):
+        ProjectOrchestrator(max_parallel=1).run(services, recorder.start, recorder.discard)
+
+    assert recorder.started == []
+    assert recorder.discarded == []
+
+
+def test_started_services_are_discarded_newest_first():
+    recorder = Recorder(fail={"web"})
+    services = [service("db"), service("api", "db"), service("web", "api")]
+
+    with pytest.raises(ServiceError):
+        ProjectOrchestrator(max_parallel=4).run(services, recorder.start, recorder.discard)
+
+    assert recorder.started == ["db", "api"]
+    assert recorder.discarded == ["api", "db"]
+
+
+def test_in_flight_starts_finish_and_are_discarded():
+    recorder = Recorder(fail={"broken"}, start_time=0.02)
+    services = [service("broken"), service("slow"), service("later", "slow")]
+
+    with pytest.raises(ServiceError):
+        ProjectOrchestrator(max_parallel=2).run(services, recorder.start, recorder.discard)
+
+    assert recorder.started == ["slow"]
+    assert recorder.discarded == ["slow"]
+
+
+def test_dependency_cycles_are_rejected_before_anything_starts():
+    recorder = Recorder()
+    services = [service("a", "c"), service("b", "a"), service("c", "b"), service("d")]
+
+    with pytest.raises(ServiceError, match="Dependency cycle between services: a, b, c"):
+        ProjectOrchestrator().run(services, recorder.start, recorder.discard)
+
+    assert recorder.started == []
+
+
+def test_unknown_dependencies_are_rejected():
+    with pytest.raises(ServiceError, match="api depends on unknown service"):
+        build_dependency_graph([service("api", "db")])
+
+
+def test_service_options_fall_back_to_json_metadata():
+    row = {"name": "api", "metadata": '{"depends_on": "db", "readiness": {"http": "/health"}}'}
+
+    assert get_service_option(row, "readiness") == {"http": "/health"}
+    assert build_dependency_graph([row, service("db")]) == {"api": {"db"}, "db": set()}
@@ -0,0 +1,200 @@
+"""
+Tests for image prefetch before project start
+"""
+import threading
+import time
+
+from providers.base import IsolationProvider, ProviderError, ProviderStatus, ServiceInfo
+from providers.prefetch import ImagePrefetcher, collect_images, normalize_image
+
+
+class FakeProvider(IsolationProvider):
+    """Provider with a local image store; pulls take pull_time seconds"""
+
+    def __init__(self, present=(), unpullable=(), broken=(), pull_time: float = 0.0):
+        super().__init__("fake")
+        self.images = set(present)
+        self.unpullable = set(unpullable)
+        self.broken = set(broken)
+        self.pull_time = pull_time
+        self.pulls = []
+        self.started = []
+        self._lock = threading.Lock()
+        self._pulling = 0
+        self.max_concurrent_pulls = 0
+
+    def image_exists(self, image_name):
+        return image_name in self.images
+
+    def pull_image(self, image_name):
+        with self._lock:
+            self.pulls.append(image_name)
+            self._pulling += 1
+            self.max_concurrent_pulls = max(self.max_concurrent_pulls, self._pulling)
+        try:
+            time.sleep(self.pull_time)
+            if image_name in self.broken:
+                raise ProviderError(f"registry unreachable for {image_name}")
+            if image_name in self.unpullable:
+                return False
+            self.images.add(image_name)
+            return True
+        finally:
+            with self._lock:
+                self._pulling -= 1
+
+    def start_service(self, service_name, image=None, **kwargs):
+        self.started.append(service_name)
+        return ServiceInfo(service_name, service_name, ProviderStatus.RUNNING, metadata={'image': image})
+
+    def stop_service(self, service_name):
+        return True
+
+    @property
+    def is_available(self):
+        return True
+
+    def get_version(self):
+        return "fake 1.0"
+
+    def create_network(self, name, driver="bridge", subnet=None, **kwargs):
+        raise NotImplementedError
+
+    def delete_network(self, network_name):
+        return True
+
+    def list_networks(self):
+        return []
+
+    def network_exists(self, network_name):
+        return True
+
+    def restart_service(self, service_name):
+        return True
+
+    def remove_service(self, service_name):
+        return True
+
+    def get_service_status(self, service_name):
+        return ProviderStatus.RUNNING
+
+    def list_services(self, project_name=None):
+        return []
+
+    def service_exists(self, service_name):
+        return service_name in self.started
+
+    def get_service_logs(self, service_name, lines=100, follow=False):
+        return []
+
+    def get_service_stats(self, service_name):
+        return {}
+
+    def build_image(self, dockerfile_path, image_tag, build_context=".", **kwargs):
+        return True
+
+
+def test_only_missing_images_are_pulled():
+    provider = FakeProvider(present={"postgres:15-alpine"})
+
+    report = ImagePrefetcher(provider).run(["postgres:15-alpine", "node:18-alpine"])
+
+    assert provider.pulls == ["node:18-alpine"]
+    assert report["images"]["postgres:15-alpine"]["status"] == "present"
+    assert report["images"]["node:18-alpine"]["status"] == "pulled"
+    assert (report["present"], report["pulled"], report["failed"]) == (1, 1, 0)
+
+
+def test_each_image_is_fetched_once():
+    provider = FakeProvider()
+
+    report = ImagePrefetcher(provider).run(["redis", "redis:latest", "redis", "", None])
+
+    assert provider.pulls == ["redis:latest"]
+    assert list(report["images"]) == ["redis:latest"]
+
+
+def test_pulls_run_concurrently_up_to_max_workers():
+    provider = FakeProvider(pull_time=0.05)
+    images = [f"registry.local/app-{i}:1.0" for i in range(6)]
+
+    report = ImagePrefetcher(provider, max_workers=3).run(images)
+
+    assert report["pulled"] == 6
+    assert provider.max_concurrent_pulls == 3
+
+
+def test_failures_are_reported_not_raised():
+    provider = FakeProvider(unpullable={"private/app:1.0"}, broken={"flaky/app:1.0"})
+
+    report = ImagePrefetcher(provider).run(["private/app:1.0", "flaky/app:1.0", "nginx:1.25"])
+
+    assert report["images"]["private/app:1.0"]["status"] == "failed"
+    assert report["images"]["flaky/app:1.0"] == {
+        "status": "failed",
+        "seconds": report["images"]["flaky/app:1.0"]["seconds"],
+        "error": "registry unreachable for flaky/app:1.0",
+    }
+    assert report["images"]["nginx:1.25"]["status"] == "pulled"
+    assert report["failed"] == 2
+
+
+def test_normalize_image_adds_the_implicit_tag():
+    assert normalize_image("node") == "node:latest"
+    assert normalize_image("localhost:5000/app") == "localhost:5000/app:latest"
+    assert normalize_image("localhost:5000/app:2") == "localhost:5000/app:2"
+    assert normalize_image("node@sha256:abc") == "node@sha256:abc"
+
+
+def test_collect_images_skips_services_built_from_a_dockerfile():
+    services = [
+        {"name": "web", "image": "node:18-alpine"},
+        {"name": "worker", "image": "node:18-alpine"},
+        {"name": "api", "image": "api:dev", "dockerfile_path": "./api/Dockerfile"},
+        {"name": "cache"},
+    ]
+
+    assert collect_images(services) == ["node:18-alpine"]
+
+
+def test_start_project_reports_each_services_image():
+    provider = FakeProvider(present={"postgres:15-alpine"})
+    services = [
+        {"name": "db", "image": "postgres:15-alpine"},
+        {"name": "web", "image": "node", "depends_on": ["db"]},
+        {"name": "api", "image": "api:dev", "dockerfile_path": "./api/Dockerfile"},
+    ]
+
+    started = provider.start_project("shop", services)
+
+    assert provider.pulls == ["node:latest"]
+    assert started["db"].metadata["image_prefetch"]["status"] == "present"
+    assert started["web"].metadata["image_prefetch"]["status"] == "pulled"
+    assert "image_prefetch" not in started["api"].metadata
+
+
+def test_start_project_without_prefetch_pulls_nothing():
+    provider = FakeProvider()
+
+    started = provider.start_project("shop", [{"name": "web", "image": "node"}], prefetch=False)
+
+    assert provider.pulls == []
+    assert "image_prefetch" not in started["web"].metadata
+
+
+def test_start_projects_pulls_images_shared_between_projects_once():
+    provider = FakeProvider(pull_time=0.01)
+    projects = [
+        {"name": "shop", "services": [{"name": "db", "image": "postgres:15-alpine"},
+                                      {"name": "web", "image": "node:18-alpine", "depends_on": ["db"]}]},
+        {"name": "blog", "id": "p2", "services": [{"name": "db", "image": "postgres:15-alpine"},
+                                                  {"name": "cache", "image": "redis"}]},
+    ]
+
+    started = provider.start_projects(projects)
+
+    assert sorted(provider.pulls) == ["node:18-alpine", "postgres:15-alpine", "redis:latest"]
+    assert provider.pulls.count("postgres:15-alpine") == 1
+    assert sorted(provider.started) == ["blog-cache", "blog-db", "shop-db", "shop-web"]
+    assert started["shop"]["db"].metadata["image_prefetch"]["status"] == "pulled"
+    assert started["blog"]["db"].metadata["image_prefetch"]["status"] == "pulled"
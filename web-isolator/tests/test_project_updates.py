@@ -0,0 +1,98 @@
+"""
+Tests for coalescing project updates pushed to /ws/projects clients
+"""
+import asyncio
+import threading
+
+import pytest
+
+from api.project_updates import ProjectUpdateBroadcaster
+from core.events import EventBus, PROJECT_CREATED, PROJECT_UPDATED, PROJECT_DELETED
+
+
+CREATED = {"id": "p1", "name": "shop", "path": "/src/shop", "status": "stopped"}
+
+
+@pytest.fixture
+def subscription():
+    return ProjectUpdateBroadcaster(flush_interval=0).subscribe()
+
+
+def flush(subscription):
+    """Messages of the next flush"""
+    return asyncio.run(asyncio.wait_for(subscription.next_messages(), 1))
+
+
+def test_updates_to_one_project_merge_into_one_message(subscription):
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "starting"})
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "running", "path": "/src/shop"})
+
+    assert flush(subscription) == [
+        {"type": PROJECT_UPDATED, "payload": {"id": "p1", "status": "running", "path": "/src/shop"}}
+    ]
+    assert subscription.events_coalesced == 1
+
+
+def test_updates_after_a_create_are_folded_into_it(subscription):
+    subscription.push(PROJECT_CREATED, dict(CREATED))
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "running"})
+
+    assert flush(subscription) == [{"type": PROJECT_CREATED, "payload": dict(CREATED, status="running")}]
+
+
+def test_a_project_created_and_deleted_before_the_flush_is_never_sent(subscription):
+    subscription.push(PROJECT_CREATED, dict(CREATED))
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "running"})
+    subscription.push(PROJECT_DELETED, {"id": "p1"})
+    subscription.push(PROJECT_UPDATED, {"id": "p2", "status": "stopped"})
+
+    assert flush(subscription) == [{"type": PROJECT_UPDATED, "payload": {"id": "p2", "status": "stopped"}}]
+
+
+def test_a_delete_replaces_pending_updates(subscription):
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "running"})
+    subscription.push(PROJECT_DELETED, {"id": "p1"})
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "stopped"})
+
+    assert flush(subscription) == [{"type": PROJECT_DELETED, "payload": {"projectId": "p1"}}]
+
+
+def test_only_changed_fields_are_sent(subscription):
+    subscription.push(PROJECT_CREATED, dict(CREATED))
+    flush(subscription)
+
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "stopped"})
+    subscription.push(PROJECT_UPDATED, {"id": "p2", "status": "running"})
+    assert flush(subscription) == [{"type": PROJECT_UPDATED, "payload": {"id": "p2", "status": "running"}}]
+
+    subscription.push(PROJECT_UPDATED, {"id": "p1", "status": "running", "name": "shop"})
+    assert flush(subscription) == [{"type": PROJECT_UPDATED, "payload": {"id": "p1", "status": "running"}}]
+
+
+def test_bus_events_from_other_threads_reach_subscribers():
+    bus = EventBus()
+    broadcaster = ProjectUpdateBroadcaster(flush_interval=0.05)
+
+    async def main():
+        broadcaster.attach(bus, asyncio.get_running_loop())
+        subscription = broadcaster.subscribe()
+
+        def publish():
+            bus.publish(PROJECT_CREATED, dict(CREATED))
+            for status in ("starting", "running"):
+                bus.publish(PROJECT_UPDATED, {"id": "p1", "status": status})
+
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        publisher.join()
+
+        messages = await asyncio.wait_for(subscription.next_messages(), 1)
+        broadcaster.close()
+        return messages, await asyncio.wait_for(subscription.next_messages(), 1)
+
+    messages, after_close = asyncio.run(main())
+
+    assert messages == [{"type": PROJECT_CREATED, "payload": dict(CREATED, status="running")}]
+    assert after_close is None
+    assert broadcaster.stats()["events_received"] == 3
+    assert not bus.has_subscribers(PROJECT_UPDATED)
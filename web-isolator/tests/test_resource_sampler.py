@@ -0,0 +1,222 @@
+"""
+Tests for sampling container resources from a fake cgroup and /proc tree
+"""
+import math
+
+import pytest
+
+from providers.resource_sampler import CgroupReader, ResourceSampler, RingSeries, summarize
+
+
+API_ID = "a" * 64
+DB_ID = "b" * 64
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {lo} 10 0 0 0 0 0 0 {lo} 10 0 0 0 0 0 0
+  eth0: {rx} 20 0 0 0 0 0 0 {tx} 20 0 0 0 0 0 0
+"""
+
+
+class FakeHost:
+    """A cgroup hierarchy (v2 systemd or v1 cgroupfs layout) and /proc, written on demand"""
+
+    def __init__(self, root, version: int = 2):
+        self.cgroup_root = root / "cgroup"
+        self.proc_root = root / "proc"
+        self.version = version
+        self.cgroup_root.mkdir()
+        self.proc_root.mkdir()
+        if version == 2:
+            (self.cgroup_root / "cgroup.controllers").write_text("cpu io memory pids\n")
+
+    def _write(self, directory, files):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, content in files.items():
+            (directory / name).write_text(content)
+
+    def container(self, container_id: str, pid: int, cpu_usec: int, memory: int, io_read: int = 0,
+                  io_write: int = 0, rx: int = 0, tx: int = 0, pids: int = 1, limit=None):
+        if self.version == 2:
+            self._write(self.cgroup_root / "system.slice" / f"docker-{container_id}.scope", {
+                "cpu.stat": f"usage_usec {cpu_usec}\nuser_usec {cpu_usec}\nsystem_usec 0\n",
+                "memory.current": f"{memory + 1000}\n",
+                "memory.stat": "anon 0\ninactive_file 1000\n",
+                "memory.max": f"{limit}\n" if limit else "max\n",
+                "io.stat": f"8:0 rbytes={io_read} wbytes={io_write} rios=1 wios=1\n",
+                "pids.current": f"{pids}\n",
+                "cgroup.procs": f"{pid}\n",
+            })
+        else:
+            relative = f"docker/{container_id}"
+            self._write(self.cgroup_root / "cpuacct" / relative, {"cpuacct.usage": f"{cpu_usec * 1000}\n"})
+            self._write(self.cgroup_root / "memory" / relative, {
+                "memory.usage_in_bytes": f"{memory + 1000}\n",
+                "memory.stat": "cache 1000\ntotal_inactive_file 1000\n",
+                "memory.limit_in_bytes": f"{limit or 9223372036854771712}\n",
+            })
+            self._write(self.cgroup_root / "blkio" / relative, {
+                "blkio.throttle.io_service_bytes": f"8:0 Read {io_read}\n8:0 Write {io_write}\nTotal 0\n",
+            })
+            self._write(self.cgroup_root / "pids" / relative, {
+                "pids.current": f"{pids}\n", "cgroup.procs": f"{pid}\n",
+            })
+        self._write(self.proc_root / str(pid) / "net", {"dev": NET_DEV.format(lo=999999, rx=rx, tx=tx)})
+
+    def host(self, busy: int, idle: int, memory_total_kb: int = 8000000, available_kb: int = 6000000):
+        self._write(self.proc_root, {
+            "stat": f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\ncpu0 {busy} 0 0 {idle} 0 0 0 0 0 0\n",
+            "meminfo": f"MemTotal: {memory_total_kb} kB\nMemFree: 1000 kB\nMemAvailable: {available_kb} kB\n",
+        })
+
+    def sampler(self, containers) -> ResourceSampler:
+        return ResourceSampler(lambda: containers, cgroup_root=str(self.cgroup_root),
+                               proc_root=str(self.proc_root))
+
+
+CONTAINERS = [
+    {"id": API_ID, "name": "shop-api", "project": "shop", "service": "api"},
+    {"id": DB_ID, "name": "shop-db", "project": "shop", "service": "db"},
+]
+
+
+@pytest.fixture(params=[2, 1], ids=["cgroup-v2", "cgroup-v1"])
+def fake_host(request, tmp_path):
+    return FakeHost(tmp_path, request.param)
+
+
+def take_two_samples(fake_host, sampler):
+    """Two ticks 5s apart: api uses half a CPU and reads 5 KB/s, db idles"""
+    fake_host.host(busy=1000, idle=9000)
+    fake_host.container(API_ID, pid=101, cpu_usec=1_000_000, memory=50_000_000, io_read=0, rx=1000, tx=500)
+    fake_host.container(DB_ID, pid=102, cpu_usec=2_000_000, memory=200_000_000, limit=1 << 30, pids=4)
+    sampler.sample(now=100.0)
+
+    fake_host.host(busy=1250, idle=9750)
+    fake_host.container(API_ID, pid=101, cpu_usec=3_500_000, memory=60_000_000, io_read=25_000,
+                        rx=11_000, tx=3000)
+    fake_host.container(DB_ID, pid=102, cpu_usec=2_000_000, memory=200_000_000, limit=1 << 30, pids=4)
+    sampler.sample(now=105.0)
+
+
+def test_reader_locates_containers_in_either_layout(fake_host):
+    fake_host.container(API_ID, pid=101, cpu_usec=1, memory=1)
+    reader = CgroupReader(str(fake_host.cgroup_root), str(fake_host.proc_root))
+
+    assert reader.unified == (fake_host.version == 2)
+    expected = f"system.slice/docker-{API_ID}.scope" if fake_host.version == 2 else f"docker/{API_ID}"
+    assert reader.locate(API_ID) == expected
+    assert reader.locate(DB_ID) is None
+
+
+def test_reader_reads_counters(fake_host):
+    fake_host.container(API_ID, pid=101, cpu_usec=1_500_000, memory=50_000_000, io_read=300, io_write=200,
+                        rx=1234, tx=567, pids=3)
+    reader = CgroupReader(str(fake_host.cgroup_root), str(fake_host.proc_root))
+
+    counters = reader.read(reader.locate(API_ID))
+
+    assert counters == {
+        "cpu_usec": 1_500_000,
+        # Reclaimable page cache is left out
+        "memory": 50_000_000,
+        "memory_limit": None,
+        "io_read": 300,
+        "io_write": 200,
+        "pids": 3,
+        "pid": 101,
+    }
+    # Loopback traffic does not count
+    assert reader.read_network(101) == (1234, 567)
+
+
+def test_rates_are_computed_between_samples(fake_host):
+    sampler = fake_host.sampler(CONTAINERS)
+
+    take_two_samples(fake_host, sampler)
+    api = sampler.latest("shop-api")
+
+    assert api["cpu_percent"] == pytest.approx(50.0)
+    assert api["memory_bytes"] == 60_000_000
+    assert api["io_read_bps"] == pytest.approx(5000.0)
+    assert api["net_rx_bps"] == pytest.approx(2000.0)
+    assert api["net_tx_bps"] == pytest.approx(500.0)
+    assert api["net_rx"] == 11_000
+    assert sampler.latest(API_ID[:12])["timestamp"] == 105.0
+
+
+def test_memory_limits_fall_back_to_host_memory_when_unlimited(fake_host):
+    sampler = fake_host.sampler(CONTAINERS)
+    take_two_samples(fake_host, sampler)
+
+    assert sampler.latest("shop-db")["memory_limit"] == 1 << 30
+    assert sampler.latest("shop-api")["memory_limit"] == 8000000 * 1024
+
+
+def test_project_and_system_summaries(fake_host):
+    sampler = fake_host.sampler(CONTAINERS)
+    take_two_samples(fake_host, sampler)
+
+    project = sampler.project_stats("shop")
+    assert project["samples"] == 1
+    assert project["metrics"]["memory_bytes"]["last"] == 260_000_000
+    assert project["metrics"]["pids"]["last"] == 5
+    assert sorted(service["service"] for service in project["services"]) == ["api", "db"]
+    assert sampler.project_stats("other") is None
+
+    system = sampler.system_stats()
+    assert system["containers"] == 2
+    assert system["projects"] == ["shop"]
+    assert system["total"]["metrics"]["cpu_percent"]["last"] == pytest.approx(50.0)
+    # 250 busy of 1000 jiffies; 2 GB of 8 GB in use
+    assert system["host"]["metrics"]["cpu_percent"]["last"] == pytest.approx(25.0)
+    assert system["host"]["metrics"]["memory_used_bytes"]["last"] == 2000000 * 1024
+
+
+def test_listeners_receive_every_sample(fake_host):
+    sampler = fake_host.sampler(CONTAINERS)
+    received = []
+    sampler.add_listener(lambda timestamp, samples: received.append((timestamp, samples)))
+
+    take_two_samples(fake_host, sampler)
+
+    assert [timestamp for timestamp, _ in received] == [100.0, 105.0]
+    # Rates need two samples
+    assert received[0][1] == {}
+    sample = received[1][1]["shop-api"]
+    assert (sample["project"], sample["service"]) == ("shop", "api")
+    assert sample["cpu_percent"] == pytest.approx(50.0)
+
+
+def test_stopped_containers_are_forgotten(fake_host):
+    containers = list(CONTAINERS)
+    sampler = fake_host.sampler(containers)
+    take_two_samples(fake_host, sampler)
+
+    containers.pop()
+    sampler.sample(now=110.0)
+
+    assert sampler.latest("shop-db") is None
+    assert sampler.stats()["containers"] == 1
+    assert sampler.stats()["cgroup_version"] == fake_host.version
+
+
+def test_ring_series_keeps_the_newest_samples():
+    series = RingSeries(("value",), capacity=4)
+    for second in range(6):
+        series.append(float(second), [second * 10.0])
+
+    times, columns = series.window()
+    assert list(times) == [2.0, 3.0, 4.0, 5.0]
+    assert list(columns["value"]) == [20.0, 30.0, 40.0, 50.0]
+
+    times, columns = series.window(seconds=1.5, now=5.0)
+    assert list(times) == [4.0, 5.0]
+    assert series.latest() == {"value": 50.0, "timestamp": 5.0}
+
+
+def test_summarize_ignores_unknown_values():
+    summary = summarize([4.0, math.nan, 1.0, 3.0, 2.0])
+
+    assert summary == {"last": 2.0, "min": 1.0, "avg": 2.5, "max": 4.0, "p95": 4.0}
+    assert summarize([math.nan]) is None
@@ -0,0 +1,112 @@
+"""
+Tests for the event-fed container state mirror against a fake daemon
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from conftest import json_response
+from providers.docker_api import DockerAPIClient
+from providers.state_mirror import ContainerStateMirror
+
+
+CONTAINER_ID = "c" * 64
+CONTAINER = {
+    "Id": CONTAINER_ID,
+    "Names": ["/shop-api"],
+    "State": "running",
+    "Status": "Up 2 minutes",
+    "Image": "node:18-alpine",
+    "Ports": [],
+    "Labels": {"isolator.managed": "true", "isolator.project": "shop", "isolator.project_id": "p1"},
+}
+
+
+class EventFeed:
+    """/events route: sends the queued events, or nothing after a short wait like an idle stream"""
+
+    def __init__(self, idle: float = 0.1):
+        self.idle = idle
+        self.pending = []
+        self._lock = threading.Lock()
+
+    def push(self, action: str, container_id: str = CONTAINER_ID):
+        now = time.time()
+        with self._lock:
+            self.pending.append({"Type": "container", "Action": action, "Actor": {"ID": container_id},
+                                 "time": int(now), "timeNano": int(now * 1e9)})
+
+    def __call__(self, query):
+        with self._lock:
+            events, self.pending = self.pending, []
+        if not events:
+            time.sleep(self.idle)
+        return 200, [json.dumps(event).encode() + b"\n" for event in events], {}
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def daemon(fake_engine):
+    feed = EventFeed()
+    fake_engine.route("GET", "/containers/json", lambda query: json_response([CONTAINER]))
+    fake_engine.route("GET", "/events", feed)
+    return fake_engine, feed
+
+
+@pytest.fixture
+def mirror(daemon):
+    engine, _ = daemon
+    mirror = ContainerStateMirror(DockerAPIClient(engine.socket_path), idle_timeout=1.0, retry_interval=0.05)
+    yield mirror
+    mirror.stop()
+
+
+def test_snapshot_then_events_update_the_mirror(daemon, mirror):
+    engine, feed = daemon
+    changes = []
+    mirror.add_listener(lambda project, status, project_id: changes.append((project, status, project_id)))
+
+    mirror.start()
+
+    assert mirror.synced
+    assert mirror.get("shop-api")["State"] == "running"
+    assert mirror.get(CONTAINER_ID[:12])["Names"] == ["/shop-api"]
+    assert mirror.project_status("shop", "p1") == "running"
+    assert changes == [("shop", "running", "p1")]
+
+    feed.push("die")
+
+    assert wait_for(lambda: mirror.get("shop-api")["State"] == "exited")
+    assert mirror.project_status("shop", "p1") == "stopped"
+    assert changes == [("shop", "running", "p1"), ("shop", "stopped", "p1")]
+    assert mirror.stats()["events_applied"] == 1
+    # The daemon is only asked for the container events the mirror uses
+    _, _, query = next(request for request in engine.requests if request[1] == "/events")
+    filters = json.loads(query["filters"][0])
+    assert filters["type"] == ["container"] and "die" in filters["event"]
+
+
+def test_restarting_while_the_old_stream_is_open_keeps_the_mirror_live(daemon, mirror):
+    _, feed = daemon
+    mirror.start()
+    old_thread = mirror._thread
+
+    mirror.stop()
+    mirror.start()
+
+    assert wait_for(lambda: not old_thread.is_alive())
+    assert mirror.synced
+    assert mirror._thread is not old_thread and mirror._thread.is_alive()
+
+    feed.push("die")
+    assert wait_for(lambda: mirror.get("shop-api")["State"] == "exited")